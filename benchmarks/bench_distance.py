@@ -0,0 +1,61 @@
+"""
+Benchmark of the batched distance engine against the legacy per-point loop
+
+Run with ``python benchmarks/bench_distance.py [--sizes 1000 200000]``
+"""
+
+import argparse
+
+import numpy as np
+
+from gpxprofpy import utils
+
+from synthetic import random_track
+from timing import best_time
+
+
+def legacy_calculate_distance(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Per-point loop as implemented before the batched engine"""
+
+    distance = np.zeros(latitude.shape)
+    latitude_rad = np.radians(latitude)
+    longitude_rad = np.radians(longitude)
+    for i, (lat, lon) in enumerate(zip(latitude_rad[1:], longitude_rad[1:])):
+        distance[i + 1] = distance[i] + utils.distance_between_points(
+            latitude_rad[i], longitude_rad[i], lat, lon
+        )
+
+    return distance
+
+
+def main() -> None:
+    """Prints a timing table for every method and dtype"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 20_000, 200_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'method':>10} {'dtype':>8} {'time (ms)':>10} {'speedup':>8} {'max diff (m)':>12}")
+    for size in args.sizes:
+        latitude, longitude, _ = random_track(size)
+        reference = legacy_calculate_distance(latitude, longitude)
+        legacy_time = best_time(lambda: legacy_calculate_distance(latitude, longitude), 1)
+        print(f"{size:>8} {'legacy':>10} {'float64':>8} {legacy_time * 1e3:>10.2f} {1:>8.1f} {0:>12.3f}")
+
+        for method in utils.DISTANCE_METHODS:
+            for dtype in (np.float64, np.float32):
+                distance = utils.calculate_distance(latitude, longitude, method, dtype)
+                elapsed = best_time(
+                    lambda: utils.calculate_distance(latitude, longitude, method, dtype),
+                    args.repeat,
+                )
+                max_diff = np.max(np.abs(distance - reference)) * 1000
+                print(
+                    f"{size:>8} {method:>10} {np.dtype(dtype).name:>8} {elapsed * 1e3:>10.2f}"
+                    f" {legacy_time / elapsed:>8.1f} {max_diff:>12.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark of slope fills draw time against the number of segments
+
+Run with ``python benchmarks/bench_draw.py [--segments 10 100 1000]``.
+Compares one fill_between artist per segment, as drawn before, with the
+single collection of segments.fill_under_segments.
+"""
+
+import argparse
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from gpxprofpy import main, profile, segments, utils
+
+from timing import best_time
+
+
+def climbs_profile(climbs: int, points_per_climb: int = 50) -> profile.GPXProfile:
+    """Returns a saw-tooth profile of climbs climbs of various slopes"""
+
+    size = 2 * climbs * points_per_climb
+    distance = np.linspace(0, 2 * climbs, size)
+    heights = np.resize([50.0, 100.0, 200.0, 400.0], climbs)
+    phase = (distance % 2) / 2
+    elevation = 1000 + np.repeat(heights, 2 * points_per_climb) * (
+        1 - np.abs(2 * phase - 1)
+    )
+    slope = utils.calculate_slope(distance, elevation)
+
+    return profile.GPXProfile("climbs", distance, elevation, slope)
+
+
+def legacy_fill_under_segments(ax, slope_segments: list) -> None:
+    """One fill_between per segment, as implemented before the collection"""
+
+    for seg in slope_segments:
+        slope_color = segments.get_slope_color(seg.mean_slope())
+        ax.fill_between(seg.distance, seg.elevation, 0, color=slope_color, zorder=10)
+
+
+def draw_time(gpx_profile: profile.GPXProfile, slope_segments: list, fill, repeat: int):
+    """Returns best time of filling segments and drawing the figure"""
+
+    def draw():
+        fig = Figure(figsize=main.FIGSIZE)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        main.set_axes_limits(ax, gpx_profile)
+        fill(ax, slope_segments)
+        canvas.draw()
+
+    return best_time(draw, repeat)
+
+
+def main_bench() -> None:
+    """Prints draw time of both fill implementations for every segment count"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, nargs="+", default=[10, 100, 1_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'segments':>9} {'per segment (ms)':>17} {'collection (ms)':>16} {'speedup':>8}")
+    for climbs in args.segments:
+        gpx_profile = climbs_profile(climbs)
+        slope_segments = segments.get_real_positive_slope_segments(
+            gpx_profile.distance, gpx_profile.elevation
+        )
+        legacy = draw_time(
+            gpx_profile, slope_segments, legacy_fill_under_segments, args.repeat
+        )
+        collection = draw_time(
+            gpx_profile, slope_segments, segments.fill_under_segments, args.repeat
+        )
+        print(
+            f"{len(slope_segments):>9} {legacy * 1e3:>17.1f} "
+            f"{collection * 1e3:>16.1f} {legacy / collection:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main_bench()
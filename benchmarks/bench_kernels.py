@@ -0,0 +1,77 @@
+"""
+Benchmark of the compute kernel backends
+
+Times the functions built on kernels (distance, slope, segments ends, merge
+passes) with each available backend, numba only when installed. The first call
+of a compiled backend includes its compilation, reported apart.
+Run with ``python benchmarks/bench_kernels.py [--sizes 10000 1000000]``
+"""
+
+import argparse
+import time
+
+from gpxprofpy import kernels, params, segments, utils
+
+from synthetic import realistic_track
+from timing import best_time
+
+
+def kernel_calls(size: int) -> list[tuple[str, object]]:
+    """Returns (name, function) of the calls to time on a track of size points"""
+
+    latitude, longitude, elevation = realistic_track(size)
+    distance = utils.calculate_distance(latitude, longitude)
+    slope = utils.calculate_slope(distance, elevation)
+    slope_sign = utils.get_slope_sign(slope)
+    all_segments = segments.get_all_slope_segments(distance, elevation, slope)
+
+    return [
+        ("distance cosines", lambda: utils.calculate_distance(latitude, longitude)),
+        (
+            "distance haversine",
+            lambda: utils.calculate_distance(latitude, longitude, "haversine"),
+        ),
+        ("slope", lambda: utils.calculate_slope(distance, elevation)),
+        ("segments ends", lambda: segments.find_segments_end_indexes(slope_sign)),
+        (
+            "merge segments",
+            lambda: segments.merge_segments(all_segments, params.SEUIL_MERGE),
+        ),
+    ]
+
+
+def main() -> None:
+    """Prints best time of each call with each backend"""
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = kernels.available_backends()
+    print(f"backends: {', '.join(backends)}")
+    print(f"{'kernel':>20} {'points':>8} " + " ".join(f"{name:>12}" for name in backends))
+    for size in args.sizes:
+        for name, func in kernel_calls(size):
+            timings = []
+            for backend in backends:
+                with kernels.use_backend(backend):
+                    start = time.perf_counter()
+                    func()  # compiles kernels of compiled backends
+                    first = time.perf_counter() - start
+                    timings.append(best_time(func, args.repeat))
+                if backend != kernels.REFERENCE and first > 10 * timings[-1]:
+                    print(f"{name:>20} {size:>8} {backend} first call: {first * 1e3:.0f} ms")
+            reference = timings[0]
+            print(
+                f"{name:>20} {size:>8} "
+                + " ".join(
+                    f"{timing * 1e3:>7.2f} ms"
+                    + (f" ({reference / max(timing, 1e-12):.1f}x)" if i else "")
+                    for i, timing in enumerate(timings)
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the streaming GPX parser against the gpxpy backend
+
+Reports wall time, throughput and tracemalloc peak memory of
+``profile.extract_data`` for both backends.
+Run with ``python benchmarks/bench_parser.py [--sizes 10000 200000]``
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from gpxprofpy import profile
+
+from synthetic import write_gpx
+
+
+def measure(gpx_filename: str, backend: str) -> tuple[float, int]:
+    """Returns wall time in seconds and peak traced memory in bytes
+
+    Memory is measured in a second run, as tracing slows the parser down.
+    """
+
+    start = time.perf_counter()
+    profile.extract_data(gpx_filename, backend=backend)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    profile.extract_data(gpx_filename, backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main() -> None:
+    """Prints a timing and memory table for both backends"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 200_000])
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'backend':>8} {'time (s)':>9} {'pts/s':>10} {'MB/s':>7} {'peak MB':>8} {'B/pt':>6}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            gpx_filename = os.path.join(tmp_dir, f"track_{size}.gpx")
+            write_gpx(gpx_filename, size)
+            file_mb = os.path.getsize(gpx_filename) / 1e6
+            for backend in ("stream", "gpxpy"):
+                elapsed, peak = measure(gpx_filename, backend)
+                print(
+                    f"{size:>8} {backend:>8} {elapsed:>9.3f} {size / elapsed:>10.0f}"
+                    f" {file_mb / elapsed:>7.1f} {peak / 1e6:>8.1f} {peak / size:>6.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of headless render latency per figure
+
+Run with ``python benchmarks/bench_render.py [--sizes 1000 100000] [--formats png svg]``
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gpxprofpy import main, profile, renderer, utils
+
+from synthetic import random_track
+
+
+def make_profile(size: int) -> profile.GPXProfile:
+    """Returns a synthetic profile of size points"""
+
+    latitude, longitude, elevation = random_track(size)
+    distance = utils.calculate_distance(latitude, longitude)
+    slope = utils.calculate_slope(distance, elevation)
+
+    return profile.GPXProfile("synthetic", distance, elevation, slope)
+
+
+def main_bench() -> None:
+    """Prints render latency percentiles for every size and format"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--formats", nargs="+", default=["png", "svg", "webp"])
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--slope", action="store_true", help="also draw slope segments")
+    parser.add_argument(
+        "--decimation",
+        nargs="+",
+        default=["minmax"],
+        help="decimation methods to compare: minmax, lttb, douglas-peucker or none",
+    )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="render with one ProfileRenderer per format instead of a figure per call",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'points':>8} {'format':>7} {'decimation':>16} "
+        f"{'p50 (ms)':>9} {'p90 (ms)':>9} {'size (kB)':>10}"
+    )
+    for size in args.sizes:
+        gpx_profile = make_profile(size)
+        for image_format in args.formats:
+            for decimation in args.decimation:
+                options = {
+                    "dpi": args.dpi,
+                    "image_format": image_format,
+                    "plot_slope": args.slope,
+                    "decimation": None if decimation == "none" else decimation,
+                }
+                if args.reuse:
+                    render = renderer.ProfileRenderer(**options).render
+                else:
+                    def render(gpx_profile, options=options):
+                        return main.render_profile(gpx_profile, **options)
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    image = render(gpx_profile)
+                    timings.append(time.perf_counter() - start)
+                p50, p90 = np.percentile(timings, [50, 90]) * 1e3
+                print(
+                    f"{size:>8} {image_format:>7} {decimation:>16} "
+                    f"{p50:>9.1f} {p90:>9.1f} {len(image) / 1e3:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main_bench()
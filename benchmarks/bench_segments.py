@@ -0,0 +1,106 @@
+"""
+Benchmark of slope segmentation and merging against the legacy loops
+
+Run with ``python benchmarks/bench_segments.py [--sizes 10000 1000000]``.
+The legacy merge loop is quadratic, it only runs up to --legacy-merge-max
+segments.
+"""
+
+import argparse
+
+import numpy as np
+
+from gpxprofpy import params, segments, utils
+
+from synthetic import random_track
+from timing import best_time
+
+
+def legacy_segments_end_indexes(slope: np.ndarray) -> tuple[list[int], list[int]]:
+    """Sign list and per-point loop as implemented before vectorization"""
+
+    slope_sign = [int(1 * sp + -1 * sn) for sp, sn in zip(slope > 0, slope < 0)]
+    segments_ends, segments_sign = [], []
+    for i, sg in enumerate(slope_sign[1:]):
+        try:
+            if (sg * slope_sign[i + 2]) <= 0 and sg != slope_sign[i + 2]:
+                segments_ends.append(i + 1)
+                segments_sign.append(sg)
+        except IndexError:
+            if sg != slope_sign[i]:
+                segments_ends.append(i + 1)
+                segments_sign.append(sg)
+
+    if segments_ends[-1] != len(slope_sign) - 1:
+        segments_ends.append(len(slope_sign) - 1)
+        segments_sign.append(slope_sign[-1])
+
+    return segments_ends, segments_sign
+
+
+def vectorized_segments_end_indexes(slope: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized sign and segmentation"""
+    return segments.find_segments_end_indexes(utils.get_slope_sign(slope))
+
+
+def legacy_merge_segments(slope_segments: list, threshold: float) -> list:
+    """Restart-from-zero merge passes as implemented before the single sweep"""
+
+    for find_first in (
+        segments.find_first_negative_mergeable_segment,
+        segments.find_first_positive_mergeable_segment,
+        segments.find_first_negative_mergeable_segment,
+    ):
+        slope_segments = list(slope_segments)
+        seg_to_merge = find_first(slope_segments, threshold)
+        while seg_to_merge is not None:
+            slope_segments = segments.merge_three_segments(slope_segments, seg_to_merge)
+            seg_to_merge = find_first(slope_segments, threshold)
+
+    return slope_segments
+
+
+def main() -> None:
+    """Prints a timing table of both segmentations"""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-merge-max", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'segments':>9} {'legacy (ms)':>12} {'vectorized (ms)':>16} {'speedup':>8}")
+    for size in args.sizes:
+        latitude, longitude, elevation = random_track(size)
+        distance = utils.calculate_distance(latitude, longitude)
+        slope = utils.calculate_slope(distance, elevation)
+
+        ends, _ = vectorized_segments_end_indexes(slope)
+        assert ends.tolist() == legacy_segments_end_indexes(slope)[0]
+        legacy = best_time(lambda: legacy_segments_end_indexes(slope), 1)
+        vectorized = best_time(lambda: vectorized_segments_end_indexes(slope), args.repeat)
+        print(
+            f"{size:>8} {len(ends):>9} {legacy * 1e3:>12.1f} {vectorized * 1e3:>16.2f}"
+            f" {legacy / vectorized:>8.0f}"
+        )
+
+    print(f"\n{'points':>8} {'segments':>9} {'legacy merge (ms)':>18} {'sweep merge (ms)':>17}")
+    for size in args.sizes:
+        latitude, longitude, elevation = random_track(size)
+        distance = utils.calculate_distance(latitude, longitude)
+        slope_segments = segments.get_all_slope_segments(distance, elevation, None)
+
+        sweep = best_time(
+            lambda: segments.merge_segments(slope_segments, params.SEUIL_MERGE), args.repeat
+        )
+        legacy = "skipped"
+        if len(slope_segments) <= args.legacy_merge_max:
+            legacy = best_time(
+                lambda: legacy_merge_segments(slope_segments, params.SEUIL_MERGE), 1
+            )
+            legacy = f"{legacy * 1e3:.1f}"
+        print(f"{size:>8} {len(slope_segments):>9} {legacy:>18} {sweep * 1e3:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Benchmark suite of every stage of the pipeline on synthetic GPX tracks
+
+Times extract_data, calculate_distance, calculate_slope,
+get_real_positive_slope_segments and the headless render separately, with
+their tracemalloc peak memory, and writes the results as JSON.
+
+Run with ``python benchmarks/bench_suite.py [--sizes 1000 1000000] [--output new.json]``,
+add ``--baseline old.json`` to compare with a previous run, or compare two result
+files without running with ``python benchmarks/bench_suite.py --compare old.json new.json``.
+Comparisons exit with status 1 when a stage is slower than --tolerance allows.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+
+import matplotlib
+import numpy as np
+
+from gpxprofpy import main, profile, segments, utils
+
+from synthetic import random_track, realistic_track, write_gpx
+from timing import best_time
+
+TRACKS = {"realistic": realistic_track, "random": random_track}
+FORMAT_VERSION = 1
+
+
+def stages(gpx_filename: str) -> list[tuple[str, object]]:
+    """Returns (name, function) of each stage, each stage working on the results
+    of the previous ones, computed once here"""
+
+    latitude, longitude, elevation = profile.extract_data(gpx_filename)
+    distance = utils.calculate_distance(latitude, longitude)
+    slope = utils.calculate_slope(distance, elevation)
+    gpx_profile = profile.GPXProfile("synthetic", distance, elevation, slope)
+
+    return [
+        ("extract_data", lambda: profile.extract_data(gpx_filename)),
+        ("calculate_distance", lambda: utils.calculate_distance(latitude, longitude)),
+        ("calculate_slope", lambda: utils.calculate_slope(distance, elevation)),
+        (
+            "get_real_positive_slope_segments",
+            lambda: segments.get_real_positive_slope_segments(distance, elevation),
+        ),
+        (
+            "render",
+            lambda: main.render_profile(gpx_profile, dpi=100, plot_slope=True),
+        ),
+    ]
+
+
+def peak_memory(func) -> int:
+    """Returns tracemalloc peak memory of a call, in bytes"""
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def run(sizes: list[int], repeat: int, track: str, seed: int) -> list[dict]:
+    """Returns one result per size and stage, printing them as they come"""
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            gpx_filename = os.path.join(tmp_dir, f"{track}_{size}.gpx")
+            write_gpx(gpx_filename, size, seed, TRACKS[track])
+            for stage, func in stages(gpx_filename):
+                seconds = best_time(func, repeat)
+                result = {
+                    "stage": stage,
+                    "points": size,
+                    "seconds": seconds,
+                    "points_per_second": size / seconds if seconds > 0 else None,
+                    "peak_bytes": peak_memory(func),
+                }
+                results.append(result)
+                print_result(result)
+
+    return results
+
+
+def environment() -> dict:
+    """Returns what a comparison between runs should be aware of"""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load(filename: str) -> dict:
+    """Returns results of a JSON file written by this suite"""
+
+    with open(filename, encoding="utf-8") as results_file:
+        data = json.load(results_file)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{filename} is not a version {FORMAT_VERSION} result file")
+
+    return data
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[dict]:
+    """Prints time and memory ratios of the stages run in both, returns the
+    results slower than baseline by more than tolerance"""
+
+    base = {(result["stage"], result["points"]): result for result in baseline["results"]}
+    regressions = []
+    print(
+        f"{'stage':>34} {'points':>8} {'base (ms)':>10} {'new (ms)':>10} "
+        f"{'time':>7} {'memory':>7}"
+    )
+    for result in current["results"]:
+        before = base.get((result["stage"], result["points"]))
+        if before is None:
+            continue
+        time_ratio = result["seconds"] / max(before["seconds"], 1e-12)
+        memory_ratio = result["peak_bytes"] / max(before["peak_bytes"], 1)
+        slower = time_ratio > 1 + tolerance
+        if slower:
+            regressions.append(result)
+        print(
+            f"{result['stage']:>34} {result['points']:>8} "
+            f"{before['seconds'] * 1e3:>10.2f} {result['seconds'] * 1e3:>10.2f} "
+            f"{time_ratio:>6.2f}x {memory_ratio:>6.2f}x{'  SLOWER' if slower else ''}"
+        )
+
+    return regressions
+
+
+def print_result(result: dict) -> None:
+    """Prints one result line"""
+
+    print(
+        f"{result['stage']:>34} {result['points']:>8} {result['seconds'] * 1e3:>10.2f} ms "
+        f"{result['peak_bytes'] / 1e6:>9.1f} MB"
+    )
+
+
+def main_bench() -> int:
+    """Runs or compares benchmarks, returns exit status"""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--track", choices=list(TRACKS), default="realistic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="JSON file to write results to")
+    parser.add_argument("--baseline", help="JSON results to compare this run with")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="compare two JSON results without running",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="slowdown ratio above which a stage is a regression (default: 0.1)",
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (load(filename) for filename in args.compare)
+        return 1 if compare(baseline, current, args.tolerance) else 0
+
+    current = {
+        "version": FORMAT_VERSION,
+        "environment": environment(),
+        "options": {"repeat": args.repeat, "track": args.track, "seed": args.seed},
+        "results": run(args.sizes, args.repeat, args.track, args.seed),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as results_file:
+            json.dump(current, results_file, indent=2)
+    if args.baseline:
+        return 1 if compare(load(args.baseline), current, args.tolerance) else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_bench())
@@ -0,0 +1,75 @@
+"""
+Synthetic tracks used by the benchmarks
+"""
+
+import numpy as np
+
+
+def random_track(
+    n_points: int, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns latitude, longitude and elevation of a random walk with ~3 m steps"""
+
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 2e-5, (2, n_points))
+    latitude = 45 + np.cumsum(steps[0])
+    longitude = 6 + np.cumsum(steps[1])
+    elevation = 1000 + np.cumsum(rng.normal(0, 0.5, n_points))
+
+    return latitude, longitude, elevation
+
+
+def realistic_track(
+    n_points: int, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns latitude, longitude and elevation of a ~3 m step track over
+    climbs and descents, with correlated GPS elevation noise
+
+    Grade is constant over sections of 100 to 1500 points, up to 15 % and
+    mostly towards 1000 m so that elevation stays realistic. Noise is white
+    noise smoothed over ~10 points plus 1 m jitter, rounded to 0.1 m as GPS
+    devices record it.
+    """
+
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.05, n_points))
+    step = rng.uniform(2, 4, n_points)  # m
+    latitude = 45 + np.cumsum(step * np.cos(heading)) / 111_195
+    longitude = 6 + np.cumsum(step * np.sin(heading)) / (111_195 * np.cos(np.radians(45)))
+
+    # Climb back towards 1000 m more often than away from it
+    sections = rng.integers(100, 1500, n_points // 100 + 1)
+    grades = np.abs(rng.normal(0, 0.05, len(sections))).clip(max=0.15)
+    height = 1000.0
+    for i, section in enumerate(sections):
+        towards = -1 if height > 1000 else 1
+        away = rng.random() < 0.3 and abs(height - 1000) < 600
+        grades[i] *= -towards if away else towards
+        height += grades[i] * 3 * section
+    grade = np.repeat(grades, sections)[:n_points]
+    kernel = np.exp(-np.arange(30) / 10)
+    drift = np.convolve(rng.normal(0, 1, n_points), kernel / kernel.sum(), "same")
+    noise = 3 * drift + rng.normal(0, 1, n_points)
+    elevation = np.round(1000 + np.cumsum(grade * step) + noise, 1)
+
+    return latitude, longitude, elevation
+
+
+def write_gpx(filename: str, n_points: int, seed: int = 0, track=random_track) -> None:
+    """Writes a track of n_points made by track to a GPX file"""
+
+    latitude, longitude, elevation = track(n_points, seed)
+    start = np.datetime64("2024-06-01T06:00:00")
+    with open(filename, "w", encoding="utf-8") as gpx_file:
+        gpx_file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="gpxprofpy-benchmarks" '
+            'xmlns="http://www.topografix.com/GPX/1/1">\n'
+            "<trk><name>synthetic</name><trkseg>\n"
+        )
+        gpx_file.writelines(
+            f'<trkpt lat="{lat:.7f}" lon="{lon:.7f}"><ele>{ele:.1f}</ele>'
+            f"<time>{start + np.timedelta64(i, 's')}Z</time></trkpt>\n"
+            for i, (lat, lon, ele) in enumerate(zip(latitude, longitude, elevation))
+        )
+        gpx_file.write("</trkseg></trk>\n</gpx>\n")
@@ -0,0 +1,17 @@
+"""
+Timing helpers shared by the benchmarks
+"""
+
+import time
+
+
+def best_time(func, repeat: int) -> float:
+    """Returns best wall time of repeat calls, in seconds"""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
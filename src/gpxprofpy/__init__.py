@@ -3,10 +3,32 @@
 
 Contains tool for plotting a GPX elevation profile.
 
-Import plot_gpx_profile function to use
+Import plot_gpx_profile function to use, plot_gpx_profiles to render many
+files on a pool of processes, or render_profile to get image bytes without display
+
+Plotting modules, and matplotlib with them, are only imported on first use of
+these functions: parsing and analysis modules such as profile, segments or
+stream never import matplotlib.
 """
 
-from . import main as prf
+import importlib
+
+# Lazy attributes: name -> (module, attribute or None for the module itself)
+_LAZY = {
+    "prf": (".main", None),
+    "plot_gpx_profiles": (".batch", "plot_gpx_profiles"),
+    "render_profile": (".main", "render_profile"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY[name]
+    module = importlib.import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
 
 
 def plot_gpx_profile(
@@ -50,6 +72,8 @@ def plot_gpx_profile(
         Plots elevation profile and saves a png file
     """
 
+    from . import main as prf
+
     gpx_file = prf.prf.GPXFile(filename)
     gpx_profile = gpx_file.profile()
     prf.plot_profile(gpx_profile, plot_slope, plot_points, save_fig)
@@ -0,0 +1,9 @@
+"""
+GPX profile plotter command line entry point
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+GPX profile plotter batch processing
+"""
+
+import os
+import sys
+import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import matplotlib
+
+from . import profile as prf
+from .renderer import ProfileRenderer
+
+
+@dataclass
+class BatchResult:
+    """Result of the rendering of one GPX file"""
+
+    filename: str
+    output: str | None = None
+    points: int = 0
+    elapsed: float = 0
+    error: str | None = None
+
+
+def find_gpx_files(paths: list[str]) -> list[str]:
+    """Returns GPX files given directly or found recursively in directories"""
+    return [gpx_filename for gpx_filename, _ in find_gpx_inputs(paths)]
+
+
+def find_gpx_inputs(paths: list[str]) -> list[tuple[str, str]]:
+    """Returns GPX files given directly or found recursively in directories, with
+    their name relative to the directory they were found in"""
+
+    gpx_inputs = []
+    for path in paths:
+        if not os.path.isdir(path):
+            gpx_inputs.append((path, os.path.basename(path)))
+            continue
+        for directory, _, filenames in os.walk(path):
+            gpx_inputs.extend(
+                (
+                    os.path.join(directory, filename),
+                    os.path.relpath(os.path.join(directory, filename), path),
+                )
+                for filename in sorted(filenames)
+                if filename.lower().endswith(".gpx")
+            )
+
+    return gpx_inputs
+
+
+def output_filename(
+    gpx_filename: str,
+    output_dir: str | None,
+    extension: str,
+    relative_name: str | None = None,
+) -> str:
+    """Returns plot file name of a GPX file, next to it or in output_dir at its
+    relative name (default: its base name)"""
+
+    name = os.path.splitext(gpx_filename)[0]
+    if output_dir is not None:
+        relative_name = relative_name or os.path.basename(gpx_filename)
+        name = os.path.join(output_dir, os.path.splitext(relative_name)[0])
+
+    return f"{name}.{extension}"
+
+
+def render_file(
+    gpx_filename: str,
+    output_dir: str | None = None,
+    plot_slope: bool = False,
+    plot_points: bool = False,
+    dpi: int = 350,
+    image_format: str = "png",
+    relative_name: str | None = None,
+) -> BatchResult:
+    """Parses, analyses and renders one GPX file, reporting errors in the result
+
+    Files rendered with the same options in a process share one figure.
+    """
+
+    start = time.perf_counter()
+    result = BatchResult(gpx_filename)
+    try:
+        profile = prf.GPXFile(gpx_filename).profile()
+        result.points = len(profile.distance)
+        result.output = output_filename(
+            gpx_filename, output_dir, image_format, relative_name
+        )
+        renderer = get_renderer(plot_slope, plot_points, dpi, image_format)
+        renderer.render(profile, result.output)
+    except Exception as exc:  # Isolate any failure to its file
+        result.output = None
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.elapsed = time.perf_counter() - start
+
+    return result
+
+
+@lru_cache(maxsize=8)
+def get_renderer(
+    plot_slope: bool, plot_points: bool, dpi: int, image_format: str
+) -> ProfileRenderer:
+    """Returns the renderer of the process for these options"""
+
+    return ProfileRenderer(
+        dpi=dpi,
+        image_format=image_format,
+        plot_slope=plot_slope,
+        plot_points=plot_points,
+    )
+
+
+def plot_gpx_profiles(
+    paths: list[str],
+    workers: int | None = None,
+    output_dir: str | None = None,
+    plot_slope: bool = False,
+    plot_points: bool = False,
+    dpi: int = 350,
+    image_format: str = "png",
+    progress: bool = True,
+) -> list[BatchResult]:
+    """Renders GPX files and directories of GPX files on a pool of processes
+
+    Plots are saved as image_format files next to GPX files, or in output_dir
+    at their path relative to the given directory they were found in. Raises
+    ValueError before rendering when two files would be saved to the same
+    plot. A failing file does not stop the batch, its error is reported in its
+    result.
+    """
+
+    gpx_inputs = find_gpx_inputs(paths)
+    gpx_files = [gpx_filename for gpx_filename, _ in gpx_inputs]
+    outputs = {}
+    for gpx_filename, relative_name in gpx_inputs:
+        output = os.path.normcase(
+            os.path.abspath(
+                output_filename(gpx_filename, output_dir, image_format, relative_name)
+            )
+        )
+        if output in outputs and outputs[output] != gpx_filename:
+            raise ValueError(
+                f"{outputs[output]} and {gpx_filename} would both be plotted to {output}"
+            )
+        outputs[output] = gpx_filename
+    if output_dir is not None:
+        for output in outputs:
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(
+                render_file,
+                gpx_filename,
+                output_dir,
+                plot_slope,
+                plot_points,
+                dpi,
+                image_format,
+                relative_name,
+            ): i
+            for i, (gpx_filename, relative_name) in enumerate(gpx_inputs)
+        }
+        results = [None] * len(gpx_files)
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as exc:  # Worker crash
+                results[i] = BatchResult(gpx_files[i], error=f"{type(exc).__name__}: {exc}")
+            if progress:
+                print_progress(results[i], done, len(gpx_files))
+
+    if progress:
+        print_summary(results, time.perf_counter() - start)
+
+    return results
+
+
+def print_progress(result: BatchResult, done: int, total: int) -> None:
+    """Prints one line per rendered file on stderr"""
+
+    status = f"error: {result.error}" if result.error else f"{result.points} points"
+    print(
+        f"[{done}/{total}] {result.filename} ({result.elapsed:.2f} s) {status}",
+        file=sys.stderr,
+    )
+
+
+def print_summary(results: list[BatchResult], elapsed: float) -> None:
+    """Prints batch throughput on stderr"""
+
+    failed = sum(1 for result in results if result.error)
+    points = sum(result.points for result in results)
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f"{len(results)} files ({failed} failed), {points} points in {elapsed:.2f} s: "
+        f"{len(results) / elapsed:.1f} files/s, {points / elapsed:.0f} points/s",
+        file=sys.stderr,
+    )
+
+
+def _init_worker() -> None:
+    """Selects the headless backend in worker processes"""
+    matplotlib.use("Agg")
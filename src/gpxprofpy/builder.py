@@ -0,0 +1,173 @@
+"""
+GPX profile plotter incremental profile builder
+"""
+
+import numpy as np
+
+from . import utils, params, segments
+from . import profile as prf
+from .incremental import SegmentTracker
+
+COLUMNS = ("latitude", "longitude", "elevation", "distance", "slope")
+
+
+class ProfileBuilder:
+    """Builds a profile from points arriving over time, for live tracking
+
+    Points are stored in buffers growing by doubling. Appending k points
+    computes their distance and slope in O(k), plus the points of the slope
+    window they change. Segments are updated on demand by a SegmentTracker,
+    from the slope of the profile: with a slope window, the tracker only gets
+    the points whose window no later point can reach, and the last points are
+    segmented on a copy of it.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        slope_window: float = 0,
+        merge_threshold: float = params.SEUIL,
+        capacity: int = 1024,
+    ):
+        self.name = name
+        self.slope_window = slope_window
+        self.merge_threshold = merge_threshold
+        self._buffers = {column: np.empty(max(capacity, 1)) for column in COLUMNS}
+        self._size = 0
+
+        self._tracker = SegmentTracker(merge_threshold)
+        self._segmented = 0  # number of points segmented
+
+    def __len__(self):
+        return self._size
+
+    def append(self, latitude: float, longitude: float, elevation: float = np.nan) -> None:
+        """Appends one point"""
+        self.extend([latitude], [longitude], [elevation])
+
+    def extend(
+        self, latitude: np.ndarray, longitude: np.ndarray, elevation: np.ndarray
+    ) -> None:
+        """Appends points"""
+
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        elevation = np.asarray(elevation, dtype=np.float64)
+        if not len(latitude) == len(longitude) == len(elevation):
+            raise ValueError("latitude, longitude and elevation lengths differ")
+
+        start, end = self._size, self._size + len(latitude)
+        if end == start:
+            return
+        self._reserve(end)
+        self._buffers["latitude"][start:end] = latitude
+        self._buffers["longitude"][start:end] = longitude
+        self._buffers["elevation"][start:end] = elevation
+
+        # Accumulate from the last known point, as a single cumsum would
+        first = max(start - 1, 0)
+        distance = self._buffers["distance"]
+        deltas = utils.calculate_distance_deltas(
+            self._buffers["latitude"][first:end], self._buffers["longitude"][first:end]
+        )
+        distance[start:end] = np.cumsum(
+            np.concatenate((distance[first : first + 1] if start else [0], deltas))
+        )[1 if start else 0 :]
+
+        self._size = end
+        self._update_slope(start)
+
+    def profile(self) -> prf.GPXProfile:
+        """Returns profile of the points so far
+
+        Its arrays are views of the builder buffers, the slope of the last
+        points may change when a slope window is used.
+        """
+
+        columns = {column: self._buffers[column][: self._size] for column in COLUMNS}
+        return prf.GPXProfile(self.name, **columns)
+
+    def real_slope_segments(self) -> list[segments.SlopeSegment]:
+        """Returns merged slope segments, as segments.get_real_slope_segments"""
+
+        tracker = self._update_segments()
+        profile = self.profile()
+
+        return [
+            segments.SlopeSegment(profile, start, end, sign)
+            for start, end, sign, *_ in tracker.segments
+        ]
+
+    def positive_slope_segments(
+        self, threshold: float = params.SEUIL
+    ) -> list[segments.SlopeSegment]:
+        """Returns positive slope segments longer than threshold, as
+        segments.get_real_positive_slope_segments"""
+
+        return [
+            seg
+            for seg in self.real_slope_segments()
+            if seg.sign == 1 and seg.get_size() > threshold
+        ]
+
+    def _reserve(self, size: int) -> None:
+        """Grows buffers to hold size points"""
+
+        capacity = len(self._buffers["distance"])
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for column, buffer in self._buffers.items():
+            grown = np.empty(capacity)
+            grown[: self._size] = buffer[: self._size]
+            self._buffers[column] = grown
+
+    def _update_slope(self, start: int) -> None:
+        """Computes slope of points from start, and of previous points whose
+        slope window reaches them"""
+
+        distance = self._buffers["distance"][: self._size]
+        elevation = self._buffers["elevation"][: self._size]
+        if self.slope_window > 0 and start > 0:
+            half_window = self.slope_window / 2
+            start = np.searchsorted(distance, distance[start - 1] - half_window)
+            first = np.searchsorted(distance, distance[start] - half_window)
+        else:
+            first = max(start - 1, 0)
+
+        slope = utils.calculate_slope(
+            distance[first:], elevation[first:], self.slope_window
+        )
+        self._buffers["slope"][start : self._size] = slope[start - first :]
+
+    def _update_segments(self) -> SegmentTracker:
+        """Segments points appended since last update, returns the tracker of
+        all the points"""
+
+        distance = self._buffers["distance"][: self._size]
+        settled = self._size
+        if self.slope_window > 0 and self._size:
+            # Later points are farther than the last one, out of these windows
+            settled = int(
+                np.searchsorted(distance, distance[-1] - self.slope_window / 2)
+            )
+        settled = max(settled, self._segmented)
+
+        self._add_points(self._tracker, self._segmented, settled)
+        self._segmented = settled
+        if settled == self._size:
+            return self._tracker
+
+        tracker = self._tracker.copy()
+        self._add_points(tracker, settled, self._size)
+        return tracker
+
+    def _add_points(self, tracker: SegmentTracker, start: int, end: int) -> None:
+        """Adds points from start to end to tracker"""
+
+        if end > start:
+            tracker.add(
+                self._buffers["distance"][start:end],
+                self._buffers["elevation"][start:end],
+                self._buffers["slope"][start:end],
+            )
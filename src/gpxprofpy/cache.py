@@ -0,0 +1,134 @@
+"""
+GPX profile plotter on-disk profile cache
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from . import utils
+
+
+class ProfileCache:
+    """Size-bounded LRU cache of computed profile arrays, stored as .npz files
+
+    Entries are keyed by the GPX content hash and the algorithms versions.
+    Recency is tracked with files modification times, so the cache directory
+    can be shared between processes.
+    """
+
+    suffix = ".npz"
+
+    def __init__(self, directory: str, max_size: int = 512 * 2**20):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, gpx_filename: str, **options) -> str:
+        """Returns cache key of a GPX file for the given computation options"""
+
+        digest = hashlib.blake2b(digest_size=20)
+        with open(gpx_filename, "rb") as gpx_file:
+            for block in iter(lambda: gpx_file.read(2**20), b""):
+                digest.update(block)
+        digest.update(
+            repr(
+                (utils.DISTANCE_VERSION, utils.SLOPE_VERSION, sorted(options.items()))
+            ).encode()
+        )
+
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """Returns path of entry file"""
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key: str) -> dict[str, np.ndarray] | None:
+        """Returns cached arrays, or None on a miss"""
+
+        path = self.path(key)
+        try:
+            with np.load(path) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+            os.utime(path)  # Mark as most recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):  # Truncated or corrupted entry
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return arrays
+
+    def put(self, key: str, arrays: dict[str, np.ndarray]) -> None:
+        """Stores arrays, then evicts least recently used entries above max size"""
+
+        file_descriptor, tmp_path = tempfile.mkstemp(
+            suffix=".tmp", dir=self.directory
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as tmp_file:
+                np.savez(tmp_file, **arrays)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:  # Do not leave a temporary file evict cannot see
+            os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def invalidate(self, key: str) -> bool:
+        """Removes an entry, returns whether it existed"""
+
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Removes all entries"""
+
+        for entry in self.entries():
+            os.remove(entry.path)
+
+    def entries(self) -> list[os.DirEntry]:
+        """Returns cache entries, least recently used first"""
+
+        with os.scandir(self.directory) as scan:
+            entries = [entry for entry in scan if entry.name.endswith(self.suffix)]
+
+        return sorted(entries, key=lambda entry: entry.stat().st_mtime_ns)
+
+    def size(self) -> int:
+        """Returns total size of entries, in bytes"""
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self) -> None:
+        """Removes least recently used entries until cache fits in max size"""
+
+        entries = self.entries()
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.max_size:
+                break
+            size -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:  # Already evicted by another process
+                pass
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit and miss counters, number of entries and total size"""
+
+        entries = self.entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "size": sum(entry.stat().st_size for entry in entries),
+        }
@@ -0,0 +1,84 @@
+"""
+GPX profile plotter command line interface
+"""
+
+import argparse
+
+from . import batch
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Returns command line parser"""
+
+    parser = argparse.ArgumentParser(
+        prog="gpxprofpy", description="Plot GPX elevation profiles"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser(
+        "render", help="render GPX files and directories of GPX files to images"
+    )
+    render.add_argument("paths", nargs="+", help="GPX files or directories")
+    render.add_argument("-o", "--output-dir", help="output directory (default: next to GPX files)")
+    render.add_argument("-j", "--workers", type=int, help="number of worker processes (default: CPU count)")
+    render.add_argument("--slope", action="store_true", help="plot slope segments")
+    render.add_argument("--points", action="store_true", help="plot remarquable points")
+    render.add_argument("--dpi", type=int, default=350, help="output resolution (default: 350)")
+    render.add_argument(
+        "--format",
+        default="png",
+        choices=("png", "svg", "webp", "pdf"),
+        help="image format (default: png)",
+    )
+    render.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+
+    serve = commands.add_parser(
+        "serve", help="render GPX files sent over HTTP on a pool of warm processes"
+    )
+    serve.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    serve.add_argument("-j", "--workers", type=int, help="number of worker processes (default: CPU count)")
+    serve.add_argument(
+        "--cache-size",
+        type=int,
+        default=128,
+        help="number of recent images kept in memory (default: 128)",
+    )
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs command line, returns exit status"""
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "render":
+        try:
+            results = batch.plot_gpx_profiles(
+                args.paths,
+                workers=args.workers,
+                output_dir=args.output_dir,
+                plot_slope=args.slope,
+                plot_points=args.points,
+                dpi=args.dpi,
+                image_format=args.format,
+                progress=not args.quiet,
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        return 1 if any(result.error for result in results) else 0
+
+    if args.command == "serve":
+        import asyncio
+
+        from . import service
+
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.workers, args.cache_size))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    return 2
@@ -0,0 +1,145 @@
+"""
+GPX profile plotter columnar profile format
+
+A profile file starts with an 8 bytes magic, a little-endian uint32 header
+length and a JSON header describing the columns. Each column is then stored
+contiguously, aligned on 64 bytes, so it can be memory-mapped on its own.
+"""
+
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from . import profile as prf
+
+MAGIC = b"GPXPROF\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+SUFFIX = ".gpxprof"
+
+
+class MappedGPXProfile(prf.GPXProfile):
+    """GPX profile whose columns are memory-mapped from a columnar file
+
+    Summary values come from the header, so they do not read any column page.
+    """
+
+    def __init__(self, header: dict, **columns: np.ndarray):
+        super().__init__(header["name"], **columns)
+        self.header = header
+
+    def max_distance(self) -> float:
+        """Returns max distance of profile, from header"""
+        return self.header["max_distance"]
+
+    def max_elevation(self) -> float:
+        """Returns max elevation of profile, from header"""
+        return self.header["max_elevation"]
+
+
+def write_profile(profile: prf.GPXProfile, filename: str) -> None:
+    """Writes profile to a columnar file"""
+
+    columns = {
+        name: np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        for name, array in profile.arrays().items()
+    }
+    header = {
+        "version": FORMAT_VERSION,
+        "name": profile.name,
+        "points": len(profile.distance),
+        "max_distance": float(profile.max_distance()),
+        "max_elevation": float(profile.max_elevation()),
+        "columns": [],
+    }
+
+    # Offsets depend on header size, which depends on offsets: lay columns out
+    # after a header size estimate, then grow the estimate until it fits
+    header_size = ALIGNMENT
+    while True:
+        offset = header_size
+        header["columns"] = []
+        for name, array in columns.items():
+            header["columns"].append(
+                {
+                    "name": name,
+                    "dtype": array.dtype.str,
+                    "length": len(array),
+                    "offset": offset,
+                }
+            )
+            offset = _align(offset + array.nbytes)
+        encoded_header = json.dumps(header).encode("utf-8")
+        prefix_size = len(MAGIC) + 4 + len(encoded_header)
+        if prefix_size <= header_size:
+            break
+        header_size = _align(prefix_size)
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    file_descriptor, tmp_filename = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    with os.fdopen(file_descriptor, "wb") as profile_file:
+        profile_file.write(MAGIC + struct.pack("<I", len(encoded_header)))
+        profile_file.write(encoded_header)
+        for column, array in zip(header["columns"], columns.values()):
+            profile_file.write(b"\0" * (column["offset"] - profile_file.tell()))
+            profile_file.write(array.tobytes())
+    os.replace(tmp_filename, filename)
+
+
+def read_header(filename: str) -> dict:
+    """Reads header of a columnar profile file"""
+
+    with open(filename, "rb") as profile_file:
+        prefix = profile_file.read(len(MAGIC) + 4)
+        if len(prefix) < len(MAGIC) + 4 or prefix[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{filename} is not a columnar profile file")
+        (header_length,) = struct.unpack("<I", prefix[len(MAGIC) :])
+        header = json.loads(profile_file.read(header_length).decode("utf-8"))
+
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported columnar profile version {header['version']} in {filename}"
+        )
+    return header
+
+
+def open_profile(filename: str) -> MappedGPXProfile:
+    """Opens a columnar profile file, memory-mapping its columns read-only"""
+
+    header = read_header(filename)
+    columns = {
+        column["name"]: (
+            np.memmap(
+                filename,
+                dtype=np.dtype(column["dtype"]),
+                mode="r",
+                offset=column["offset"],
+                shape=(column["length"],),
+            )
+            if column["length"] > 0
+            else np.zeros(0, dtype=np.dtype(column["dtype"]))
+        )
+        for column in header["columns"]
+    }
+
+    return MappedGPXProfile(header, **columns)
+
+
+def convert_gpx(
+    gpx_filename: str, filename: str | None = None, gaps: str = "bridge"
+) -> str:
+    """Converts GPX file to a columnar profile file, returns its name"""
+
+    if filename is None:
+        filename = gpx_filename.replace(".gpx", "") + SUFFIX
+    write_profile(prf.read_gpx_file(gpx_filename, gaps), filename)
+
+    return filename
+
+
+def _align(offset: int) -> int:
+    """Returns offset rounded up to the next alignment boundary"""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
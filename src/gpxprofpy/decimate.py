@@ -0,0 +1,129 @@
+"""
+GPX profile plotter level-of-detail decimation
+"""
+
+import heapq
+
+import numpy as np
+
+
+def point_budget(figsize: tuple[float, float], dpi: float) -> int:
+    """Returns number of points worth drawing on a figure: a min and a max per
+    pixel column"""
+    return int(2 * figsize[0] * dpi)
+
+
+def minmax_indexes(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """Returns indexes of the lowest and highest point of each of budget / 2
+    buckets of x, plus first and last points"""
+
+    size = len(x)
+    buckets = max(budget // 2, 1)
+    span = x[-1] - x[0] if size else 0
+    if size <= budget or span <= 0:
+        return np.arange(size)
+
+    bucket = np.minimum(((x - x[0]) * (buckets / span)).astype(np.intp), buckets - 1)
+    order = np.lexsort((y, bucket))
+    firsts = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+    lasts = np.append(firsts[1:], size) - 1
+
+    return np.unique(np.concatenate(([0, size - 1], order[firsts], order[lasts])))
+
+
+def lttb_indexes(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """Returns indexes of budget points chosen by Largest Triangle Three Buckets"""
+
+    size = len(x)
+    if size <= budget or budget < 3:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, budget - 1).astype(np.intp)
+    edges = np.append(edges, size)
+    indexes = np.empty(budget, dtype=np.intp)
+    indexes[0], indexes[-1] = 0, size - 1
+    selected = 0
+    for i in range(budget - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        next_x = x[next_start:next_end].mean()
+        next_y = np.nanmean(y[next_start:next_end]) if next_end > next_start else y[-1]
+        area = np.abs(
+            (x[selected] - next_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (next_y - y[selected])
+        )
+        selected = start + int(np.argmax(np.nan_to_num(area, nan=-1)))
+        indexes[i + 1] = selected
+
+    return indexes
+
+
+def douglas_peucker_indexes(
+    x: np.ndarray,
+    y: np.ndarray,
+    tolerance: float = 0,
+    budget: int | None = None,
+) -> np.ndarray:
+    """Returns indexes of points kept by Douglas-Peucker
+
+    Deviations are measured vertically from the chord, in y units. Ranges are
+    split farthest point first, until no deviation exceeds tolerance or budget
+    points are kept.
+    """
+
+    size = len(x)
+    budget = size if budget is None else max(budget, 2)
+    if size <= 2:
+        return np.arange(size)
+
+    keep = [0, size - 1]
+    ranges = []
+    _push_farthest(ranges, x, y, 0, size - 1)
+    while ranges and len(keep) < budget:
+        deviation, start, split, end = heapq.heappop(ranges)
+        if -deviation <= tolerance:
+            break
+        keep.append(split)
+        _push_farthest(ranges, x, y, start, split)
+        _push_farthest(ranges, x, y, split, end)
+
+    return np.sort(np.array(keep, dtype=np.intp))
+
+
+def _push_farthest(
+    ranges: list, x: np.ndarray, y: np.ndarray, start: int, end: int
+) -> None:
+    """Pushes range with its point farthest from the chord on the ranges heap"""
+
+    if end - start < 2:
+        return
+    inner_x = x[start + 1 : end]
+    run = x[end] - x[start]
+    ratio = (inner_x - x[start]) / run if run > 0 else np.zeros(len(inner_x))
+    deviation = np.abs(y[start + 1 : end] - (y[start] + (y[end] - y[start]) * ratio))
+    deviation = np.nan_to_num(deviation, nan=np.inf)  # Keep missing points apart
+    farthest = int(np.argmax(deviation))
+    heapq.heappush(ranges, (-deviation[farthest], start, start + 1 + farthest, end))
+
+
+def select_indexes(
+    x: np.ndarray,
+    y: np.ndarray,
+    budget: int,
+    method: str = "minmax",
+    tolerance: float | None = None,
+) -> np.ndarray:
+    """Returns sorted indexes of the points to draw
+
+    method is one of "minmax", "lttb" or "douglas-peucker". Douglas-Peucker
+    stops at budget points or when no deviation exceeds tolerance.
+    """
+
+    if method == "minmax":
+        return minmax_indexes(x, y, budget)
+    if method == "lttb":
+        return lttb_indexes(x, y, budget)
+    if method == "douglas-peucker":
+        return douglas_peucker_indexes(x, y, tolerance or 0, budget)
+
+    raise ValueError(f"Unknown decimation method {method!r}")
@@ -0,0 +1,409 @@
+"""
+GPX profile plotter incremental slope segmentation
+
+Segments are (start, end, sign, first, last, max_slope) tuples: first and last
+are (distance, weighted slope, ascent, descent) prefix sums at the start and end
+points, so statistics of a segment do not need its points.
+"""
+
+import copy
+from bisect import bisect_left
+
+import numpy as np
+
+from . import utils, params
+from .profile import ProfileStats
+
+
+class SegmentTracker:
+    """Slope segmentation of points arriving in order
+
+    Gives the same segments as segments.get_real_slope_segments on all the
+    points. Only the last raw segment changes when points are added, and each
+    merge pass only replays the merges it can affect, see MergePass. Segments
+    no future point can change are final: they can be popped, and merge passes
+    forget them so that memory is bounded by the unsettled end of the profile.
+    """
+
+    def __init__(self, merge_threshold: float = params.SEUIL):
+        self.merge_threshold = merge_threshold
+        self.passes = [MergePass(sign, merge_threshold) for sign in (-1, 1, -1)]
+
+        self.points = 0
+        self.segments = []  # merged segments not popped yet
+        self.final = 0  # number of final segments at the start of self.segments
+        self._segments_ids = []  # index of their first raw segment
+
+        self._last = None  # (distance, elevation, slope sign) of last point
+        self._totals = (0.0, 0.0, 0.0, 0.0)  # prefix sums at last point
+        self._first = None  # prefix sums at first point
+        self._max_slope = -np.inf
+        self._open = None  # last raw segment, which new points can extend
+        self._open_id = 0
+
+    def add(
+        self,
+        distance: np.ndarray,
+        elevation: np.ndarray,
+        slope: np.ndarray | None = None,
+    ) -> None:
+        """Adds points, distance continuing the distance of previous points
+
+        Slope of the points is from point to point when not given. A given
+        slope, for instance over a window, must not change with later points.
+        """
+
+        distance = np.asarray(distance, dtype=np.float64)
+        elevation = np.asarray(elevation, dtype=np.float64)
+        if len(distance) == 0:
+            return
+
+        # Steps from the last point, or from the first point of the profile
+        if self._last is None:
+            all_distance, all_elevation = distance, elevation
+        else:
+            all_distance = np.concatenate(([self._last[0]], distance))
+            all_elevation = np.concatenate(([self._last[1]], elevation))
+        if slope is None:
+            slope = utils.calculate_slope(all_distance, all_elevation)
+        elif self._last is not None:
+            # The slope of the last point only gives its sign, replaced below
+            slope = np.concatenate(([0.0], np.asarray(slope, dtype=np.float64)))
+        delta_distance, delta_elevation = np.diff(all_distance), np.diff(all_elevation)
+        prefix = np.column_stack(
+            [
+                np.cumsum(np.concatenate(([total], steps)))
+                for total, steps in zip(
+                    self._totals,
+                    (
+                        delta_distance,
+                        np.nan_to_num(slope[1:] * delta_distance),
+                        np.nan_to_num(np.maximum(delta_elevation, 0)),
+                        np.nan_to_num(np.maximum(-delta_elevation, 0)),
+                    ),
+                )
+            ]
+        )
+        prefix[:, 0] = all_distance  # distance itself rather than a sum of steps
+        steps_max = np.nan_to_num(slope, nan=-np.inf)
+        signs = utils.get_slope_sign(slope)
+        if self._last is not None:
+            signs[0] = self._last[2]
+
+        # Raw segments end where the sign changes, the first point being ignored
+        offset = self.points - 1 if self._last is not None else 0
+        ends = np.flatnonzero(np.diff(signs)) + offset
+        ends = ends[ends >= 1]
+        self.points += len(distance)
+        self._last = (distance[-1], elevation[-1], signs[-1])
+        self._first = self._first or tuple(prefix[0].tolist())
+        self._totals = tuple(prefix[-1].tolist())
+        self._max_slope = max(self._max_slope, float(steps_max[1:].max(initial=-np.inf)))
+
+        # Max slope of the steps of each raw segment, -inf for no step
+        rows = np.append(ends, self.points - 1) - offset
+        firsts = np.append(1, rows[:-1] + 1)
+        maxes = np.maximum.reduceat(np.append(steps_max, -np.inf), firsts)
+        maxes[firsts > rows] = -np.inf
+
+        nodes, node_id = [], self._open_id
+        start, first, max_slope = (
+            (0, tuple(prefix[0].tolist()), -np.inf)
+            if self._open is None
+            else (self._open[0], self._open[3], self._open[5])
+        )
+        for row, last, step_max, sign in zip(
+            rows.tolist(),
+            map(tuple, prefix[rows].tolist()),
+            maxes.tolist(),
+            signs[rows].tolist(),
+        ):
+            end = row + offset
+            nodes.append((node_id, (start, end, sign, first, last, max(max_slope, step_max))))
+            start, first, max_slope, node_id = end, last, -np.inf, node_id + 1
+
+        changed = self._open_id
+        self._open_id, self._open = nodes[-1]
+
+        for merge_pass in self.passes:
+            changed, nodes = merge_pass.update(changed, nodes)
+
+        kept = bisect_left(self._segments_ids, changed)
+        del self.segments[kept:], self._segments_ids[kept:]
+        self._segments_ids.extend(node_id for node_id, _ in nodes)
+        self.segments.extend(node for _, node in nodes)
+
+        # Raw segments only change from the open one on, then each pass bounds
+        # the ids its next pass may see changing
+        cut = self._open_id
+        for merge_pass in self.passes:
+            cut = merge_pass.final_before(cut)
+            merge_pass.prune(cut)
+        self.final = max(self.final, bisect_left(self._segments_ids, cut))
+        # Merges of the first pass that read no changed raw segment are final
+        self.passes[0].forget(self._open_id)
+
+    def finish(self) -> None:
+        """Marks all segments final, once no point follows"""
+        self.final = len(self.segments)
+
+    def stats(self) -> ProfileStats:
+        """Returns statistics of all the points, as GPXProfile.stats"""
+
+        if self._open is None:
+            return ProfileStats(0.0, 0.0, 0.0, 0.0, 0.0)
+        return segment_stats(
+            (0, self.points - 1, 0, self._first, self._totals, self._max_slope)
+        )
+
+    def copy(self) -> "SegmentTracker":
+        """Returns a tracker points can be added to without changing this one"""
+
+        tracker = copy.copy(self)
+        tracker.passes = [merge_pass.copy() for merge_pass in self.passes]
+        tracker.segments = list(self.segments)
+        tracker._segments_ids = list(self._segments_ids)
+        return tracker
+
+    def pop_final(self) -> list[tuple]:
+        """Returns final segments, which are then forgotten"""
+
+        final = self.segments[: self.final]
+        del self.segments[: self.final], self._segments_ids[: self.final]
+        self.final = 0
+        return final
+
+
+class MergePass:
+    """Merge pass of segments of a sign, updated when its last input segments
+    change
+
+    Gives the same result as segments.merge_signed_segments on the whole input.
+    Segments are identified by the index of their first raw segment, so ids
+    follow the segments order. Merges are logged with the last id their
+    decision read. When input segments from an id change, the merges that read
+    them and every merge after those are undone. Merges before them are merges
+    of the new input too, so the sweep resumes 3 segments before the first
+    changed one.
+    """
+
+    def __init__(self, sign: int, threshold: float):
+        self.sign = sign
+        self.threshold = threshold
+
+        self.nodes = {}  # id: segment
+        self.next = {}
+        self.previous = {}
+        self.last = None
+
+        # Merges as (id, absorbed id, absorbed id, former segment), and running
+        # max of the last id read by merge decisions
+        self.log = []
+        self.read_max = []
+
+    def update(self, changed: int, nodes: list[tuple[int, tuple]]) -> tuple[int, list]:
+        """Replaces input segments from id changed by nodes, returns the id of
+        the first changed output segment and output segments from it"""
+
+        first_undone = bisect_left(self.read_max, changed)
+        modified = [node_id for node_id, _ in nodes[:1]]
+        for node_id, node1, node2, node in reversed(self.log[first_undone:]):
+            self._undo(node_id, node1, node2, node)
+            modified.append(node_id)
+        del self.log[first_undone:], self.read_max[first_undone:]
+
+        # Segments from changed on are all intact once merges are undone
+        if changed in self.nodes:
+            self.last = self.previous[changed]
+            node_id = changed
+            while node_id is not None:
+                following = self.next.pop(node_id)
+                del self.nodes[node_id], self.previous[node_id]
+                node_id = following
+            if self.last is not None:
+                self.next[self.last] = None
+        for node_id, node in nodes:
+            self.nodes[node_id] = node
+            self.previous[node_id] = self.last
+            self.next[node_id] = None
+            if self.last is not None:
+                self.next[self.last] = node_id
+            self.last = node_id
+
+        if not modified:
+            return changed, []
+
+        start = min(modified)
+        for _ in range(3):
+            if self.previous[start] is not None:
+                start = self.previous[start]
+        modified.extend(self._sweep(start))
+
+        # The smallest modified id is alive: its absorber would be smaller
+        output, node_id = [], min(modified)
+        while node_id is not None:
+            output.append((node_id, self.nodes[node_id]))
+            node_id = self.next[node_id]
+
+        return output[0][0], output
+
+    def copy(self) -> "MergePass":
+        """Returns a merge pass updated without changing this one"""
+
+        merge_pass = copy.copy(self)
+        for name in ("nodes", "next", "previous", "log", "read_max"):
+            setattr(merge_pass, name, copy.copy(getattr(self, name)))
+        return merge_pass
+
+    def final_before(self, changed: int) -> int:
+        """Returns id before which segments never change if input segments
+        only change from id changed on
+
+        An update undoes merges from the first one that read changed and sweeps
+        again from 3 segments before the first segment undone or changed. The
+        sweep may then merge backwards: a decision before a modified segment
+        only turns into a merge if that segment is shorter than the threshold,
+        and the merge makes it part of the merged segment. So merges backwards
+        go on only within the threshold distance before the sweep start, plus
+        the 2 segments the last of them may reach.
+        """
+
+        first_undone = bisect_left(self.read_max, changed)
+        anchor = min([changed] + [entry[0] for entry in self.log[first_undone:]])
+        start = self.last
+        while start is not None and start >= anchor:
+            start = self.previous[start]
+        if start is None:
+            return min(self.nodes, default=changed)
+
+        start = self._back(start, 2)
+        limit = self.nodes[start][3][0] - self.threshold
+        node_id = start
+        while (
+            self.previous[node_id] is not None
+            and self.nodes[self.previous[node_id]][3][0] > limit
+        ):
+            node_id = self.previous[node_id]
+
+        return self._back(node_id, 2)
+
+    def prune(self, cut: int) -> None:
+        """Forgets segments before id cut, which no merge crosses"""
+
+        self.nodes = {key: node for key, node in self.nodes.items() if key >= cut}
+        self.next = {key: node for key, node in self.next.items() if key >= cut}
+        self.previous = {key: node for key, node in self.previous.items() if key >= cut}
+        if self.nodes:
+            self.previous[min(self.nodes)] = None
+        else:
+            self.last = None
+
+        # Running max of the kept merges may be too high, undoing them early
+        # only makes replays longer
+        kept = [k for k, entry in enumerate(self.log) if entry[0] >= cut]
+        self.log = [self.log[k] for k in kept]
+        self.read_max = [self.read_max[k] for k in kept]
+
+    def forget(self, changed: int) -> None:
+        """Forgets merges that read no segment from id changed on, assuming no
+        segment before it changes anymore"""
+
+        first_kept = bisect_left(self.read_max, changed)
+        for _, node1, node2, _ in self.log[:first_kept]:
+            for node_id in (node1, node2):
+                del self.nodes[node_id], self.next[node_id], self.previous[node_id]
+        del self.log[:first_kept], self.read_max[:first_kept]
+
+    def _sweep(self, i: int) -> list[int]:
+        """Merges from segment i on as segments.merge_signed_segments does,
+        returns ids of merged segments"""
+
+        merged = []
+        while i is not None:
+            i1 = self.next[i]
+            i2 = self.next[i1] if i1 is not None else None
+            i3 = self.next[i2] if i2 is not None else None
+            if (
+                self.nodes[i][2] == self.sign
+                and i2 is not None
+                and (
+                    (
+                        _size(self.nodes[i1]) < self.threshold
+                        and self.nodes[i2][2] == self.sign
+                    )
+                    or (
+                        i3 is not None
+                        and _size(self.nodes[i1]) + _size(self.nodes[i2]) < self.threshold
+                        and self.nodes[i3][2] == self.sign
+                    )
+                )
+            ):
+                # Without i3, the decision depends on the end of the input
+                read = i3 if i3 is not None else float("inf")
+                self.read_max.append(max(self.read_max[-1], read) if self.log else read)
+                self.log.append((i, i1, i2, self.nodes[i]))
+
+                self.nodes[i] = _join(self.nodes[i], self.nodes[i1], self.nodes[i2])
+                self.next[i] = self.next[i2]
+                if self.next[i] is not None:
+                    self.previous[self.next[i]] = i
+                else:
+                    self.last = i
+                merged.append(i)
+                for _ in range(3):
+                    if self.previous[i] is not None:
+                        i = self.previous[i]
+            else:
+                i = i1
+
+        return merged
+
+    def _back(self, node_id: int, steps: int) -> int:
+        """Returns id steps segments before node_id, or of the first segment"""
+
+        for _ in range(steps):
+            if self.previous[node_id] is not None:
+                node_id = self.previous[node_id]
+        return node_id
+
+    def _undo(self, i: int, i1: int, i2: int, node: tuple) -> None:
+        """Undoes the merge of i1 and i2 into i"""
+
+        self.nodes[i] = node
+        following = self.next[i]
+        self.next[i] = i1
+        if following is not None:
+            self.previous[following] = i2
+        else:
+            self.last = i2
+
+
+def segment_stats(node: tuple) -> ProfileStats:
+    """Returns statistics of a segment, as GPXProfile.stats"""
+
+    start, end, _, first, last, max_slope = node
+    size = last[0] - first[0]
+    return ProfileStats(
+        size,
+        (last[1] - first[1]) / size if size > 0 else 0.0,
+        last[2] - first[2],
+        last[3] - first[3],
+        max_slope if end > start else 0.0,
+    )
+
+
+def _size(node: tuple) -> float:
+    """Returns size of a segment in km, as SlopeSegment.get_size"""
+    return node[4][0] - node[3][0]
+
+
+def _join(node: tuple, node1: tuple, node2: tuple) -> tuple:
+    """Returns segment made of three consecutive segments, with the first sign"""
+    return (
+        node[0],
+        node2[1],
+        node[2],
+        node[3],
+        node2[4],
+        max(node[5], node1[5], node2[5]),
+    )
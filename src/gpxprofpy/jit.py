@@ -0,0 +1,125 @@
+"""
+GPX profile plotter Numba compiled kernels
+
+Importing this module registers the "numba" kernel backend, see kernels. It
+raises ImportError when numba is not installed. Kernels are compiled on their
+first call and cached on disk next to this module. Vincenty distance is left
+to the numpy backend.
+"""
+
+import math
+
+import numba
+import numpy as np
+
+from . import kernels, segments, utils
+
+EARTH_RADIUS = utils.EARTH_RADIUS  # globals are compiled as constants
+
+
+@kernels.register("cosines_deltas", "numba")
+@numba.njit(cache=True)
+def _cosines_deltas(latitude, delta_lat, delta_lon):
+    """Spherical law of cosines between consecutive points, angles in radians"""
+
+    deltas = np.empty(len(delta_lon), dtype=delta_lon.dtype)
+    for i in range(len(delta_lon)):
+        cos_angle = math.sin(latitude[i]) * math.sin(latitude[i + 1]) + math.cos(
+            latitude[i]
+        ) * math.cos(latitude[i + 1]) * math.cos(delta_lon[i])
+        deltas[i] = EARTH_RADIUS * math.acos(min(max(cos_angle, -1.0), 1.0))
+
+    return deltas
+
+
+@kernels.register("haversine_deltas", "numba")
+@numba.njit(cache=True)
+def _haversine_deltas(latitude, delta_lat, delta_lon):
+    """Haversine formula between consecutive points, angles in radians"""
+
+    deltas = np.empty(len(delta_lon), dtype=delta_lon.dtype)
+    for i in range(len(delta_lon)):
+        half_chord = (
+            math.sin(delta_lat[i] / 2) ** 2
+            + math.cos(latitude[i])
+            * math.cos(latitude[i + 1])
+            * math.sin(delta_lon[i] / 2) ** 2
+        )
+        deltas[i] = 2 * EARTH_RADIUS * math.asin(math.sqrt(min(half_chord, 1.0)))
+
+    return deltas
+
+
+@kernels.register("steps_slope", "numba")
+@numba.njit(cache=True)
+def _steps_slope(distance, elevation):
+    """Slope of the step leading to each point, 0 for the first point"""
+
+    slope = np.zeros(len(distance))
+    for i in range(1, len(distance)):
+        delta_dist = distance[i] - distance[i - 1]
+        delta_ele = elevation[i] - elevation[i - 1]
+        if math.isnan(delta_ele):
+            slope[i] = np.nan
+        elif delta_dist > 0:
+            slope[i] = 0.1 * delta_ele / delta_dist
+
+    return slope
+
+
+@kernels.register("segments_ends", "numba")
+@numba.njit(cache=True)
+def _segments_ends(slope_sign):
+    """Returns indexes of segments ends of a non empty slope sign"""
+
+    count = len(slope_sign)
+    ends = np.empty(count, dtype=np.intp)
+    k = 0
+    for i in range(1, count - 1):
+        if slope_sign[i + 1] != slope_sign[i]:
+            ends[k] = i
+            k += 1
+    ends[k] = count - 1
+
+    return ends[: k + 1]
+
+
+_merge_loop = numba.njit(cache=True)(segments._merge_loop)
+
+
+@kernels.register("merge_sweep", "numba")
+def _merge_sweep(start_distance, end_distance, signs, threshold, sign):
+    """Merge sweep of segments.merge_signed_segments, see segments._merge_sweep"""
+
+    count = len(signs)
+    tails = np.arange(count, dtype=np.intp)
+    next_index = np.arange(1, count + 1, dtype=np.intp)
+    previous_index = np.arange(-1, count - 1, dtype=np.intp)
+    merges, steps = _merge_loop(
+        start_distance,
+        end_distance,
+        signs,
+        threshold,
+        sign,
+        tails,
+        next_index,
+        previous_index,
+    )
+    heads = _linked_indexes(next_index)
+
+    return heads, tails[heads], merges, steps
+
+
+@numba.njit(cache=True)
+def _linked_indexes(next_index):
+    """Returns indexes of the linked list starting at 0"""
+
+    count = len(next_index)
+    indexes = np.empty(count, dtype=np.intp)
+    k, i = 0, 0
+    while i < count:
+        indexes[k] = i
+        k += 1
+        i = next_index[i]
+
+    return indexes[:k]
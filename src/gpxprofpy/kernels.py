@@ -0,0 +1,114 @@
+"""
+GPX profile plotter compute kernel backends
+
+The hot loops of the pipeline (distance between points, point to point slope,
+slope segments ends and merge sweeps) are kernels looked up by name in the
+current backend:
+
+- "numpy" holds the reference kernels, registered by the modules defining them;
+- "numba" compiles them with Numba, from the gpxprofpy.jit module, loaded on
+  first selection. It is only available when numba is installed.
+
+A backend without a kernel falls back to the numpy one. The backend is chosen
+with set_backend or use_backend, or with the GPXPROFPY_BACKEND environment
+variable, which child processes inherit. The variable is read on first use of
+the registry, once the modules defining the reference kernels are imported.
+"auto" selects numba when it is installed. numpy is the default, as compiling
+kernels on first call does not pay off on short runs.
+"""
+
+import importlib
+import os
+import warnings
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+REFERENCE = "numpy"
+
+# Module registering the kernels of a backend when imported
+_LOADERS = {"numba": ".jit"}
+
+_kernels: dict[str, dict[str, Callable]] = {REFERENCE: {}}
+_backend: str | None = None  # Until GPXPROFPY_BACKEND is applied on first use
+
+
+def register(name: str, backend: str = REFERENCE) -> Callable[[Callable], Callable]:
+    """Decorator registering a function as kernel name of backend"""
+
+    def decorator(kernel: Callable) -> Callable:
+        _kernels.setdefault(backend, {})[name] = kernel
+        return kernel
+
+    return decorator
+
+
+def get(name: str) -> Callable:
+    """Returns kernel name of the current backend, or the reference one"""
+
+    kernel = _kernels[_backend or get_backend()].get(name)
+    if kernel is None:
+        kernel = _kernels[REFERENCE][name]
+    return kernel
+
+
+def get_backend() -> str:
+    """Returns current backend name"""
+
+    if _backend is None:
+        set_backend(os.environ.get("GPXPROFPY_BACKEND") or REFERENCE)
+    return _backend
+
+
+def available_backends() -> list[str]:
+    """Returns names of the backends that can be used here"""
+
+    backends = dict.fromkeys([REFERENCE, *_LOADERS, *_kernels])
+    return [backend for backend in backends if _load(backend)]
+
+
+def set_backend(backend: str) -> str:
+    """Selects backend, or the reference one with a warning if it is not
+    available, and returns the selected backend. "auto" selects the first
+    available backend among the compiled ones"""
+
+    global _backend
+
+    if backend == "auto":
+        backend = next((name for name in _LOADERS if _load(name)), REFERENCE)
+    elif backend not in _LOADERS and backend not in _kernels:
+        raise ValueError(
+            f"Unknown kernel backend {backend!r}, expected one of "
+            f"{[REFERENCE, *_LOADERS, 'auto']}"
+        )
+    elif not _load(backend):
+        warnings.warn(
+            f"Kernel backend {backend!r} is not available, using {REFERENCE!r}",
+            RuntimeWarning,
+        )
+        backend = REFERENCE
+
+    _backend = backend
+    return backend
+
+
+@contextmanager
+def use_backend(backend: str) -> Iterator[str]:
+    """Context selecting backend, restoring the previous one on exit"""
+
+    previous = get_backend()
+    try:
+        yield set_backend(backend)
+    finally:
+        set_backend(previous)
+
+
+def _load(backend: str) -> bool:
+    """Imports the module of backend if needed, returns whether it is available"""
+
+    if backend in _kernels:
+        return True
+    try:
+        importlib.import_module(_LOADERS[backend], __package__)
+    except ImportError:
+        return False
+    return backend in _kernels
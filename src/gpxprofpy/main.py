@@ -2,29 +2,133 @@
 GPX profile plotter functions and classes
 """
 
+import io
+from typing import BinaryIO
+
 import numpy as np
 
-import matplotlib.pyplot as plt
 import matplotlib.axes as axs
+from matplotlib.figure import Figure
 
-from . import params, segments, points
+from . import params, segments, points, metrics
+from . import decimate as dec
 from . import profile as prf
 
+FIGSIZE = (14, 3)
+
 
 def plot_profile(
     profile: prf.GPXProfile, plot_slope: bool, plot_points: bool, save_fig: bool
 ) -> None:
     """Plots GPX elevation profile"""
 
-    fig, ax = plt.subplots(figsize=(14, 3), layout="constrained")
+    import matplotlib.pyplot as plt  # selects a GUI backend, only to show
+
+    fig, ax = plt.subplots(figsize=FIGSIZE, layout="constrained")
+    with metrics.stage("draw"):
+        draw_profile(ax, profile, plot_slope, plot_points)
+
+    if save_fig:
+        with metrics.stage("savefig"):
+            fig.savefig(f"{profile.name}.png", dpi=350)
+
+    plt.show()
+
+
+def save_profile(
+    profile: prf.GPXProfile,
+    filename: str,
+    plot_slope: bool = False,
+    plot_points: bool = False,
+    dpi: int = 350,
+) -> None:
+    """Saves GPX elevation profile plot to a file, format given by its extension"""
+
+    render_profile(profile, filename, None, dpi, plot_slope=plot_slope, plot_points=plot_points)
+
+
+def render_profile(
+    profile: prf.GPXProfile,
+    output: str | BinaryIO | None = None,
+    image_format: str | None = "png",
+    dpi: int = 350,
+    figsize: tuple[float, float] = FIGSIZE,
+    plot_slope: bool = False,
+    plot_points: bool = False,
+    decimation: str | None = "minmax",
+) -> bytes | None:
+    """Renders GPX elevation profile without pyplot nor display
+
+    The image is written to output, a file name or a binary file object, or
+    returned as bytes when output is None. image_format is one of the matplotlib
+    savefig formats ("png", "svg", "webp"...), None to infer it from a file name.
+    Unless decimation is None, profile is decimated to what figsize and dpi can show.
+    """
+
+    max_points = None if decimation is None else dec.point_budget(figsize, dpi)
+    with metrics.stage("render") as stage:
+        stage.count(points=len(profile.distance))
+        with metrics.stage("draw"):
+            fig = build_figure(
+                profile,
+                plot_slope,
+                plot_points,
+                figsize,
+                max_points,
+                decimation or "minmax",
+            )
+        try:
+            with metrics.stage("savefig"):
+                if output is None:
+                    buffer = io.BytesIO()
+                    fig.savefig(buffer, format=image_format or "png", dpi=dpi)
+                    return buffer.getvalue()
+                fig.savefig(output, format=image_format, dpi=dpi)
+                return None
+        finally:
+            fig.clear()
+
+
+def build_figure(
+    profile: prf.GPXProfile,
+    plot_slope: bool = False,
+    plot_points: bool = False,
+    figsize: tuple[float, float] = FIGSIZE,
+    max_points: int | None = None,
+    decimation: str = "minmax",
+) -> Figure:
+    """Builds a standalone figure of GPX elevation profile, outside of pyplot state"""
+
+    fig = Figure(figsize=figsize, layout="constrained")
+    draw_profile(
+        fig.add_subplot(), profile, plot_slope, plot_points, max_points, decimation
+    )
+
+    return fig
+
+
+def draw_profile(
+    ax: axs.Axes,
+    profile: prf.GPXProfile,
+    plot_slope: bool,
+    plot_points: bool,
+    max_points: int | None = None,
+    decimation: str = "minmax",
+) -> None:
+    """Draws GPX elevation profile on axes
+
+    Above max_points, the profile is decimated before drawing. Slope segments
+    are still detected on every point.
+    """
 
-    fill_under_profile(ax, profile.distance, profile.elevation)
+    drawn_profile, indexes, slope_segments = prepare_profile(
+        profile, plot_slope, max_points, decimation
+    )
+
+    fill_under_profile(ax, drawn_profile.distance, drawn_profile.elevation)
 
     if plot_slope:
-        slope_segments = segments.get_real_positive_slope_segments(
-            profile.distance, profile.elevation
-        )
-        segments.fill_under_segments(ax, slope_segments)
+        segments.fill_under_segments(ax, slope_segments, indexes)
 
     if plot_points:
         try:
@@ -36,12 +140,43 @@ def plot_profile(
     set_axes_limits(ax, profile)
     set_grid(ax)
 
-    ax.plot(profile.distance, profile.elevation, color=params.COLOR_PROFILE, zorder=100)
+    ax.plot(*get_profile_line(drawn_profile), color=params.COLOR_PROFILE, zorder=100)
 
-    if save_fig:
-        fig.savefig(f"{profile.name}.png", dpi=350)
 
-    plt.show()
+def prepare_profile(
+    profile: prf.GPXProfile,
+    plot_slope: bool,
+    max_points: int | None = None,
+    decimation: str = "minmax",
+) -> tuple[prf.GPXProfile, np.ndarray | None, list[segments.SlopeSegment]]:
+    """Returns profile to draw, indexes of its points in profile (None when not
+    decimated) and positive slope segments of profile if plot_slope"""
+
+    slope_segments = []
+    if plot_slope:
+        slope_segments = profile.positive_slope_segments()
+
+    if max_points is None or len(profile.distance) <= max_points:
+        return profile, None, slope_segments
+
+    with metrics.stage("decimate") as stage:
+        drawn_profile, indexes = profile.decimate(
+            max_points, decimation, segments.get_segments_ends(slope_segments)
+        )
+        stage.count(points=len(indexes))
+    return drawn_profile, indexes, slope_segments
+
+
+def get_profile_line(profile: prf.GPXProfile) -> tuple[np.ndarray, np.ndarray]:
+    """Returns profile line data, with a gap at each break between parts"""
+
+    if len(profile.breaks) == 0:
+        return profile.distance, profile.elevation
+
+    return (
+        np.insert(profile.distance, profile.breaks, np.nan),
+        np.insert(profile.elevation, profile.breaks, np.nan),
+    )
 
 
 def fill_under_profile(
@@ -0,0 +1,204 @@
+"""
+GPX profile plotter pipeline stage metrics
+
+Pipeline stages (GPX extraction, distance, slope, segments, drawing, savefig...)
+are timed by ``with stage(name)`` blocks. Their wall time, CPU time, counts and
+optionally tracemalloc peak are sent to the subscribed callbacks as
+StageMetrics. Without subscriber, stage returns a shared no-op context and
+count returns at once, so instrumentation costs close to nothing.
+
+>>> with record() as records:
+...     profile = read_gpx_file("data/MyGPXFile.gpx")
+>>> write_json_lines(records, "metrics.jsonl")
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import IO
+
+COUNTS = ("points", "segments", "merge_iterations")
+
+# (callback, trace_memory) of each subscriber
+_subscribers: list[tuple[Callable[["StageMetrics"], None], bool]] = []
+_local = threading.local()  # stack of the running stages of each thread
+
+
+@dataclass
+class StageMetrics:
+    """Measures of a pipeline stage run"""
+
+    stage: str
+    wall_time: float  # seconds
+    cpu_time: float  # seconds of process CPU time
+    parent: str | None = None  # enclosing stage
+    points: int | None = None
+    segments: int | None = None
+    merge_iterations: int | None = None
+    peak_bytes: int | None = None  # tracemalloc peak above the stage start
+
+    def to_json(self) -> str:
+        """Returns metrics as a JSON object on one line"""
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+
+class Stage:
+    """Context measuring a stage and publishing its metrics on exit"""
+
+    __slots__ = (
+        "metrics",
+        "trace_memory",
+        "_start",
+        "_cpu_start",
+        "_memory",
+        "_peak",
+        "_owns_tracing",
+    )
+
+    def __init__(self, name: str, trace_memory: bool):
+        self.metrics = StageMetrics(name, 0.0, 0.0)
+        self.trace_memory = trace_memory
+
+    def __enter__(self) -> "Stage":
+        stack = _stack()
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            self.metrics.parent = parent.metrics.stage
+        if self.trace_memory:
+            # Peaks are reset for each stage, the enclosing stage keeps its own
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            elif parent is not None and parent.trace_memory:
+                parent._peak = max(parent._peak, tracemalloc.get_traced_memory()[1])
+            self._memory = tracemalloc.get_traced_memory()[0]
+            self._peak = self._memory
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._cpu_start = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.wall_time = time.perf_counter() - self._start
+        self.metrics.cpu_time = time.process_time() - self._cpu_start
+        stack = _stack()
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if self.trace_memory:
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.metrics.peak_bytes = peak - self._memory
+            if self._owns_tracing:
+                tracemalloc.stop()
+            elif parent is not None and parent.trace_memory:
+                parent._peak = max(parent._peak, peak)
+                tracemalloc.reset_peak()
+        for callback, _ in list(_subscribers):
+            callback(self.metrics)
+
+    def count(self, **counts: int) -> None:
+        """Adds to the stage counts, among COUNTS"""
+
+        for name, value in counts.items():
+            setattr(self.metrics, name, (getattr(self.metrics, name) or 0) + value)
+
+
+class _NullStage:
+    """Stage doing nothing, used when there is no subscriber"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def count(self, **counts: int) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str) -> Stage | _NullStage:
+    """Returns context measuring stage name, a no-op without subscriber"""
+
+    if not _subscribers:
+        return _NULL_STAGE
+    return Stage(name, any(trace_memory for _, trace_memory in _subscribers))
+
+
+def count(**counts: int) -> None:
+    """Adds to the counts of the innermost running stage of this thread, if any"""
+
+    if not _subscribers:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1].count(**counts)
+
+
+def subscribe(
+    callback: Callable[[StageMetrics], None], trace_memory: bool = False
+) -> Callable[[StageMetrics], None]:
+    """Calls callback with the metrics of each stage run from now on, measuring
+    tracemalloc peak memory if trace_memory (which slows stages down)"""
+
+    _subscribers.append((callback, trace_memory))
+    return callback
+
+
+def unsubscribe(callback: Callable[[StageMetrics], None]) -> None:
+    """Stops calling callback"""
+
+    for i, (subscriber, _) in enumerate(_subscribers):
+        if subscriber == callback:
+            del _subscribers[i]
+            return
+    raise ValueError(f"{callback!r} is not subscribed")
+
+
+@contextmanager
+def record(trace_memory: bool = False) -> Iterator[list[StageMetrics]]:
+    """Context collecting the metrics of the stages run inside it in a list"""
+
+    records: list[StageMetrics] = []
+    callback = subscribe(records.append, trace_memory)
+    try:
+        yield records
+    finally:
+        unsubscribe(callback)
+
+
+class JsonLinesWriter:
+    """Subscriber callback writing each metrics as a JSON line to a text file"""
+
+    def __init__(self, output: IO[str]):
+        self.output = output
+
+    def __call__(self, metrics: StageMetrics) -> None:
+        self.output.write(metrics.to_json() + "\n")
+
+
+def write_json_lines(records: list[StageMetrics], filename: str) -> None:
+    """Writes metrics to filename, one JSON object per line"""
+
+    with open(filename, "w", encoding="utf-8") as output:
+        writer = JsonLinesWriter(output)
+        for metrics in records:
+            writer(metrics)
+
+
+def _stack() -> list[Stage]:
+    """Returns running stages of this thread, innermost last"""
+
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
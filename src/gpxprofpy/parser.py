@@ -0,0 +1,184 @@
+"""
+GPX profile plotter streaming parser
+"""
+
+from array import array
+from datetime import datetime, timezone
+from xml.parsers import expat
+
+import numpy as np
+
+POINT_TAGS = ("trkpt", "rtept")
+PART_TAGS = ("trkseg", "rte")
+POINT_FIELDS = ("ele", "time")
+# GPX 1.0 and 1.1 namespaces, or none, extensions elements are ignored
+GPX_NAMESPACES = (
+    "",
+    "http://www.topografix.com/GPX/1/0",
+    "http://www.topografix.com/GPX/1/1",
+)
+
+
+class GPXStreamParser:
+    """Pulls track and route points from GPX bytes into growing buffers, without
+    building any tree or per-point Python object"""
+
+    def __init__(self, with_time: bool = False):
+        self.latitude = array("d")
+        self.longitude = array("d")
+        self.elevation = array("d")
+        self.time = [] if with_time else None
+        self.parts = []  # index of the first point of each track segment or route
+        self.drained = 0  # number of points removed by drain
+
+        self._depth = 0
+        self._point_depth = None  # depth of the point element being parsed
+        self._field = None
+        self._text = []
+        self._point_ele = np.nan
+        self._point_time = None
+
+        self._parser = expat.ParserCreate(namespace_separator=" ")
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._character_data
+
+    def __len__(self):
+        return len(self.latitude)
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        """Parses a block of the file"""
+        self._parser.Parse(data, final)
+
+    def parse_file(self, gpx_file) -> None:
+        """Parses a whole binary file object"""
+        self._parser.ParseFile(gpx_file)
+
+    def arrays(self) -> tuple[np.ndarray, ...]:
+        """Returns latitude, longitude, elevation (and time) arrays, sharing the
+        buffers memory"""
+
+        arrays = (
+            np.frombuffer(self.latitude, dtype=np.float64),
+            np.frombuffer(self.longitude, dtype=np.float64),
+            np.frombuffer(self.elevation, dtype=np.float64),
+        )
+        if self.time is None:
+            return arrays
+        return arrays + (parse_times(self.time),)
+
+    def complete(self) -> int:
+        """Returns number of points whose end tag is parsed"""
+        return len(self.elevation)
+
+    def drain(self, max_points: int | None = None) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+        """Removes up to max_points first complete points from the buffers,
+        returns their columns as arrays() does and the indexes among them of
+        the first point of each non empty part
+
+        Buffers must not be shared by arrays() anymore.
+        """
+
+        size = self.complete()
+        size = size if max_points is None else min(max_points, size)
+        columns = (
+            np.frombuffer(self.latitude[:size], dtype=np.float64),
+            np.frombuffer(self.longitude[:size], dtype=np.float64),
+            np.frombuffer(self.elevation[:size], dtype=np.float64),
+        )
+        del self.latitude[:size], self.longitude[:size], self.elevation[:size]
+        if self.time is not None:
+            columns += (parse_times(self.time[:size]),)
+            del self.time[:size]
+
+        end = self.drained + size
+        parts = self.parts if self.drained else [0] + self.parts
+        starts = np.unique(np.array(parts, dtype=np.intp))
+        starts = starts[(starts >= self.drained) & (starts < end)] - self.drained
+        self.parts = [start for start in self.parts if start >= end]
+        self.drained = end
+
+        return columns, starts
+
+    def part_starts(self) -> np.ndarray:
+        """Returns sorted unique indexes of the first point of each non empty part"""
+
+        starts = np.unique(np.array([0] + self.parts, dtype=np.intp))
+        return starts[starts < len(self)]
+
+    def _start_element(self, name: str, attributes: dict) -> None:
+        self._depth += 1
+        tag = _gpx_tag(name)
+        if tag in POINT_TAGS and self._point_depth is None:
+            self._point_depth = self._depth
+            self.latitude.append(float(attributes["lat"]))
+            self.longitude.append(float(attributes["lon"]))
+        elif tag in POINT_FIELDS and self._depth - 1 == self._point_depth:
+            self._field = tag
+            self._text.clear()
+        elif tag in PART_TAGS:
+            self.parts.append(self.drained + len(self.latitude))
+
+    def _end_element(self, name: str) -> None:
+        depth = self._depth
+        self._depth -= 1
+        if depth == self._point_depth:
+            self.elevation.append(self._point_ele)
+            if self.time is not None:
+                self.time.append(self._point_time)
+            self._point_depth = None
+            self._point_ele = np.nan
+            self._point_time = None
+        elif self._field is not None and depth - 1 == self._point_depth:
+            tag = self._field
+            value = "".join(self._text).strip()
+            if tag == "ele":
+                self._point_ele = float(value) if value else np.nan
+            else:
+                self._point_time = value or None
+            self._field = None
+
+    def _character_data(self, data: str) -> None:
+        if self._field is not None:
+            self._text.append(data)
+
+
+def _gpx_tag(name: str) -> str | None:
+    """Returns tag of an expat element name in a GPX namespace, None otherwise"""
+
+    namespace, _, tag = name.rpartition(" ")
+    return tag if namespace in GPX_NAMESPACES else None
+
+
+def parse_times(values: list[str | None]) -> np.ndarray:
+    """Converts GPX timestamps to a UTC datetime64[ms] array, NaT when missing"""
+
+    if all(value is not None and value.endswith("Z") for value in values):
+        return np.array([value[:-1] for value in values], dtype="datetime64[ms]")
+
+    times = np.empty(len(values), dtype="datetime64[ms]")
+    for i, value in enumerate(values):
+        if value is None:
+            times[i] = np.datetime64("NaT")
+        elif value.endswith("Z"):
+            times[i] = np.datetime64(value[:-1])
+        else:
+            moment = datetime.fromisoformat(value)
+            if moment.tzinfo is not None:
+                moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+            times[i] = np.datetime64(moment)
+
+    return times
+
+
+def stream_extract(
+    gpx_filename: str, with_time: bool = False
+) -> tuple[GPXStreamParser, tuple[np.ndarray, ...]]:
+    """Parses GPX file with the streaming parser, returns it with its arrays"""
+
+    parser = GPXStreamParser(with_time)
+    with open(gpx_filename, "rb") as gpx_file:
+        parser.parse_file(gpx_file)
+
+    return parser, parser.arrays()
@@ -2,18 +2,29 @@
 GPX profile plotter segments
 """
 
-from dataclasses import dataclass
+from __future__ import annotations
 
 import csv
+import math
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-# import numpy as np
-import matplotlib.axes as axs
+import numpy as np
 
 from . import utils, params
 from . import profile as prf
 
+if TYPE_CHECKING:  # plotting only, matplotlib is imported by the caller axes
+    import matplotlib.axes as axs
+
+# Last loaded remarquable points files by absolute name: (mtime, size, points)
+_POINTS_CACHE: OrderedDict[str, tuple[int, int, np.ndarray]] = OrderedDict()
+_POINTS_CACHE_SIZE = 32
+
 
-@dataclass
+@dataclass(slots=True)
 class RemarquablePoint:
     """Remarquable points"""
 
@@ -55,55 +66,119 @@ class RemarquablePoint:
 def read_remarquable_points_file(filename: str) -> list[RemarquablePoint]:
     """reads remarquable points in csv file"""
 
-    remarquable_points = []
+    return [
+        RemarquablePoint(distance, label, has_water)
+        for distance, label, has_water in load_remarquable_points(filename).tolist()
+    ]
+
+
+def load_remarquable_points(filename: str) -> np.ndarray:
+    """Loads remarquable points file as a read-only structured array of
+    distance, label and has_water fields
+
+    Lines are "distance label water", space separated, labels with spaces are
+    quoted with |, water is 1 for a water point. Blank lines are ignored. The
+    array is cached until the file changes, for the last loaded files.
+    """
+
+    key = os.path.abspath(filename)
+    stat = os.stat(key)
+    cached = _POINTS_CACHE.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        _POINTS_CACHE.move_to_end(key)
+        return cached[2]
+
+    remarquable_points = parse_remarquable_points_file(key)
+    remarquable_points.flags.writeable = False
+    _POINTS_CACHE[key] = (stat.st_mtime_ns, stat.st_size, remarquable_points)
+    _POINTS_CACHE.move_to_end(key)
+    while len(_POINTS_CACHE) > _POINTS_CACHE_SIZE:
+        _POINTS_CACHE.popitem(last=False)
+
+    return remarquable_points
+
+
+def parse_remarquable_points_file(filename: str) -> np.ndarray:
+    """Parses remarquable points file, raises ValueError listing malformed lines"""
+
+    distances, labels, water_points, errors = [], [], [], []
     with open(filename, newline="", encoding="utf-8") as csvfile:
         lines = csv.reader(csvfile, delimiter=" ", quotechar="|")
-        for dist, label, water_point in lines:
-            water_point = True if int(water_point) == 1 else False
-            remarquable_points.append(RemarquablePoint(float(dist), label, water_point))
+        for row in lines:
+            if not row:
+                continue
+            try:
+                dist, label, water_point = row
+                dist = float(dist)
+                if not math.isfinite(dist):
+                    raise ValueError(f"invalid distance {dist}")
+                water_point = int(water_point) == 1
+            except ValueError as exc:
+                errors.append(f"line {lines.line_num}: {exc}")
+                continue
+            distances.append(dist)
+            labels.append(label)
+            water_points.append(water_point)
+
+    if errors:
+        raise ValueError(
+            f"Malformed remarquable points in {filename}, " + "; ".join(errors)
+        )
+
+    remarquable_points = np.empty(
+        len(distances),
+        dtype=[
+            ("distance", np.float64),
+            ("label", f"U{max(map(len, labels), default=1)}"),
+            ("has_water", np.bool_),
+        ],
+    )
+    remarquable_points["distance"] = distances
+    remarquable_points["label"] = labels
+    remarquable_points["has_water"] = water_points
 
     return remarquable_points
 
-def plot_remarquable_points(ax: axs.Axes, profile: prf.GPXProfile):
-    """Plots remarquable points at their respective distances"""
-    max_distance = int(profile.max_distance())
 
-    remarquable_points = read_remarquable_points_file(f"{profile.name}.csv")
+def plot_remarquable_points(ax: axs.Axes, profile: prf.GPXProfile, lookup: str = "next"):
+    """Plots remarquable points at their respective distances, all lines in a
+    single collection
 
-    for rem_pt in remarquable_points:
-        elevation = (
-            utils.find_closest_elevation(
-                profile.distance, profile.elevation, rem_pt.distance
-            )
-            + 300
-        )
-        plot_remarquables_point(
-            ax,
-            rem_pt,
-            elevation,
-            max_distance,
-        )
+    Lines height follows profile elevation at each point, found with lookup
+    method of utils.find_elevations. Labels are still one text per point:
+    matplotlib has no text collection, and each label has its own position,
+    color and weight.
+    """
+    max_distance = int(profile.max_distance())
 
+    point_array = load_remarquable_points(f"{profile.name}.csv")
+    if len(point_array) == 0:
+        return
 
-def plot_remarquables_point(
-    ax: axs.Axes, point: RemarquablePoint, elevation: float, max_distance: float
-):
-    """Plots a remarquable point"""
+    elevations = (
+        utils.find_elevations(
+            profile.distance, profile.elevation, point_array["distance"], lookup
+        )
+        + 300
+    )
+    remarquable_points = [RemarquablePoint(*row) for row in point_array.tolist()]
+    colors = [rem_pt.get_color(max_distance) for rem_pt in remarquable_points]
 
     ax.vlines(
-        point.distance,
+        point_array["distance"],
         0,
-        elevation,
-        colors=point.get_color(max_distance),
+        elevations,
+        colors=colors,
         linestyles="--",
         zorder=200,
     )
-    ax.text(
-        point.distance - 3,
-        elevation + 100,
-        point.get_text(max_distance),
-        color=point.get_color(max_distance),
-        fontweight=point.get_fontweight(max_distance),
-        rotation=90,
-        zorder=200,
-    )
+    for rem_pt, elevation, color in zip(remarquable_points, elevations, colors):
+        ax.text(
+            rem_pt.distance - 3,
+            elevation + 100,
+            rem_pt.get_text(max_distance),
+            color=color,
+            fontweight=rem_pt.get_fontweight(max_distance),
+            rotation=90,
+            zorder=200,
+        )
@@ -2,30 +2,259 @@
 GPX profile plotter segments
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from xml.parsers import expat
 
 import numpy as np
-import gpxpy as gp
 
-from . import utils
+from . import utils, parser, params, metrics
+from . import decimate as dec
+from .cache import ProfileCache
+
+
+# Memoized attributes, forgotten when a field is assigned
+DERIVED = (
+    "derived_slope",
+    "distance_deltas",
+    "elevation_deltas",
+    "slope_sign",
+    "cumulative_weighted_slope",
+    "cumulative_ascent",
+    "cumulative_descent",
+    "slope_max",
+    "memo",
+)
+
+
+class _Slope:
+    """Descriptor of the profile slope field: the given slope, or the slope
+    computed from distance and elevation on first access"""
+
+    def __get__(self, profile, owner=None):
+        if profile is None:
+            return None  # Field default
+        if profile.__dict__.get("given_slope") is not None:
+            return profile.given_slope
+        if "derived_slope" not in profile.__dict__:
+            with metrics.stage("slope") as stage:
+                profile.__dict__["derived_slope"] = utils.calculate_slope(
+                    profile.distance, profile.elevation, profile.slope_window
+                )
+                stage.count(points=len(profile.distance))
+        return profile.__dict__["derived_slope"]
+
+    def __set__(self, profile, slope):
+        profile.__dict__["given_slope"] = slope
 
 
 @dataclass
 class GPXProfile:
-    """Gathers data from GPX Profile"""
+    """Gathers data from GPX Profile
+
+    Slope is computed from distance and elevation, over slope_window (km), when
+    not given. Derived columns and segments are computed on first access and
+    memoized until a field is assigned. Call invalidate after changing arrays
+    in place.
+    """
 
     name: str
     distance: np.ndarray
     elevation: np.ndarray
-    slope: np.ndarray
+    slope: np.ndarray | None = _Slope()
+    breaks: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.intp))
+    latitude: np.ndarray | None = None
+    longitude: np.ndarray | None = None
+    slope_window: float = 0
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != "name":
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forgets derived columns and segments"""
+
+        for name in DERIVED:
+            self.__dict__.pop(name, None)
 
     def max_distance(self) -> float:
         """Returns max distance of profile"""
-        return np.max(self.distance)
+        return self.distance[-1]  # Distance is cumulative
 
     def max_elevation(self) -> float:
-        """Returns max elevation of profile"""
-        return np.max(self.elevation)
+        """Returns max elevation of profile, ignoring missing elevations"""
+        return np.nanmax(self.elevation)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Returns profile columns by name, without the missing ones"""
+
+        columns = {
+            "distance": self.distance,
+            "elevation": self.elevation,
+            "slope": self.slope,
+            "breaks": self.breaks,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+        }
+        return {name: array for name, array in columns.items() if array is not None}
+
+    def take(self, indexes: np.ndarray) -> "GPXProfile":
+        """Returns profile made of the points at sorted indexes, which must
+        include the breaks"""
+
+        return GPXProfile(
+            self.name,
+            self.distance[indexes],
+            self.elevation[indexes],
+            self.slope[indexes],
+            np.searchsorted(indexes, self.breaks),
+            None if self.latitude is None else self.latitude[indexes],
+            None if self.longitude is None else self.longitude[indexes],
+        )
+
+    def decimate(
+        self, budget: int, method: str = "minmax", keep: np.ndarray | None = None
+    ) -> tuple["GPXProfile", np.ndarray]:
+        """Returns a profile of about budget points preserving the profile shape
+        for drawing, and the indexes of its points
+
+        Both sides of breaks and the keep indexes are always kept.
+        """
+
+        indexes = dec.select_indexes(self.distance, self.elevation, budget, method)
+        extra = [self.breaks, self.breaks - 1]
+        if keep is not None:
+            extra.append(keep)
+        indexes = np.union1d(indexes, np.concatenate(extra).astype(np.intp))
+
+        return self.take(indexes), indexes
+
+    @cached_property
+    def distance_deltas(self) -> np.ndarray:
+        """Distance steps leading to each point but the first, in km"""
+        return np.diff(self.distance)
+
+    @cached_property
+    def elevation_deltas(self) -> np.ndarray:
+        """Elevation steps leading to each point but the first, in m"""
+        return np.diff(self.elevation)
+
+    @cached_property
+    def slope_sign(self) -> np.ndarray:
+        """Slope sign, 0 where slope is missing"""
+        return utils.get_slope_sign(self.slope)
+
+    @cached_property
+    def cumulative_weighted_slope(self) -> np.ndarray:
+        """Prefix sum of slope weighted by distance steps, missing slopes as 0"""
+        return _prefix_sum(np.nan_to_num(self.slope[1:] * self.distance_deltas))
+
+    @cached_property
+    def cumulative_ascent(self) -> np.ndarray:
+        """Prefix sum of elevation gains, in m"""
+        return _prefix_sum(np.nan_to_num(np.maximum(self.elevation_deltas, 0)))
+
+    @cached_property
+    def cumulative_descent(self) -> np.ndarray:
+        """Prefix sum of elevation losses, in m"""
+        return _prefix_sum(np.nan_to_num(np.maximum(-self.elevation_deltas, 0)))
+
+    @cached_property
+    def slope_max(self) -> utils.RangeMax:
+        """Range maximum structure over slope, missing slopes ignored"""
+        return utils.RangeMax(np.nan_to_num(self.slope, nan=-np.inf))
+
+    @cached_property
+    def memo(self) -> dict:
+        """Results memoized until the profile changes, such as segments"""
+        return {}
+
+    def slope_segments(self, threshold: float = params.SEUIL_MERGE) -> list:
+        """Returns slope segments merged with threshold, as
+        segments.get_real_slope_segments"""
+
+        from . import segments  # segments imports this module
+
+        key = ("slope_segments", threshold)
+        if key not in self.memo:
+            slope_sign = self.slope_sign  # slope is timed by its own stage
+            with metrics.stage("segments") as stage:
+                self.memo[key] = segments.merge_segments(
+                    segments.get_profile_slope_segments(self), threshold
+                )
+                stage.count(points=len(slope_sign), segments=len(self.memo[key]))
+        return list(self.memo[key])
+
+    def positive_slope_segments(
+        self, threshold: float = params.SEUIL, merge_threshold: float = params.SEUIL
+    ) -> list:
+        """Returns positive slope segments longer than threshold, as
+        segments.get_real_positive_slope_segments"""
+
+        return [
+            seg
+            for seg in self.slope_segments(merge_threshold)
+            if seg.sign == 1 and seg.get_size() > threshold
+        ]
+
+    def mean_slope(self, start: int, end: int) -> float:
+        """Returns distance weighted mean slope between two point indexes"""
+
+        size = self.distance[end] - self.distance[start]
+        if size <= 0:
+            return 0.0
+        weighted = self.cumulative_weighted_slope
+        return (weighted[end] - weighted[start]) / size
+
+    def elevation_gain(self, start: int, end: int) -> float:
+        """Returns elevation gain between two point indexes"""
+        return self.cumulative_ascent[end] - self.cumulative_ascent[start]
+
+    def elevation_loss(self, start: int, end: int) -> float:
+        """Returns elevation loss between two point indexes"""
+        return self.cumulative_descent[end] - self.cumulative_descent[start]
+
+    def max_slope(self, start: int, end: int) -> float:
+        """Returns max slope of the steps between two point indexes"""
+
+        if end <= start:
+            return 0.0
+        return self.slope_max.query(start + 1, end)
+
+    def stats(self, start: int, end: int) -> "ProfileStats":
+        """Returns statistics between two point indexes"""
+
+        return ProfileStats(
+            self.distance[end] - self.distance[start],
+            self.mean_slope(start, end),
+            self.elevation_gain(start, end),
+            self.elevation_loss(start, end),
+            self.max_slope(start, end),
+        )
+
+    def stats_between(
+        self, start_distance: float, end_distance: float
+    ) -> "ProfileStats":
+        """Returns statistics of the points between two distances, in km"""
+
+        start = np.searchsorted(self.distance, start_distance, side="left")
+        end = np.searchsorted(self.distance, end_distance, side="right") - 1
+        if end <= start:
+            return ProfileStats(0.0, 0.0, 0.0, 0.0, 0.0)
+        return self.stats(int(start), int(end))
+
+
+@dataclass
+class ProfileStats:
+    """Statistics of a part of a profile"""
+
+    distance: float
+    mean_slope: float
+    elevation_gain: float
+    elevation_loss: float
+    max_slope: float
 
 
 @dataclass
@@ -33,39 +262,152 @@ class GPXFile:
     """Represent a GPX File"""
 
     filename: str
+    cache: ProfileCache | None = None
+    gaps: str = "bridge"
+    slope_window: float = 0
 
     def csv_name(self) -> str:
         """Return associated"""
         return self.filename.replace(".gpx", ".csv")
 
     def profile(self) -> GPXProfile:
-        """Extract data from GPX and stores it in a GPXProfile object"""
-        return read_gpx_file(self.filename)
+        """Extract data from GPX and stores it in a GPXProfile object, going
+        through the cache when one is set"""
+
+        if self.cache is None:
+            return read_gpx_file(self.filename, self.gaps, self.slope_window)
+
+        key = self.cache.key(
+            self.filename, gaps=self.gaps, slope_window=self.slope_window
+        )
+        arrays = self.cache.get(key)
+        if arrays is not None:
+            return GPXProfile(self.filename.replace(".gpx", ""), **arrays)
 
+        profile = read_gpx_file(self.filename, self.gaps, self.slope_window)
+        self.cache.put(key, profile.arrays())
+        return profile
 
-def read_gpx_file(gpx_filename: str) -> GPXProfile:
-    """Read GPX file and return the profile data"""
+
+def read_gpx_file(
+    gpx_filename: str, gaps: str = "bridge", slope_window: float = 0
+) -> GPXProfile:
+    """Read GPX file and return the profile data
+
+    All tracks, track segments and routes are assembled. With gaps="bridge" the
+    distance between two parts is counted, with gaps="break" it is not and the
+    first point of each part is stored in the profile breaks. slope_window (km)
+    smooths slope over a distance instead of from point to point.
+    """
+
+    if gaps not in ("bridge", "break"):
+        raise ValueError(f"Unknown gaps mode {gaps!r}, expected 'bridge' or 'break'")
 
     name = gpx_filename.replace(".gpx", "")  # Get GPX name
-    latitude, longitude, elevation = extract_data(
-        gpx_filename
-    )  # Extract latitude, longitude and elevation
-    distance = utils.calculate_distance(
-        latitude, longitude
-    )  # Convert latitude and longitude to distance
-    slope = utils.calculate_slope(distance, elevation)  # Calculate slope
+    with metrics.stage("read_gpx_file") as stage:
+        (latitude, longitude, elevation), starts = extract_parts(
+            gpx_filename
+        )  # Extract latitude, longitude and elevation
+        breaks = starts[1:] if gaps == "break" else starts[:0]
+        with metrics.stage("distance") as distance_stage:
+            distance = utils.calculate_distance(
+                latitude, longitude, breaks=breaks
+            )  # Convert latitude and longitude to distance
+            distance_stage.count(points=len(distance))
+        stage.count(points=len(distance))
+
+    # Slope is computed on first use
+    return GPXProfile(
+        name, distance, elevation, None, breaks, latitude, longitude, slope_window
+    )
+
+
+def extract_data(
+    gpx_filename: str, backend: str = "stream", with_time: bool = False
+) -> tuple[np.ndarray, ...]:
+    """Extracts latitude, longitude and elevation (and time) of all tracks,
+    track segments and routes from file"""
+
+    columns, _ = extract_parts(gpx_filename, backend, with_time)
+
+    return columns
+
+
+def extract_parts(
+    gpx_filename: str, backend: str = "stream", with_time: bool = False
+) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+    """Extracts assembled columns and the index of the first point of each part
+
+    The "stream" backend reads the file with the streaming parser and falls back
+    to gpxpy when it cannot handle the file, the "gpxpy" backend always uses gpxpy.
+    """
+
+    if backend == "stream":
+        try:
+            return extract_parts_stream(gpx_filename, with_time)
+        except (expat.ExpatError, ValueError, KeyError):
+            pass
+    elif backend != "gpxpy":
+        raise ValueError(f"Unknown GPX backend {backend!r}")
+
+    return extract_parts_gpxpy(gpx_filename, with_time)
+
+
+def extract_parts_stream(
+    gpx_filename: str, with_time: bool = False
+) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+    """Extracts all parts with the streaming parser, already contiguous in its buffers"""
+
+    with metrics.stage("extract.stream") as stage:
+        gpx_parser, columns = parser.stream_extract(gpx_filename, with_time)
+        stage.count(points=len(gpx_parser))
+    if len(gpx_parser) == 0:
+        raise ValueError(f"No track or route point in {gpx_filename}")
+
+    return columns, gpx_parser.part_starts()
+
+
+def extract_parts_gpxpy(
+    gpx_filename: str, with_time: bool = False
+) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+    """Extracts all parts with gpxpy, filling columns allocated once for all parts"""
+
+    import gpxpy as gp  # fallback parser, imported on first use
+
+    with metrics.stage("extract.gpxpy") as stage:
+        with open(gpx_filename, encoding="utf-8") as gpx_file:
+            gpx_file_data = gp.parse(gpx_file)
+        parts = [route.points for route in gpx_file_data.routes] + [
+            segment.points
+            for track in gpx_file_data.tracks
+            for segment in track.segments
+        ]
+        parts = [points for points in parts if points]
+        stage.count(points=sum(len(points) for points in parts))
+    if not parts:
+        raise ValueError(f"No track or route point in {gpx_filename}")
 
-    return GPXProfile(name, distance, elevation, slope)
+    sizes = np.array([len(points) for points in parts], dtype=np.intp)
+    starts = np.concatenate(([0], np.cumsum(sizes[:-1])))
+    columns = np.empty((3, sizes.sum()), dtype=np.float64)
+    times = [] if with_time else None
+    for start, size, points in zip(starts, sizes, parts):
+        columns[0, start : start + size] = [pt.latitude for pt in points]
+        columns[1, start : start + size] = [pt.longitude for pt in points]
+        columns[2, start : start + size] = [
+            np.nan if pt.elevation is None else pt.elevation for pt in points
+        ]
+        if with_time:
+            times.extend(pt.time.isoformat() if pt.time else None for pt in points)
 
+    if not with_time:
+        return tuple(columns), starts
+    return tuple(columns) + (parser.parse_times(times),), starts
 
-def extract_data(gpx_filename: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Extracts latitude, longitude and elevation from file"""
 
-    with open(gpx_filename, encoding="utf-8") as gpx_file:
-        gpx_file_data = gp.parse(gpx_file)
-    gpx_points = gpx_file_data.tracks[0].segments[0].points
-    latitude = np.array([pt.latitude for pt in gpx_points])
-    longitude = np.array([pt.longitude for pt in gpx_points])
-    elevation = np.array([pt.elevation for pt in gpx_points])
+def _prefix_sum(steps: np.ndarray) -> np.ndarray:
+    """Returns prefix sum of steps, starting with 0 so that it has one more item"""
 
-    return (latitude, longitude, elevation)
+    prefix = np.zeros(len(steps) + 1)
+    np.cumsum(steps, out=prefix[1:])
+    return prefix
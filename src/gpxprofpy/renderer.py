@@ -0,0 +1,150 @@
+"""
+GPX profile plotter reusable renderer
+"""
+
+import io
+from typing import BinaryIO
+
+import numpy as np
+from matplotlib.cbook import contiguous_regions
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from . import main, metrics, params, points, segments
+from . import decimate as dec
+from . import profile as prf
+
+
+class ProfileRenderer:
+    """Renders many profiles with the same styling on a single figure
+
+    The figure, its frame, grid and artists are built once. Rendering a profile
+    only swaps the data of the profile fill, slope fills and profile line and
+    sets the limits. The constrained layout is solved on the first render and
+    kept while the tick labels keep the same widths, as the margins depend on
+    them. It is solved again otherwise, for instance when profiles elevations
+    are of a different order of magnitude, or after reset_layout.
+    """
+
+    def __init__(
+        self,
+        figsize: tuple[float, float] = main.FIGSIZE,
+        dpi: int = 350,
+        image_format: str = "png",
+        plot_slope: bool = False,
+        plot_points: bool = False,
+        decimation: str | None = "minmax",
+    ):
+        self.dpi = dpi
+        self.image_format = image_format
+        self.plot_slope = plot_slope
+        self.plot_points = plot_points
+        self.decimation = decimation or "minmax"
+        self.max_points = None if decimation is None else dec.point_budget(figsize, dpi)
+
+        self.figure = Figure(figsize=figsize, layout="constrained")
+        self.ax = self.figure.add_subplot()
+        main.remove_axes_frame(self.ax)
+        main.set_grid(self.ax)
+
+        self.fill = PolyCollection([], color=params.COLOR_FILL, zorder=5)
+        self.ax.add_collection(self.fill, autolim=False)
+        self.slope_fill = PolyCollection([], closed=True, zorder=10)
+        self.ax.add_collection(self.slope_fill, autolim=False)
+        (self.line,) = self.ax.plot([], [], color=params.COLOR_PROFILE, zorder=100)
+
+        self._layout_key: tuple[int, int] | None = None
+
+    def render(
+        self,
+        profile: prf.GPXProfile,
+        output: str | BinaryIO | None = None,
+        image_format: str | None = None,
+    ) -> bytes | None:
+        """Renders profile like main.render_profile, to output or as bytes"""
+
+        with metrics.stage("render") as stage:
+            stage.count(points=len(profile.distance))
+            with metrics.stage("draw"):
+                self.update(profile)
+                layout_key = self.tick_labels_widths()
+                if layout_key != self._layout_key:
+                    self.reset_layout()
+                collections, texts = len(self.ax.collections), len(self.ax.texts)
+                if self.plot_points:
+                    try:
+                        points.plot_remarquable_points(self.ax, profile)
+                    except FileNotFoundError:
+                        print("No CSV file found...")
+
+            image_format = image_format or self.image_format
+            try:
+                with metrics.stage("savefig"):
+                    if output is None:
+                        buffer = io.BytesIO()
+                        self.figure.savefig(buffer, format=image_format, dpi=self.dpi)
+                        return buffer.getvalue()
+                    self.figure.savefig(output, format=image_format, dpi=self.dpi)
+                    return None
+            finally:
+                for artist in self.ax.collections[collections:] + self.ax.texts[texts:]:
+                    artist.remove()
+                if self._layout_key is None:
+                    self.figure.set_layout_engine("none")
+                    self._layout_key = layout_key
+
+    def update(self, profile: prf.GPXProfile) -> None:
+        """Swaps artists data for profile"""
+
+        drawn_profile, indexes, slope_segments = main.prepare_profile(
+            profile, self.plot_slope, self.max_points, self.decimation
+        )
+
+        self.fill.set_verts(
+            get_fill_polygons(drawn_profile.distance, drawn_profile.elevation)
+        )
+        if slope_segments:
+            slope_colors = segments.get_segments_colors(slope_segments)
+            self.slope_fill.set_verts(
+                segments.get_segments_polygons(slope_segments, indexes)
+            )
+            self.slope_fill.set_facecolor(slope_colors)
+            self.slope_fill.set_edgecolor(slope_colors)
+        else:
+            self.slope_fill.set_verts([])
+        self.line.set_data(*main.get_profile_line(drawn_profile))
+        main.set_axes_limits(self.ax, profile)
+
+    def tick_labels_widths(self) -> tuple[int, int]:
+        """Returns the lengths of the longest x and y tick labels"""
+
+        widths = []
+        for axis in (self.ax.xaxis, self.ax.yaxis):
+            labels = axis.get_major_formatter().format_ticks(axis.get_majorticklocs())
+            widths.append(max(map(len, labels), default=0))
+
+        return tuple(widths)
+
+    def reset_layout(self) -> None:
+        """Solves the layout again on next render"""
+
+        self.figure.set_layout_engine("constrained")
+        self._layout_key = None
+
+
+def get_fill_polygons(distance: np.ndarray, elevation: np.ndarray) -> list[np.ndarray]:
+    """Returns vertices of the area under profile down to 0 elevation, one
+    polygon per run of known elevations, as fill_between draws it"""
+
+    polygons = []
+    for start, end in contiguous_regions(~np.isnan(elevation)):
+        polygons.append(
+            np.concatenate(
+                (
+                    np.column_stack((distance[start:end], elevation[start:end])),
+                    [(distance[end - 1], 0), (distance[start], 0)],
+                )
+            )
+        )
+
+    return polygons
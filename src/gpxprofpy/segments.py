@@ -2,48 +2,81 @@
 GPX profile plotter segments
 """
 
-from dataclasses import dataclass
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 import numpy as np
-# import matplotlib.pyplot as plt
-import matplotlib.axes as axs
 
-from . import utils, params
+from . import params, metrics, kernels
+from . import profile as prf
+
+if TYPE_CHECKING:  # plotting only, matplotlib is imported on first draw
+    import matplotlib.axes as axs
+    from matplotlib.collections import PolyCollection
 
 
-@dataclass
 class SlopeSegment:
-    """(TESTED) - Defines a slope segment"""
+    """(TESTED) - Defines a slope segment as a range of points of a shared profile
+
+    The segment holds no data: start and end are the indexes of its first and
+    last points in the profile arrays, so merging segments is an index update.
+    """
 
-    distance: np.ndarray
-    elevation: np.ndarray
-    slope: np.ndarray
-    sign: int
+    __slots__ = ("profile", "start", "end", "sign")
+
+    def __init__(self, profile: prf.GPXProfile, start: int, end: int, sign: int):
+        self.profile = profile
+        self.start = start
+        self.end = end
+        self.sign = sign
 
     def __add__(self, segment2):
-        return SlopeSegment(
-            np.concatenate([self.distance, segment2.distance[1:]]),
-            np.concatenate([self.elevation, segment2.elevation[1:]]),
-            np.concatenate([self.slope, segment2.slope[1:]]),
-            self.sign,
-        )
+        if segment2.start != self.end or segment2.profile is not self.profile:
+            raise ValueError("Only consecutive segments of a profile can be added")
+        return SlopeSegment(self.profile, self.start, segment2.end, self.sign)
 
     def __repr__(self):
         return f"SlopeSegment: {self.get_size()}km, pente moyenne: {self.mean_slope()}%"
 
+    @property
+    def distance(self) -> np.ndarray:
+        """Distance of segment points, as a view on the profile"""
+        return self.profile.distance[self.start : self.end + 1]
+
+    @property
+    def elevation(self) -> np.ndarray:
+        """Elevation of segment points, as a view on the profile"""
+        return self.profile.elevation[self.start : self.end + 1]
+
+    @property
+    def slope(self) -> np.ndarray:
+        """Slope of segment points, as a view on the profile"""
+        return self.profile.slope[self.start : self.end + 1]
+
     def get_size(self):
         """return size of segment, in km"""
-        return self.distance[-1] - self.distance[0]
+        return self.profile.distance[self.end] - self.profile.distance[self.start]
 
     def get_distance_deltas(self):
         """return array of distance between segment points"""
-        return np.array(
-            [0] + [d - self.distance[i] for i, d in enumerate(self.distance[1:])]
-        )
+        return np.diff(self.distance, prepend=self.distance[0])
 
     def mean_slope(self):
-        """return mean slope"""
-        return np.round(np.average(self.slope, weights=self.get_distance_deltas()), 2)
+        """return mean slope, from profile prefix sums"""
+        return np.round(self.profile.mean_slope(self.start, self.end), 2)
+
+    def elevation_gain(self):
+        """return elevation gain, in m"""
+        return self.profile.elevation_gain(self.start, self.end)
+
+    def elevation_loss(self):
+        """return elevation loss, in m"""
+        return self.profile.elevation_loss(self.start, self.end)
+
+    def max_slope(self):
+        """return max slope"""
+        return self.profile.max_slope(self.start, self.end)
 
 
 def get_real_positive_slope_segments(
@@ -54,9 +87,8 @@ def get_real_positive_slope_segments(
 ):
     """(TESTED) - Gets positive slope segments"""
 
-    segments = get_real_slope_segments(distance, elevation, threshold=merge_threshold)
-
-    return [seg for seg in segments if seg.sign == 1 and seg.get_size() > threshold]
+    profile = prf.GPXProfile("", distance, elevation)
+    return profile.positive_slope_segments(threshold, merge_threshold)
 
 
 def get_real_slope_segments(
@@ -64,76 +96,76 @@ def get_real_slope_segments(
 ):
     """(TESTED) - Gets slope segments cleaned"""
 
-    slope = utils.calculate_slope(distance, elevation)
-    segments = get_all_slope_segments(distance, elevation, slope)
-
-    return merge_segments(segments, threshold)
+    return prf.GPXProfile("", distance, elevation).slope_segments(threshold)
 
 
 def get_all_slope_segments(
-    distance: np.ndarray, elevation: np.ndarray, slope: np.ndarray
+    distance: np.ndarray, elevation: np.ndarray, slope: np.ndarray | None = None
 ) -> list[SlopeSegment]:
-    """(TESTED) - Find all slope segments"""
+    """(TESTED) - Find all slope segments, slope being computed when not given"""
 
-    slope = utils.calculate_slope(distance, elevation)
-    slope_sign = utils.get_slope_sign(slope)
+    return get_profile_slope_segments(prf.GPXProfile("", distance, elevation, slope))
 
-    segments_ends, segments_signs = get_segments_end_indexes(slope_sign)
-    return extract_segments(distance, elevation, slope, segments_ends, segments_signs)
+
+def get_profile_slope_segments(profile: prf.GPXProfile) -> list[SlopeSegment]:
+    """Find all slope segments of profile, from its slope sign"""
+
+    segments_ends, segments_signs = find_segments_end_indexes(profile.slope_sign)
+    starts = [0] + segments_ends[:-1].tolist()
+
+    return [
+        SlopeSegment(profile, start, end, sign)
+        for start, end, sign in zip(starts, segments_ends.tolist(), segments_signs.tolist())
+    ]
 
 
 def get_segments_end_indexes(slope_sign: list[int]) -> tuple[list[int], list[int]]:
     """(TESTED) - Return indexes of segments ends and their signs"""
 
-    segments_ends, segments_sign = [], []
-    for i, sg in enumerate(slope_sign[1:]):
-        try:
-            if (sg * slope_sign[i + 2]) <= 0 and sg != slope_sign[i + 2]:
-                segments_ends.append(i + 1)
-                segments_sign.append(sg)
-        except IndexError:
-            if sg != slope_sign[i]:
-                segments_ends.append(i + 1)
-                segments_sign.append(sg)
+    segments_ends, segments_sign = find_segments_end_indexes(slope_sign)
+
+    return segments_ends.tolist(), segments_sign.tolist()
+
+
+def find_segments_end_indexes(slope_sign: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(TESTED) - Return arrays of segments ends indexes and their signs
+
+    A segment ends wherever the sign changes, the first point being ignored as
+    it has no slope. The last point always ends the last segment.
+    """
+
+    slope_sign = np.asarray(slope_sign)
+    if len(slope_sign) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=slope_sign.dtype)
+
+    segments_ends = kernels.get("segments_ends")(slope_sign)
 
-    if segments_ends[-1] != len(slope_sign) - 1:
-        segments_ends.append(len(slope_sign) - 1)
-        segments_sign.append(slope_sign[-1])
+    return segments_ends, slope_sign[segments_ends]
 
-    return segments_ends, segments_sign
+
+@kernels.register("segments_ends")
+def _segments_ends(slope_sign: np.ndarray) -> np.ndarray:
+    """Returns indexes of segments ends of a non empty slope sign"""
+
+    return np.append(np.flatnonzero(np.diff(slope_sign[1:])) + 1, len(slope_sign) - 1)
 
 
 def extract_segments(
     distance: np.ndarray,
     elevation: np.ndarray,
     slope: np.ndarray,
-    indexes: list[int],
-    signs: list[int],
+    indexes: list[int] | np.ndarray,
+    signs: list[int] | np.ndarray,
 ) -> list[SlopeSegment]:
-    """(TESTED) - Extract segments from their end indexes"""
-
-    segments = []
-    for i, (index, sign) in enumerate(zip(indexes, signs)):
-        if i == 0:
-            segments.append(
-                SlopeSegment(
-                    distance[0 : index + 1],
-                    elevation[0 : index + 1],
-                    slope[0 : index + 1],
-                    sign,
-                )
-            )
-        else:
-            segments.append(
-                SlopeSegment(
-                    distance[indexes[i - 1] : index + 1],
-                    elevation[indexes[i - 1] : index + 1],
-                    slope[indexes[i - 1] : index + 1],
-                    sign,
-                )
-            )
+    """(TESTED) - Extract segments from their end indexes, all sharing the same arrays"""
 
-    return segments
+    profile = prf.GPXProfile("", distance, elevation, slope)
+    starts = [0] + list(indexes[:-1])
+
+    return [
+        SlopeSegment(profile, int(start), int(end), int(sign))
+        for start, end, sign in zip(starts, indexes, signs)
+    ]
 
 
 def merge_segments(
@@ -153,15 +185,7 @@ def merge_positive_segments(
 ) -> list[SlopeSegment]:
     """Merges positive slope segments that need it"""
 
-    seg_to_merge = find_first_positive_mergeable_segment(segments, threshold)
-    max_iteration = 2 * len(segments)
-    iteration = 0
-    while seg_to_merge is not None and iteration < max_iteration:
-        iteration += 1
-        segments = merge_three_segments(segments, seg_to_merge)
-        seg_to_merge = find_first_positive_mergeable_segment(segments, threshold)
-
-    return segments
+    return merge_signed_segments(segments, threshold, 1)
 
 
 def merge_negative_segments(
@@ -169,15 +193,120 @@ def merge_negative_segments(
 ) -> list[SlopeSegment]:
     """Merges negative slope segments that need it"""
 
-    seg_to_merge = find_first_negative_mergeable_segment(segments, threshold)
-    max_iteration = 2 * len(segments)
-    iteration = 0
-    while seg_to_merge is not None and iteration < max_iteration:
-        iteration += 1
-        segments = merge_three_segments(segments, seg_to_merge)
-        seg_to_merge = find_first_negative_mergeable_segment(segments, threshold)
+    return merge_signed_segments(segments, threshold, -1)
 
-    return segments
+
+def merge_signed_segments(
+    segments: list[SlopeSegment], threshold: float, sign: int
+) -> list[SlopeSegment]:
+    """(TESTED) - Merges segments of a sign that need it, in a single sweep
+
+    Gives the same result as merging the first mergeable segment until there is
+    none left. A merge at i only changes the windows of the segments from i - 3,
+    so the sweep steps back 3 segments over a linked list instead of restarting.
+    """
+
+    count = len(segments)
+    start_distance = np.array([seg.profile.distance[seg.start] for seg in segments])
+    end_distance = np.array([seg.profile.distance[seg.end] for seg in segments])
+    signs = np.array([seg.sign for seg in segments], dtype=np.int64)
+    heads, tails, merges, steps = kernels.get("merge_sweep")(
+        start_distance, end_distance, signs, float(threshold), int(sign)
+    )
+
+    # Each merge removes two segments, so the 2 * len(segments) merges cap of
+    # the former loops is never reached
+    assert len(heads) == count - 2 * merges
+    metrics.count(merge_iterations=steps)
+
+    merged = []
+    for head, tail in zip(heads.tolist(), tails.tolist()):
+        seg = segments[head]
+        if tail != head:
+            seg = SlopeSegment(seg.profile, seg.start, segments[tail].end, seg.sign)
+        merged.append(seg)
+
+    return merged
+
+
+@kernels.register("merge_sweep")
+def _merge_sweep(
+    start_distance: np.ndarray,
+    end_distance: np.ndarray,
+    signs: np.ndarray,
+    threshold: float,
+    sign: int,
+) -> tuple[np.ndarray, np.ndarray, int, int]:
+    """Merge sweep of merge_signed_segments over segments start and end
+    distances and signs
+
+    Returns the index of the first and last segment of each merged segment,
+    the number of merges and of sweep steps.
+    """
+
+    count = len(signs)
+    tails = list(range(count))
+    next_index = list(range(1, count + 1))
+    previous_index = list(range(-1, count - 1))
+    merges, steps = _merge_loop(
+        start_distance.tolist(),
+        end_distance.tolist(),
+        signs.tolist(),
+        threshold,
+        sign,
+        tails,
+        next_index,
+        previous_index,
+    )
+
+    heads, i = [], 0
+    while i < count:
+        heads.append(i)
+        i = next_index[i]
+    heads = np.array(heads, dtype=np.intp)
+
+    return heads, np.array(tails, dtype=np.intp)[heads], merges, steps
+
+
+def _merge_loop(
+    start_distance, end_distance, signs, threshold, sign, tails, next_index, previous_index
+):
+    """Merge sweep loop, updating tails and links of sequences in place, shared
+    by the compiled backends. Returns the number of merges and of steps"""
+
+    count = len(signs)
+    sizes = [end_distance[i] - start_distance[i] for i in range(count)]
+    i, merges, steps = 0, 0, 0
+    while i < count:
+        steps += 1
+        i1 = next_index[i]
+        i2 = next_index[i1] if i1 < count else count
+        i3 = next_index[i2] if i2 < count else count
+        if (
+            signs[i] == sign
+            and i2 < count
+            and (
+                (sizes[i1] < threshold and signs[i2] == sign)
+                or (
+                    i3 < count
+                    and sizes[i1] + sizes[i2] < threshold
+                    and signs[i3] == sign
+                )
+            )
+        ):
+            tails[i] = tails[i2]
+            sizes[i] = end_distance[tails[i]] - start_distance[i]
+            next_index[i] = next_index[i2]
+            if next_index[i] < count:
+                previous_index[next_index[i]] = i
+            merges += 1
+            for _ in range(3):
+                if previous_index[i] >= 0:
+                    i = previous_index[i]
+        else:
+            i = i1
+
+    return merges, steps
 
 
 def merge_three_segments(
@@ -241,13 +370,81 @@ def find_first_negative_mergeable_segment(
 
 
 def fill_under_segments(
-    ax: axs.Axes, slope_segments: list[SlopeSegment]
-) -> None:
-    """Fill color according to mean slope under all positive slope segments"""
-
-    for seg in slope_segments:
-        slope_color = get_slope_color(seg.mean_slope())
-        ax.fill_between(seg.distance, seg.elevation, 0, color=slope_color, zorder=10)
+    ax: axs.Axes,
+    slope_segments: list[SlopeSegment],
+    indexes: np.ndarray | None = None,
+) -> PolyCollection | None:
+    """Fill color according to mean slope under all positive slope segments
+
+    Segments must share their profile. All fills are drawn by a single
+    collection. When given, only the points of sorted indexes are drawn, which
+    must include segments ends.
+    """
+
+    if not slope_segments:
+        return None
+
+    from matplotlib.collections import PolyCollection
+
+    collection = PolyCollection(
+        get_segments_polygons(slope_segments, indexes),
+        closed=True,
+        zorder=10,
+    )
+    slope_colors = get_segments_colors(slope_segments)
+    collection.set_facecolor(slope_colors)
+    collection.set_edgecolor(slope_colors)
+    ax.add_collection(collection, autolim=False)
+
+    return collection
+
+
+def get_segments_polygons(
+    slope_segments: list[SlopeSegment], indexes: np.ndarray | None = None
+) -> list[np.ndarray]:
+    """Returns (distance, elevation) vertices of the area under each segment,
+    closed down to 0 elevation, restricted to sorted indexes when given"""
+
+    profile = slope_segments[0].profile
+    starts = np.array([seg.start for seg in slope_segments], dtype=np.intp)
+    ends = np.array([seg.end for seg in slope_segments], dtype=np.intp)
+    if indexes is None:
+        firsts, lasts = starts, ends + 1
+    else:
+        firsts = np.searchsorted(indexes, starts)
+        lasts = np.searchsorted(indexes, ends, side="right")
+
+    # Each polygon is its points followed by the two base corners
+    lengths = lasts - firsts
+    block_ends = np.cumsum(lengths + 2)
+    owners = np.repeat(np.arange(len(lengths)), lengths)
+    ranks = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    points = firsts[owners] + ranks
+    if indexes is not None:
+        points = indexes[points]
+
+    vertices = np.zeros((block_ends[-1], 2))
+    positions = np.arange(len(points)) + 2 * owners
+    vertices[positions, 0] = profile.distance[points]
+    vertices[positions, 1] = profile.elevation[points]
+    vertices[block_ends - 2, 0] = profile.distance[ends]
+    vertices[block_ends - 1, 0] = profile.distance[starts]
+
+    return np.split(vertices, block_ends[:-1])
+
+
+def get_segments_colors(slope_segments: list[SlopeSegment]) -> list[str]:
+    """Returns fill color of each segment according to its mean slope"""
+    return [get_slope_color(seg.mean_slope()) for seg in slope_segments]
+
+
+def get_segments_ends(slope_segments: list[SlopeSegment]) -> np.ndarray:
+    """Returns indexes of first and last points of segments"""
+
+    return np.array(
+        [index for seg in slope_segments for index in (seg.start, seg.end)],
+        dtype=np.intp,
+    )
 
 
 def fill_under_all_segments(
@@ -0,0 +1,384 @@
+"""
+GPX profile plotter local HTTP rendering service
+
+Renders GPX profiles on a pool of pre-warmed worker processes behind a small
+asyncio HTTP server, bound to localhost by default and without dependency
+beyond the standard library:
+
+- ``POST /render?format=png&dpi=350&slope=1`` with a GPX file as body, or
+  ``GET /render?path=/data/MyGPXFile.gpx&points=1`` for a local file, returns
+  the image;
+- ``GET /stats`` returns queue depth, cache and latency statistics as JSON.
+
+Concurrent requests for the same content and options share one render, and
+recent images are kept in an in-memory LRU cache.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlsplit
+
+from . import batch
+from . import profile as prf
+
+FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "webp": "image/webp",
+    "pdf": "application/pdf",
+}
+MAX_BODY = 256 << 20  # bytes of an uploaded GPX file
+LATENCY_WINDOW = 1000  # last request latencies kept for percentiles
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """Options of a render request"""
+
+    image_format: str = "png"
+    dpi: int = 350
+    plot_slope: bool = False
+    plot_points: bool = False
+
+    @classmethod
+    def from_query(cls, query: dict[str, list[str]]) -> "RenderOptions":
+        """Returns options of URL query values, raising ValueError on invalid ones"""
+
+        values = {name: query[name][-1] for name in query}
+        image_format = values.get("format", "png")
+        if image_format not in FORMATS:
+            raise ValueError(
+                f"Unknown format {image_format!r}, expected one of {', '.join(FORMATS)}"
+            )
+        try:
+            dpi = int(values.get("dpi", 350))
+        except ValueError:
+            raise ValueError(f"dpi must be an integer, got {values['dpi']!r}") from None
+        if not 10 <= dpi <= 1200:
+            raise ValueError(f"dpi must be between 10 and 1200, got {dpi}")
+
+        return cls(
+            image_format,
+            dpi,
+            _flag(values, "slope"),
+            _flag(values, "points"),
+        )
+
+
+class RenderService:
+    """Renders GPX content on a pool of worker processes, coalescing identical
+    requests and caching recent images"""
+
+    def __init__(self, workers: int | None = None, cache_size: int = 128):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.pool: ProcessPoolExecutor | None = None
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.counts = dict.fromkeys(
+            ("requests", "renders", "cache_hits", "coalesced", "errors"), 0
+        )
+
+    async def start(self) -> None:
+        """Starts worker processes and waits until each one is warm"""
+
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.pool, _warm) for _ in range(self.workers))
+        )
+
+    def close(self) -> None:
+        """Stops worker processes"""
+
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def render(
+        self, content: bytes, options: RenderOptions, path: str | None = None
+    ) -> bytes:
+        """Returns image of GPX content, rendered from path when given so that
+        its remarquable points file can be found"""
+
+        if self.pool is None:
+            raise RuntimeError("RenderService is not started")
+
+        start = time.perf_counter()
+        self.counts["requests"] += 1
+        key = (hashlib.sha256(content).hexdigest(), options)
+        if options.plot_points:
+            # Points come from the CSV file next to the GPX file, until it changes
+            key += (path, _points_version(path))
+        try:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+                self.counts["cache_hits"] += 1
+            else:
+                task = self._in_flight.get(key)
+                if task is None:
+                    task = asyncio.create_task(
+                        self._render(key, content, options, path)
+                    )
+                    self._in_flight[key] = task
+                    self.counts["renders"] += 1
+                else:
+                    self.counts["coalesced"] += 1
+                # A request going away does not cancel the render of the others
+                image = await asyncio.shield(task)
+        except Exception:
+            self.counts["errors"] += 1
+            raise
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+
+        return image
+
+    async def _render(
+        self, key: tuple, content: bytes, options: RenderOptions, path: str | None
+    ) -> bytes:
+        """Renders on a worker, awaited by all the requests of key until it is done"""
+
+        loop = asyncio.get_running_loop()
+        try:
+            image = await loop.run_in_executor(
+                self.pool, render_gpx, None if path else content, path, options
+            )
+        finally:
+            del self._in_flight[key]
+
+        self._cache[key] = image
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return image
+
+    def stats(self) -> dict:
+        """Returns queue depth, counts and latency percentiles (ms) of the
+        last requests"""
+
+        latencies = sorted(self._latencies)
+        in_flight = len(self._in_flight)
+        return {
+            "workers": self.workers,
+            "in_flight": in_flight,
+            "queue_depth": max(in_flight - self.workers, 0),
+            "cached": len(self._cache),
+            **self.counts,
+            "latency_ms": {
+                f"p{rank}": percentile(latencies, rank) * 1e3 if latencies else None
+                for rank in (50, 90, 99)
+            },
+        }
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """Returns nearest rank percentile of sorted values"""
+
+    index = max(int(-(-rank * len(values) // 100)) - 1, 0)
+    return values[index]
+
+
+def render_gpx(
+    content: bytes | None, path: str | None, options: RenderOptions
+) -> bytes:
+    """Renders GPX content, or the file at path, to image bytes in a worker"""
+
+    if path is None:
+        file_descriptor, path = tempfile.mkstemp(suffix=".gpx")
+        try:
+            with os.fdopen(file_descriptor, "wb") as gpx_file:
+                gpx_file.write(content)
+            profile = prf.read_gpx_file(path)
+        finally:
+            os.remove(path)
+    else:
+        profile = prf.read_gpx_file(path)
+
+    renderer = batch.get_renderer(
+        options.plot_slope, options.plot_points, options.dpi, options.image_format
+    )
+    return renderer.render(profile)
+
+
+async def handle_connection(
+    service: RenderService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Answers one HTTP request, then closes the connection"""
+
+    try:
+        try:
+            method, target, body = await read_request(reader)
+            status, content_type, payload = await route(service, method, target, body)
+        except HTTPError as exc:
+            status, content_type, payload = _error(exc.status, str(exc))
+        except ValueError as exc:
+            status, content_type, payload = _error(400, str(exc))
+        except Exception as exc:  # Report render failures to the client
+            status, content_type, payload = _error(500, f"{type(exc).__name__}: {exc}")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1")
+            + payload
+        )
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+    """Returns method, target and body of an HTTP request"""
+
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise HTTPError(400, "Malformed request line")
+    method, target, _ = request_line
+
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(413, f"GPX file larger than {MAX_BODY} bytes")
+
+    return method, target, await reader.readexactly(length)
+
+
+async def route(
+    service: RenderService, method: str, target: str, body: bytes
+) -> tuple[int, str, bytes]:
+    """Returns status, content type and payload answering a request"""
+
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    if url.path == "/stats":
+        return 200, "application/json", json.dumps(service.stats()).encode()
+    if url.path != "/render":
+        raise HTTPError(404, f"No such resource {url.path}")
+    if method not in ("GET", "POST"):
+        raise HTTPError(405, f"Method {method} not allowed")
+
+    options = RenderOptions.from_query(query)
+    path = query["path"][-1] if "path" in query else None
+    if path is not None:
+        if not os.path.isfile(path):
+            raise HTTPError(404, f"No such GPX file {path}")
+        content = await asyncio.to_thread(_read_file, path)
+    elif body:
+        if options.plot_points:
+            raise ValueError("points needs a GPX path, to find its CSV file")
+        content = body
+    else:
+        raise ValueError("Expected a GPX file as request body or a path parameter")
+
+    image = await service.render(content, options, path)
+    return 200, FORMATS[options.image_format], image
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int | None = None,
+    cache_size: int = 128,
+) -> None:
+    """Runs the rendering service until cancelled"""
+
+    service = RenderService(workers, cache_size)
+    await service.start()
+    try:
+        server = await asyncio.start_server(
+            lambda reader, writer: handle_connection(service, reader, writer),
+            host,
+            port,
+        )
+        address = server.sockets[0].getsockname()
+        print(
+            f"Serving GPX profiles on http://{address[0]}:{address[1]} "
+            f"with {service.workers} workers",
+            file=sys.stderr,
+        )
+        async with server:
+            await server.serve_forever()
+    finally:
+        await asyncio.to_thread(service.close)  # Do not block the event loop
+
+
+def _init_worker() -> None:
+    """Selects the headless backend and loads plotting modules in a worker"""
+
+    batch._init_worker()
+    batch.get_renderer(False, False, 350, "png")
+
+
+def _warm() -> int:
+    """Returns worker process id, once the worker is initialized"""
+    return os.getpid()
+
+
+def _flag(values: dict[str, str], name: str) -> bool:
+    """Returns boolean query value"""
+
+    value = values.get(name, "0").lower()
+    if value not in ("0", "1", "false", "true", "no", "yes"):
+        raise ValueError(f"{name} must be a boolean, got {value!r}")
+    return value in ("1", "true", "yes")
+
+
+def _error(status: int, message: str) -> tuple[int, str, bytes]:
+    """Returns error response as JSON"""
+    return status, "application/json", json.dumps({"error": message}).encode()
+
+
+def _points_version(path: str | None) -> tuple[int, int] | None:
+    """Returns (mtime_ns, size) of the remarquable points file of the GPX file
+    at path, None if there is none"""
+
+    if path is None:
+        return None
+    try:
+        stat = os.stat(f"{path.replace('.gpx', '')}.csv")
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_file(path: str) -> bytes:
+    """Returns file content"""
+
+    with open(path, "rb") as gpx_file:
+        return gpx_file.read()
@@ -0,0 +1,141 @@
+"""
+GPX profile plotter chunked streaming pipeline
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import utils, params, parser
+from .incremental import SegmentTracker, segment_stats
+from .profile import ProfileStats
+
+BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class ProfileChunk:
+    """Points of a chunk of the profile"""
+
+    offset: int  # index of the first point of the chunk in the profile
+    distance: np.ndarray
+    elevation: np.ndarray
+    slope: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+
+
+@dataclass
+class StreamedSegment:
+    """Merged slope segment that no further point can change"""
+
+    start: int
+    end: int
+    sign: int
+    start_distance: float
+    stats: ProfileStats
+
+
+@dataclass
+class ProfileSummary:
+    """Statistics of the whole profile, once all points are streamed"""
+
+    points: int
+    max_elevation: float
+    stats: ProfileStats
+    segments: int
+
+
+def iter_chunks(
+    gpx_filename: str, chunk_size: int = 65536, block_size: int = BLOCK_SIZE
+) -> Iterator[tuple[tuple[np.ndarray, ...], np.ndarray]]:
+    """Yields latitude, longitude and elevation of chunks of at most chunk_size
+    points of GPX file, with the indexes in the chunk of parts first points"""
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    gpx_parser = parser.GPXStreamParser()
+    with open(gpx_filename, "rb") as gpx_file:
+        while block := gpx_file.read(block_size):
+            gpx_parser.feed(block)
+            while gpx_parser.complete() >= chunk_size:
+                yield gpx_parser.drain(chunk_size)
+        gpx_parser.feed(b"", final=True)
+
+    while gpx_parser.complete() > 0:
+        yield gpx_parser.drain(chunk_size)
+
+
+def stream_profile(
+    gpx_filename: str,
+    chunk_size: int = 65536,
+    gaps: str = "bridge",
+    merge_threshold: float = params.SEUIL,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[ProfileChunk | StreamedSegment | ProfileSummary]:
+    """Reads GPX file chunk by chunk, yields each chunk of points, then the
+    slope segments it settles, and a summary at the end
+
+    Only the last point, the running sums and the unsettled segments are
+    carried from a chunk to the next one, so memory does not grow with the
+    track length. Distance, slope, segments and statistics are the same as
+    read_gpx_file, segments.get_real_slope_segments and GPXProfile.stats on the
+    whole file. Slope is from point to point, without window.
+    """
+
+    if gaps not in ("bridge", "break"):
+        raise ValueError(f"Unknown gaps mode {gaps!r}, expected 'bridge' or 'break'")
+
+    tracker = SegmentTracker(merge_threshold)
+    last = None  # (latitude, longitude, distance, elevation) of the last point
+    max_elevation = -np.inf
+    segments = 0
+    for (latitude, longitude, elevation), starts in iter_chunks(
+        gpx_filename, chunk_size, block_size
+    ):
+        # Steps leading to the chunk points, from the last point of the previous chunk
+        carried = 0 if last is None else 1
+        if last is not None:
+            latitude_steps = np.concatenate(([last[0]], latitude))
+            longitude_steps = np.concatenate(([last[1]], longitude))
+        else:
+            latitude_steps, longitude_steps = latitude, longitude
+        deltas = utils.calculate_distance_deltas(latitude_steps, longitude_steps)
+        if gaps == "break":
+            breaks = starts[starts + tracker.points > 0]
+            deltas[breaks - 1 + carried] = 0
+        start_distance = 0.0 if last is None else last[2]
+        distance = np.cumsum(np.concatenate(([start_distance], deltas)))[carried:]
+        slope = utils.calculate_slope(
+            np.concatenate(([start_distance], distance)) if carried else distance,
+            np.concatenate(([last[3]], elevation)) if carried else elevation,
+        )[carried:]
+
+        offset = tracker.points
+        tracker.add(distance, elevation)
+        last = (latitude[-1], longitude[-1], distance[-1], elevation[-1])
+        max_elevation = max(max_elevation, np.nanmax(elevation, initial=-np.inf))
+        yield ProfileChunk(offset, distance, elevation, slope, latitude, longitude)
+
+        for node in tracker.pop_final():
+            segments += 1
+            yield _streamed_segment(node)
+
+    if last is None:
+        raise ValueError(f"No track or route point in {gpx_filename}")
+
+    tracker.finish()
+    for node in tracker.pop_final():
+        segments += 1
+        yield _streamed_segment(node)
+    max_elevation = float(max_elevation) if max_elevation > -np.inf else np.nan
+    yield ProfileSummary(tracker.points, max_elevation, tracker.stats(), segments)
+
+
+def _streamed_segment(node: tuple) -> StreamedSegment:
+    """Returns streamed segment of a SegmentTracker segment"""
+
+    start, end, sign, first, _, _ = node
+    return StreamedSegment(start, end, sign, first[0], segment_stats(node))
@@ -4,27 +4,178 @@ GPX profile plotter segments
 
 import numpy as np
 
+from . import kernels
 
-def calculate_distance(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
-    """Calculates distance from start and stores it in a numpy array"""
+EARTH_RADIUS = 6371  # km, mean radius used by spherical methods
+WGS84_A = 6378.137  # km, semi-major axis
+WGS84_F = 1 / 298.257223563
 
-    distance = np.zeros(latitude.shape)
-    latitude_rad = np.radians(latitude)
-    longitude_rad = np.radians(longitude)
-    for i, (lat, lon) in enumerate(zip(latitude_rad[1:], longitude_rad[1:])):
-        distance[i + 1] = distance[i] + distance_between_points(
-            latitude_rad[i], longitude_rad[i], lat, lon
-        )
+# Bump when distance or slope results change, to invalidate cached profiles
+DISTANCE_VERSION = 2
+SLOPE_VERSION = 1
+
+
+def calculate_distance(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    method: str = "cosines",
+    dtype: type = np.float64,
+    breaks: np.ndarray | None = None,
+) -> np.ndarray:
+    """Calculates distance from start and stores it in a numpy array
+
+    Steps leading to the points indexed by breaks are not counted.
+    """
+
+    deltas = calculate_distance_deltas(latitude, longitude, method, dtype)
+    if breaks is not None and len(breaks) > 0:
+        deltas[np.asarray(breaks) - 1] = 0
+    distance = np.zeros(len(latitude), dtype=dtype)
+    distance[1:] = np.cumsum(deltas, dtype=np.float64)  # no drift in float32
 
     return distance
 
 
+def calculate_distance_deltas(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    method: str = "cosines",
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """Calculates distance between consecutive points in one batched pass, in km
+
+    method is one of "cosines" (spherical law of cosines), "haversine" or
+    "vincenty" (WGS84 ellipsoid). Only haversine runs in dtype: the law of
+    cosines and Vincenty formula always run in double precision, as they lose
+    all precision on short steps in single precision.
+    """
+
+    if method not in DISTANCE_METHODS:
+        raise ValueError(
+            f"Unknown distance method {method!r}, expected one of {list(DISTANCE_METHODS)}"
+        )
+    kernel = kernels.get(DISTANCE_METHODS[method])
+
+    latitude_rad = np.radians(np.asarray(latitude, dtype=np.float64))
+    longitude_rad = np.radians(np.asarray(longitude, dtype=np.float64))
+    if latitude_rad.size < 2:
+        return np.zeros(0, dtype=dtype)
+
+    # Steps are differenced in double precision, only the trigonometry runs in dtype
+    kernel_dtype = dtype if method == "haversine" else np.float64
+    return kernel(
+        latitude_rad.astype(kernel_dtype),
+        np.diff(latitude_rad).astype(kernel_dtype),
+        np.diff(longitude_rad).astype(kernel_dtype),
+    ).astype(dtype, copy=False)
+
+
+@kernels.register("cosines_deltas")
+def _cosines_deltas(
+    latitude: np.ndarray, delta_lat: np.ndarray, delta_lon: np.ndarray
+) -> np.ndarray:
+    """Spherical law of cosines between consecutive points, angles in radians"""
+
+    sin_lat, cos_lat = np.sin(latitude), np.cos(latitude)
+    cos_angle = sin_lat[:-1] * sin_lat[1:] + cos_lat[:-1] * cos_lat[1:] * np.cos(
+        delta_lon
+    )
+
+    return EARTH_RADIUS * np.acos(np.clip(cos_angle, -1, 1))
+
+
+@kernels.register("haversine_deltas")
+def _haversine_deltas(
+    latitude: np.ndarray, delta_lat: np.ndarray, delta_lon: np.ndarray
+) -> np.ndarray:
+    """Haversine formula between consecutive points, angles in radians"""
+
+    cos_lat = np.cos(latitude)
+    half_chord = (
+        np.sin(delta_lat / 2) ** 2
+        + cos_lat[:-1] * cos_lat[1:] * np.sin(delta_lon / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS * np.asin(np.sqrt(np.minimum(half_chord, 1)))
+
+
+@kernels.register("vincenty_deltas")
+def _vincenty_deltas(
+    latitude: np.ndarray,
+    delta_lat: np.ndarray,
+    delta_lon: np.ndarray,
+    max_iteration: int = 200,
+) -> np.ndarray:
+    """Vincenty inverse formula on the WGS84 ellipsoid, angles in radians"""
+
+    semi_minor = (1 - WGS84_F) * WGS84_A
+    tolerance = max(1e-12, 8 * np.finfo(latitude.dtype).eps)
+
+    reduced_lat = np.atan((1 - WGS84_F) * np.tan(latitude))
+    sin_u, cos_u = np.sin(reduced_lat), np.cos(reduced_lat)
+    sin_u1, sin_u2, cos_u1, cos_u2 = sin_u[:-1], sin_u[1:], cos_u[:-1], cos_u[1:]
+
+    lam = delta_lon
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(max_iteration):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.hypot(
+                cos_u2 * sin_lam, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam
+            )
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.atan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(
+                sin_sigma > 0, cos_u1 * cos_u2 * sin_lam / sin_sigma, 0
+            )
+            cos2_alpha = 1 - sin_alpha**2
+            cos_2sigma_m = np.where(
+                cos2_alpha > 0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha, 0
+            )
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            previous_lam = lam
+            lam = delta_lon + (1 - c) * WGS84_F * sin_alpha * (
+                sigma
+                + c
+                * sin_sigma
+                * (cos_2sigma_m + c * cos_sigma * (2 * cos_2sigma_m**2 - 1))
+            )
+            if np.all(np.abs(lam - previous_lam) < tolerance):
+                break
+
+    u2 = cos2_alpha * (WGS84_A**2 - semi_minor**2) / semi_minor**2
+    a = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    b = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = (
+        b
+        * sin_sigma
+        * (
+            cos_2sigma_m
+            + b
+            / 4
+            * (
+                cos_sigma * (2 * cos_2sigma_m**2 - 1)
+                - b / 6 * cos_2sigma_m * (4 * sin_sigma**2 - 3) * (4 * cos_2sigma_m**2 - 3)
+            )
+        )
+    )
+
+    return semi_minor * a * (sigma - delta_sigma)
+
+
+# Distance method -> kernel name
+DISTANCE_METHODS = {
+    "cosines": "cosines_deltas",
+    "haversine": "haversine_deltas",
+    "vincenty": "vincenty_deltas",
+}
+
+
 def distance_between_points(
     lat1: float, lon1: float, lat2: float, lon2: float
 ) -> float:
     """Calculate distance between 2 GPS points from their latitudes and longitudes, in radians"""
 
-    return 6371 * np.acos(
+    return EARTH_RADIUS * np.acos(
         min(
             np.sin(lat1) * np.sin(lat2)
             + np.cos(lat1) * np.cos(lat2) * np.cos(lon2 - lon1),
@@ -33,13 +184,43 @@ def distance_between_points(
     )
 
 
-def calculate_slope(distance: np.ndarray, elevation: np.ndarray) -> np.ndarray:
-    """(TESTED) - Calculate slope from distance and elevation"""
+def calculate_slope(
+    distance: np.ndarray, elevation: np.ndarray, window: float = 0
+) -> np.ndarray:
+    """(TESTED) - Calculate slope from distance and elevation
+
+    Without window, the slope of a point is the slope of the step leading to it.
+    With a window in km, it is the slope between the first and last points of
+    the window centered on it, found by binary search on the cumulative distance.
+    Steps without distance have a 0 slope, steps with a missing elevation a NaN one.
+    """
+
+    distance = np.asarray(distance, dtype=np.float64)
+    elevation = np.asarray(elevation, dtype=np.float64)
+
+    if window <= 0:
+        return kernels.get("steps_slope")(distance, elevation)
 
     slope = np.zeros(distance.shape)
+    first = np.searchsorted(distance, distance - window / 2, side="left")
+    last = np.searchsorted(distance, distance + window / 2, side="right") - 1
+    delta_dist = distance[last] - distance[first]
+    delta_ele = elevation[last] - elevation[first]
+    np.divide(0.1 * delta_ele, delta_dist, out=slope, where=delta_dist > 0)
+    slope[np.isnan(delta_ele)] = np.nan
+
+    return slope
+
 
-    for i, (dist, ele) in enumerate(zip(distance[1:], elevation[1:])):
-        slope[i + 1] = slope_between_points(distance[i], elevation[i], dist, ele)
+@kernels.register("steps_slope")
+def _steps_slope(distance: np.ndarray, elevation: np.ndarray) -> np.ndarray:
+    """Slope of the step leading to each point, 0 for the first point"""
+
+    slope = np.zeros(distance.shape)
+    delta_dist = np.diff(distance)
+    delta_ele = np.diff(elevation)
+    np.divide(0.1 * delta_ele, delta_dist, out=slope[1:], where=delta_dist > 0)
+    slope[1:][np.isnan(delta_ele)] = np.nan
 
     return slope
 
@@ -57,19 +238,87 @@ def slope_between_points(dist1: float, ele1: float, dist2: float, ele2: float) -
     return 0
 
 
-def get_slope_sign(slope: np.ndarray) -> list[int]:
-    """(TESTED) - Returns slope sign"""
+def get_slope_sign(slope: np.ndarray) -> np.ndarray:
+    """(TESTED) - Returns slope sign, 0 where slope is missing"""
 
-    slope_pos = slope > 0
-    slope_neg = slope < 0
+    slope = np.asarray(slope)
 
-    return [int(1 * sp + -1 * sn) for sp, sn in zip(slope_pos, slope_neg)]
+    return (slope > 0).astype(np.int8) - (slope < 0).astype(np.int8)
 
 def find_closest_elevation(distance: np.ndarray, elevation: np.ndarray, target_distance: float):
     """Find elevation of closest point to distance in profile"""
 
-    elevation_sup = elevation[distance >= target_distance]
-    if len(elevation_sup) > 0:
-        return elevation_sup[0]
+    return find_elevations(distance, elevation, [target_distance])[0]
+
+
+def find_elevations(
+    distance: np.ndarray,
+    elevation: np.ndarray,
+    target_distances: np.ndarray,
+    method: str = "next",
+) -> np.ndarray:
+    """Returns profile elevation at each target distance
+
+    distance must be sorted, as a cumulative distance is. method is one of:
+    - "next": elevation of the first point at or after target, last point after
+      the end of profile
+    - "nearest": elevation of the point closest to target
+    - "interp": elevation linearly interpolated between surrounding points,
+      clamped to profile ends
+    """
+
+    target_distances = np.asarray(target_distances, dtype=np.float64)
+    if method == "interp":
+        return np.interp(target_distances, distance, elevation)
+
+    last = len(distance) - 1
+    indexes = np.minimum(np.searchsorted(distance, target_distances), last)
+    if method == "nearest":
+        previous = np.maximum(indexes - 1, 0)
+        closer = np.abs(target_distances - distance[previous]) < np.abs(
+            distance[indexes] - target_distances
+        )
+        indexes = np.where(closer, previous, indexes)
+    elif method != "next":
+        raise ValueError(f"Unknown elevation lookup method {method!r}")
+
+    return elevation[indexes]
+
+
+class RangeMax:
+    """Range maximum queries in constant time
+
+    A sparse table over blocks maxima answers whole blocks, partial blocks at
+    both ends are scanned, so a query reads at most 2 * block + 2 values.
+    """
+
+    def __init__(self, values: np.ndarray, block: int = 64):
+        self.values = np.asarray(values)
+        self.block = block
+        size = len(self.values)
+        padded = np.full(-(-size // block) * block, -np.inf)
+        padded[:size] = self.values
+        self.table = [padded.reshape(-1, block).max(axis=1)]
+        width = 1
+        while 2 * width <= len(self.table[0]):
+            level = self.table[-1]
+            self.table.append(np.maximum(level[:-width], level[width:]))
+            width *= 2
+
+    def query(self, start: int, end: int) -> float:
+        """Returns maximum of values[start:end + 1]"""
+
+        first_block = -(-start // self.block)
+        last_block = (end + 1) // self.block
+        if first_block >= last_block:
+            return self.values[start : end + 1].max()
+
+        level = int(last_block - first_block).bit_length() - 1
+        blocks = self.table[level]
+        maximum = max(blocks[first_block], blocks[last_block - (1 << level)])
+        if start < first_block * self.block:
+            maximum = max(maximum, self.values[start : first_block * self.block].max())
+        if end + 1 > last_block * self.block:
+            maximum = max(maximum, self.values[last_block * self.block : end + 1].max())
 
-    return elevation[-1]
+        return maximum
@@ -0,0 +1,86 @@
+"""batch processing test module"""
+
+import os
+import tempfile
+import unittest
+
+from gpxprofpy.batch import find_gpx_files, plot_gpx_profiles
+from gpxprofpy.cli import main
+
+GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="45.0" lon="6.0"><ele>1000</ele></trkpt>
+    <trkpt lat="45.01" lon="6.01"><ele>1100</ele></trkpt>
+    <trkpt lat="45.02" lon="6.02"><ele>1050</ele></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+class TestBatch(unittest.TestCase):
+    """Batch processing test class"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "routes")
+        self.output_dir = os.path.join(self.tmp_dir.name, "plots")
+        os.makedirs(os.path.join(self.input_dir, "sub"))
+        for name, content in (
+            ("a.gpx", GPX),
+            (os.path.join("sub", "b.gpx"), GPX),
+            ("broken.gpx", "<gpx"),
+            ("notes.txt", ""),
+        ):
+            with open(os.path.join(self.input_dir, name), "w", encoding="utf-8") as file:
+                file.write(content)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_find_gpx_files(self):
+        """test GPX files are found recursively"""
+        self.assertEqual(
+            [os.path.relpath(path, self.input_dir) for path in find_gpx_files([self.input_dir])],
+            ["a.gpx", "broken.gpx", os.path.join("sub", "b.gpx")],
+        )
+
+    def test_plot_gpx_profiles(self):
+        """test batch rendering isolates errors per file"""
+        results = plot_gpx_profiles(
+            [self.input_dir], workers=2, output_dir=self.output_dir, dpi=20, progress=False
+        )
+        self.assertEqual([result.error is None for result in results], [True, False, True])
+        self.assertEqual(results[0].points, 3)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["a.png", "sub"])
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, "sub")), ["b.png"])
+
+    def test_output_collision(self):
+        """test files plotted to the same output file are refused before rendering"""
+        other_dir = os.path.join(self.tmp_dir.name, "other")
+        os.makedirs(other_dir)
+        with open(os.path.join(other_dir, "a.gpx"), "w", encoding="utf-8") as file:
+            file.write(GPX)
+        self.assertRaises(
+            ValueError,
+            plot_gpx_profiles,
+            [self.input_dir, other_dir],
+            output_dir=self.output_dir,
+            progress=False,
+        )
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_cli_render(self):
+        """test render command exit status"""
+        self.assertEqual(
+            main(["render", "-q", "-o", self.output_dir, "--dpi", "20", self.input_dir]), 1
+        )
+        self.assertEqual(
+            main(["render", "-q", "-o", self.output_dir, "--dpi", "20",
+                  os.path.join(self.input_dir, "a.gpx")]),
+            0,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""headless rendering test module"""
+
+import io
+import unittest
+
+import numpy as np
+import matplotlib.image as mpimg
+import matplotlib.pyplot as plt
+
+from gpxprofpy.main import build_figure, render_profile
+from gpxprofpy.segments import get_real_positive_slope_segments
+from gpxprofpy.profile import GPXProfile
+from gpxprofpy.renderer import ProfileRenderer, get_fill_polygons
+from gpxprofpy.utils import calculate_slope
+
+
+class TestRender(unittest.TestCase):
+    """Headless rendering test class"""
+
+    def setUp(self):
+        distance = np.linspace(0, 10, 200)
+        elevation = 1000 + 300 * np.sin(distance)
+        self.profile = GPXProfile(
+            "test", distance, elevation, calculate_slope(distance, elevation)
+        )
+
+    def test_render_profile_bytes(self):
+        """test rendering returns image bytes in the requested format"""
+        self.assertTrue(render_profile(self.profile, dpi=20).startswith(b"\x89PNG"))
+        self.assertIn(b"<svg", render_profile(self.profile, image_format="svg"))
+        self.assertEqual(
+            render_profile(self.profile, image_format="webp", dpi=20)[8:12], b"WEBP"
+        )
+
+    def test_render_profile_buffer(self):
+        """test rendering to a caller buffer with slope segments"""
+        buffer = io.BytesIO()
+        self.assertIsNone(
+            render_profile(self.profile, buffer, dpi=20, figsize=(4, 1), plot_slope=True)
+        )
+        self.assertTrue(buffer.getvalue().startswith(b"\x89PNG"))
+
+    def test_build_figure_outside_pyplot(self):
+        """test figures are not registered in pyplot"""
+        figures = plt.get_fignums()
+        build_figure(self.profile)
+        render_profile(self.profile, dpi=20)
+        self.assertEqual(plt.get_fignums(), figures)
+
+    def test_build_figure_single_slope_collection(self):
+        """test slope segments are filled by a single artist"""
+        fig = build_figure(self.profile, plot_slope=True)
+        slope_segments = get_real_positive_slope_segments(
+            self.profile.distance, self.profile.elevation
+        )
+        self.assertGreater(len(slope_segments), 1)
+        collections = [
+            collection
+            for collection in fig.axes[0].collections
+            if collection.get_zorder() == 10
+        ]
+        self.assertEqual(len(collections), 1)
+        self.assertEqual(len(collections[0].get_paths()), len(slope_segments))
+
+    def test_render_profile_decimation(self):
+        """test decimation does not visibly change the chart"""
+        rng = np.random.default_rng(0)
+        distance = np.cumsum(rng.uniform(0, 0.003, 100000))
+        elevation = 1000 + np.cumsum(rng.normal(0, 0.5, 100000))
+        profile = GPXProfile(
+            "test", distance, elevation, calculate_slope(distance, elevation)
+        )
+        images = [
+            mpimg.imread(
+                io.BytesIO(render_profile(profile, dpi=40, decimation=decimation))
+            )
+            for decimation in (None, "minmax")
+        ]
+        self.assertLess(np.mean(np.any(images[0] != images[1], axis=-1)), 0.05)
+
+    def test_profile_renderer(self):
+        """test reused renderer draws like a new figure, with the same artists,
+        solving the layout again when tick labels widths change"""
+        renderer = ProfileRenderer(figsize=(4, 1), dpi=40, plot_slope=True)
+        other = GPXProfile(
+            "other",
+            self.profile.distance * 2,
+            self.profile.elevation[::-1],
+            self.profile.slope,
+        )
+        high = GPXProfile(
+            "high",
+            self.profile.distance,
+            self.profile.elevation * 10,
+            self.profile.slope,
+        )
+        for profile in (self.profile, other, high, self.profile):
+            images = [
+                mpimg.imread(io.BytesIO(image))
+                for image in (
+                    renderer.render(profile),
+                    render_profile(profile, dpi=40, figsize=(4, 1), plot_slope=True),
+                )
+            ]
+            self.assertLess(np.mean(np.any(images[0] != images[1], axis=-1)), 0.01)
+        self.assertEqual(len(renderer.ax.collections), 2)
+        self.assertEqual(len(renderer.ax.lines), 1)
+
+    def test_get_fill_polygons(self):
+        """test fill polygons are split at missing elevations"""
+        polygons = get_fill_polygons(
+            np.arange(6.0), np.array([1, 2, np.nan, 3, 4, 5])
+        )
+        self.assertEqual(len(polygons), 2)
+        np.testing.assert_equal(polygons[0], [[0, 1], [1, 2], [1, 0], [0, 0]])
+        np.testing.assert_equal(polygons[1][-2:], [[5, 0], [3, 0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,8 +9,8 @@ from gpxprofpy.segments import (
     find_first_positive_mergeable_segment,
     find_first_negative_mergeable_segment,
     merge_segments,
-    #TODO merge_positive_segments,
-    #TODO merge_negative_segments,
+    merge_positive_segments,
+    merge_negative_segments,
     merge_three_segments,
     get_real_slope_segments,
     get_real_positive_slope_segments,
@@ -21,6 +21,18 @@ from gpxprofpy.utils import (
 )
 
 
+def reference_merge(segments, threshold, find_first_mergeable_segment):
+    """Restart-from-zero merge loop, as implemented before the single sweep"""
+
+    segments = list(segments)
+    seg_to_merge = find_first_mergeable_segment(segments, threshold)
+    while seg_to_merge is not None:
+        segments = merge_three_segments(segments, seg_to_merge)
+        seg_to_merge = find_first_mergeable_segment(segments, threshold)
+
+    return segments
+
+
 class TestSegments(unittest.TestCase):
     """Segments test class"""
 
@@ -107,3 +119,25 @@ class TestSegments(unittest.TestCase):
         self.assertEqual(positive_segments[-1].get_size(), 5)
         np.testing.assert_almost_equal(positive_segments[0].mean_slope(), 4.8, 2)
         np.testing.assert_almost_equal(positive_segments[-1].mean_slope(), -0.2, 2)
+
+    def test_merge_signed_segments_reference(self):
+        """test merge_positive_segments and merge_negative_segments against the
+        restart-from-zero loop"""
+
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            distance = np.cumsum(rng.uniform(0, 0.2, 2000))
+            elevation = np.cumsum(rng.normal(0, 5, 2000))
+            segments = get_all_slope_segments(
+                distance, elevation, calculate_slope(distance, elevation)
+            )
+            for merge, find_first in (
+                (merge_positive_segments, find_first_positive_mergeable_segment),
+                (merge_negative_segments, find_first_negative_mergeable_segment),
+            ):
+                expected = reference_merge(segments, 0.5, find_first)
+                merged = merge(segments, 0.5)
+                self.assertEqual(
+                    [(seg.start, seg.end, seg.sign) for seg in merged],
+                    [(seg.start, seg.end, seg.sign) for seg in expected],
+                )
@@ -0,0 +1,154 @@
+"""HTTP rendering service test module"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from gpxprofpy.service import (
+    RenderOptions,
+    RenderService,
+    handle_connection,
+    percentile,
+)
+
+GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="45.0" lon="6.0"><ele>1000</ele></trkpt>
+    <trkpt lat="45.01" lon="6.01"><ele>1100</ele></trkpt>
+    <trkpt lat="45.02" lon="6.02"><ele>1050</ele></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+async def request(port: int, method: str, target: str, body: bytes = b"") -> tuple:
+    """Returns status, headers and body of an HTTP request to localhost"""
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), headers, payload
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+    """HTTP rendering service test class"""
+
+    async def asyncSetUp(self):
+        self.service = RenderService(workers=2, cache_size=2)
+        await self.service.start()
+        self.server = await asyncio.start_server(
+            lambda reader, writer: handle_connection(self.service, reader, writer),
+            "127.0.0.1",
+            0,
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.service.close()
+
+    async def test_coalesce_and_cache(self):
+        """test identical concurrent requests share one render, then hit the cache"""
+
+        options = RenderOptions("png", 20)
+        images = await asyncio.gather(
+            *(self.service.render(GPX, options) for _ in range(4))
+        )
+        self.assertTrue(images[0].startswith(b"\x89PNG"))
+        self.assertEqual(len(set(images)), 1)
+        await self.service.render(GPX, options)
+        await self.service.render(GPX, RenderOptions("svg", 20))
+        await self.service.render(GPX, RenderOptions("png", 30))
+
+        stats = self.service.stats()
+        self.assertEqual(
+            [stats[name] for name in ("requests", "renders", "coalesced", "cache_hits")],
+            [7, 3, 3, 1],
+        )
+        self.assertEqual((stats["cached"], stats["queue_depth"]), (2, 0))
+        self.assertGreater(stats["latency_ms"]["p99"], 0)
+
+    async def test_points_file_change(self):
+        """test images with remarquable points are rendered again when the points
+        file changes"""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "route.gpx")
+            with open(path, "wb") as gpx_file:
+                gpx_file.write(GPX)
+            options = RenderOptions("png", 20, plot_points=True)
+            for points in ("1 Col 0\n", None, "1 Col 0\n2 Lac 1\n"):
+                if points is not None:
+                    with open(
+                        os.path.join(tmp_dir, "route.csv"), "w", encoding="utf-8"
+                    ) as file:
+                        file.write(points)
+                await self.service.render(GPX, options, path)
+
+        stats = self.service.stats()
+        self.assertEqual((stats["renders"], stats["cache_hits"]), (2, 1))
+
+    async def test_http(self):
+        """test rendering uploads and paths, statistics and errors over HTTP"""
+
+        status, headers, image = await request(
+            self.port, "POST", "/render?dpi=20&slope=1", GPX
+        )
+        self.assertEqual((status, headers["Content-Type"]), (200, "image/png"))
+        self.assertTrue(image.startswith(b"\x89PNG"))
+
+        file_descriptor, filename = tempfile.mkstemp(suffix=".gpx")
+        with os.fdopen(file_descriptor, "wb") as gpx_file:
+            gpx_file.write(GPX)
+        try:
+            status, headers, image = await request(
+                self.port, "GET", f"/render?path={filename}&format=svg&dpi=20"
+            )
+        finally:
+            os.remove(filename)
+        self.assertEqual((status, headers["Content-Type"]), (200, "image/svg+xml"))
+        self.assertIn(b"<svg", image)
+
+        for method, target, body, expected in (
+            ("GET", "/render?format=gif", GPX, 400),
+            ("GET", "/render?dpi=big", GPX, 400),
+            ("POST", "/render?points=1", GPX, 400),
+            ("GET", "/render", b"", 400),
+            ("GET", "/render?path=/missing.gpx", b"", 404),
+            ("DELETE", "/render", GPX, 405),
+            ("GET", "/other", b"", 404),
+            ("POST", "/render", b"<gpx", 500),
+        ):
+            status, _, payload = await request(self.port, method, target, body)
+            self.assertEqual(status, expected, target)
+            self.assertIn("error", json.loads(payload))
+
+        status, _, payload = await request(self.port, "GET", "/stats")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(payload)["renders"], 3)
+
+    def test_percentile(self):
+        """test nearest rank percentiles"""
+
+        values = list(range(1, 101))
+        self.assertEqual(
+            [percentile(values, rank) for rank in (1, 50, 90, 99, 100)], [1, 50, 90, 99, 100]
+        )
+        self.assertEqual(percentile([5.0], 50), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""incremental profile builder test module"""
+
+import unittest
+
+import numpy as np
+
+from gpxprofpy.builder import ProfileBuilder
+from gpxprofpy.segments import get_real_positive_slope_segments, get_real_slope_segments
+from gpxprofpy.utils import calculate_distance, calculate_slope
+
+
+def random_track(size, seed):
+    """Returns latitude, longitude and elevation of a random walk"""
+
+    rng = np.random.default_rng(seed)
+    latitude = 45 + np.cumsum(rng.normal(0, 2e-4, size))
+    longitude = 6 + np.cumsum(rng.normal(0, 2e-4, size))
+    elevation = np.round(1000 + np.cumsum(rng.normal(0, 2, size)))
+
+    return latitude, longitude, elevation
+
+
+class TestProfileBuilder(unittest.TestCase):
+    """Incremental profile builder test class"""
+
+    def setUp(self):
+        self.latitude, self.longitude, self.elevation = random_track(2000, 0)
+        self.distance = calculate_distance(self.latitude, self.longitude)
+
+    def feed(self, builder, seed, check):
+        """Feeds the track by random batches, checking after each one"""
+
+        rng = np.random.default_rng(seed)
+        i = 0
+        while i < len(self.latitude):
+            k = int(rng.integers(1, 50))
+            builder.extend(
+                self.latitude[i : i + k], self.longitude[i : i + k], self.elevation[i : i + k]
+            )
+            i = min(i + k, len(self.latitude))
+            check(builder, i)
+
+    def test_extend_distance_slope(self):
+        """test distance and slope equal a computation on the whole track"""
+
+        def check(builder, i):
+            profile = builder.profile()
+            np.testing.assert_array_equal(profile.distance, self.distance[:i])
+            np.testing.assert_array_equal(
+                profile.slope, calculate_slope(self.distance[:i], self.elevation[:i])
+            )
+
+        builder = ProfileBuilder(capacity=1)
+        self.feed(builder, 0, check)
+        self.assertEqual(len(builder), 2000)
+
+    def test_extend_slope_window(self):
+        """test smoothed slope equals a computation on the whole track"""
+
+        def check(builder, i):
+            np.testing.assert_allclose(
+                builder.profile().slope,
+                calculate_slope(self.distance[:i], self.elevation[:i], 0.5),
+            )
+
+        self.feed(ProfileBuilder(slope_window=0.5), 1, check)
+
+    def test_segments(self):
+        """test segments equal a segmentation of the whole track"""
+
+        def check(builder, i):
+            self.assertEqual(
+                [(seg.start, seg.end, seg.sign) for seg in builder.real_slope_segments()],
+                [
+                    (seg.start, seg.end, seg.sign)
+                    for seg in get_real_slope_segments(
+                        self.distance[:i], self.elevation[:i], 1
+                    )
+                ],
+            )
+
+        for seed in range(3):
+            self.feed(ProfileBuilder(), seed, check)
+
+        builder = ProfileBuilder()
+        builder.extend(self.latitude, self.longitude, self.elevation)
+        self.assertEqual(
+            [seg.get_size() for seg in builder.positive_slope_segments()],
+            [
+                seg.get_size()
+                for seg in get_real_positive_slope_segments(self.distance, self.elevation)
+            ],
+        )
+
+    def test_segments_slope_window(self):
+        """test segments equal the segments of the profile with a slope window"""
+
+        def check(builder, i):
+            self.assertEqual(
+                [
+                    (seg.start, seg.end, seg.sign, seg.mean_slope())
+                    for seg in builder.real_slope_segments()
+                ],
+                [
+                    (seg.start, seg.end, seg.sign, seg.mean_slope())
+                    for seg in builder.profile().slope_segments(1)
+                ],
+            )
+
+        for seed in range(3):
+            self.feed(ProfileBuilder(slope_window=0.3), seed, check)
+
+    def test_append(self):
+        """test appending points one by one"""
+
+        builder = ProfileBuilder()
+        for latitude, longitude, elevation in zip(
+            self.latitude[:100], self.longitude[:100], self.elevation[:100]
+        ):
+            builder.append(latitude, longitude, elevation)
+            builder.real_slope_segments()
+        np.testing.assert_array_equal(builder.profile().distance, self.distance[:100])
+
+    def test_extend_lengths(self):
+        """test extending with arrays of different lengths"""
+        self.assertRaises(ValueError, ProfileBuilder().extend, [45, 46], [6], [1000])
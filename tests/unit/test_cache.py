@@ -0,0 +1,94 @@
+"""cache functions test module"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gpxprofpy.cache import ProfileCache
+from gpxprofpy.profile import GPXFile
+
+GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="45.0" lon="6.0"><ele>1000</ele></trkpt>
+    <trkpt lat="45.001" lon="6.001"><ele>1010</ele></trkpt>
+    <trkpt lat="45.002" lon="6.002"><ele>1005</ele></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+class TestProfileCache(unittest.TestCase):
+    """Profile cache test class"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ProfileCache(os.path.join(self.tmp_dir.name, "cache"))
+        self.filename = os.path.join(self.tmp_dir.name, "track.gpx")
+        with open(self.filename, "w", encoding="utf-8") as gpx_file:
+            gpx_file.write(GPX)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_put(self):
+        """test cache hit and miss counters"""
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.put("key", {"distance": np.arange(3.0)})
+        np.testing.assert_equal(self.cache.get("key")["distance"], [0, 1, 2])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_invalidate(self):
+        """test cache entry invalidation"""
+        self.cache.put("key", {"distance": np.arange(3.0)})
+        self.assertTrue(self.cache.invalidate("key"))
+        self.assertFalse(self.cache.invalidate("key"))
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_put_failure(self):
+        """test a failed write leaves no temporary file"""
+        with mock.patch("numpy.savez", side_effect=OSError("disk full")):
+            self.assertRaises(OSError, self.cache.put, "key", {"distance": np.arange(3.0)})
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_evict(self):
+        """test least recently used entries are evicted first"""
+        self.cache.max_size = 3 * 2000
+        for key in ("a", "b", "c"):
+            self.cache.put(key, {"distance": np.zeros(200)})
+        os.utime(self.cache.path("a"), ns=(0, 0))
+        os.utime(self.cache.path("b"), ns=(1, 1))
+        os.utime(self.cache.path("c"), ns=(2, 2))
+        self.cache.get("a")
+        self.cache.put("d", {"distance": np.zeros(200)})
+        self.assertEqual(
+            sorted(entry.name for entry in self.cache.entries()),
+            ["a.npz", "c.npz", "d.npz"],
+        )
+
+    def test_key(self):
+        """test key depends on file content and options"""
+        key = self.cache.key(self.filename, gaps="bridge")
+        self.assertEqual(key, self.cache.key(self.filename, gaps="bridge"))
+        self.assertNotEqual(key, self.cache.key(self.filename, gaps="break"))
+        with open(self.filename, "a", encoding="utf-8") as gpx_file:
+            gpx_file.write("\n")
+        self.assertNotEqual(key, self.cache.key(self.filename, gaps="bridge"))
+
+    def test_gpx_file_profile(self):
+        """test GPXFile profile goes through the cache"""
+        gpx_file = GPXFile(self.filename, cache=self.cache)
+        computed = gpx_file.profile()
+        cached = gpx_file.profile()
+        np.testing.assert_equal(cached.distance, computed.distance)
+        np.testing.assert_equal(cached.slope, computed.slope)
+        self.assertEqual(cached.name, computed.name)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
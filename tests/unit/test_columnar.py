@@ -0,0 +1,77 @@
+"""columnar format test module"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gpxprofpy.columnar import convert_gpx, open_profile, read_header, write_profile
+from gpxprofpy.profile import GPXProfile
+
+GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="45.0" lon="6.0"><ele>1000</ele></trkpt>
+    <trkpt lat="45.001" lon="6.001"><ele>1010</ele></trkpt>
+  </trkseg><trkseg>
+    <trkpt lat="45.002" lon="6.002"><ele>1005</ele></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+class TestColumnarFormat(unittest.TestCase):
+    """Columnar format test class"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, "profile.gpxprof")
+        self.profile = GPXProfile(
+            "test",
+            np.array([0, 1, 2.5]),
+            np.array([0, 50, 100.0]),
+            np.array([0, 5, 3.33]),
+            latitude=np.array([45, 45.01, 45.02]),
+            longitude=np.array([6, 6.01, 6.02]),
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_write_open_profile(self):
+        """test profile round trip through the columnar format"""
+        write_profile(self.profile, self.filename)
+        mapped = open_profile(self.filename)
+        self.assertIsInstance(mapped.distance, np.memmap)
+        self.assertEqual(mapped.name, "test")
+        for name, array in self.profile.arrays().items():
+            np.testing.assert_equal(getattr(mapped, name), array)
+        self.assertEqual(mapped.max_distance(), 2.5)
+        self.assertEqual(mapped.max_elevation(), 100)
+
+    def test_columns_alignment(self):
+        """test columns are aligned in the file"""
+        write_profile(self.profile, self.filename)
+        for column in read_header(self.filename)["columns"]:
+            self.assertEqual(column["offset"] % 64, 0)
+
+    def test_open_invalid_file(self):
+        """test opening a file that is not a columnar profile"""
+        with open(self.filename, "wb") as profile_file:
+            profile_file.write(b"<gpx></gpx>")
+        self.assertRaises(ValueError, open_profile, self.filename)
+
+    def test_convert_gpx(self):
+        """test GPX conversion to the columnar format"""
+        gpx_filename = os.path.join(self.tmp_dir.name, "track.gpx")
+        with open(gpx_filename, "w", encoding="utf-8") as gpx_file:
+            gpx_file.write(GPX)
+        mapped = open_profile(convert_gpx(gpx_filename, gaps="break"))
+        np.testing.assert_equal(mapped.elevation, [1000, 1010, 1005])
+        np.testing.assert_equal(mapped.breaks, [2])
+        np.testing.assert_equal(mapped.latitude, [45, 45.001, 45.002])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""decimation functions test module"""
+
+import unittest
+
+import numpy as np
+
+from gpxprofpy.decimate import (
+    douglas_peucker_indexes,
+    lttb_indexes,
+    minmax_indexes,
+    point_budget,
+    select_indexes,
+)
+
+
+class TestDecimateFunctions(unittest.TestCase):
+    """Decimation functions test class"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.cumsum(rng.uniform(0, 0.01, 10000))
+        self.y = 1000 + np.cumsum(rng.normal(0, 1, 10000))
+
+    def test_point_budget(self):
+        """test point budget of a figure"""
+        self.assertEqual(point_budget((14, 3), 100), 2800)
+
+    def test_minmax_indexes(self):
+        """test min/max decimation keeps ends and extremes"""
+        indexes = minmax_indexes(self.x, self.y, 200)
+        self.assertLessEqual(len(indexes), 202)
+        self.assertEqual((indexes[0], indexes[-1]), (0, 9999))
+        self.assertIn(np.argmax(self.y), indexes)
+        self.assertIn(np.argmin(self.y), indexes)
+        np.testing.assert_equal(minmax_indexes(self.x[:10], self.y[:10], 200), np.arange(10))
+
+    def test_lttb_indexes(self):
+        """test LTTB decimation size"""
+        indexes = lttb_indexes(self.x, self.y, 300)
+        self.assertEqual(len(indexes), 300)
+        self.assertTrue(np.all(np.diff(indexes) > 0))
+        self.assertEqual((indexes[0], indexes[-1]), (0, 9999))
+
+    def test_douglas_peucker_indexes(self):
+        """test Douglas-Peucker decimation"""
+        line = np.arange(100.0)
+        np.testing.assert_equal(douglas_peucker_indexes(line, 2 * line, 0.1), [0, 99])
+        peak = np.minimum(line, 99 - line)
+        self.assertIn(49, douglas_peucker_indexes(line, peak, 0.1))
+        self.assertEqual(len(douglas_peucker_indexes(self.x, self.y, budget=500)), 500)
+
+    def test_select_indexes_unknown_method(self):
+        """test select_indexes with an unknown method"""
+        self.assertRaises(ValueError, select_indexes, self.x, self.y, 100, "random")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,11 @@ import unittest
 
 import numpy as np
 
-from gpxprofpy.utils import distance_between_points, calculate_distance
+from gpxprofpy.utils import (
+    distance_between_points,
+    calculate_distance,
+    DISTANCE_METHODS,
+)
 
 
 class TestDistanceFunctions(unittest.TestCase):
@@ -26,6 +30,56 @@ class TestDistanceFunctions(unittest.TestCase):
         """tes calculate distance"""
         np.testing.assert_almost_equal(calculate_distance(self.lat, self.lon), [0, 8120, 25245], 0)
 
+    def test_calculate_distance_matches_loop(self):
+        """test calculate_distance against the per-point formula"""
+        rng = np.random.default_rng(0)
+        lat = 45 + np.cumsum(rng.normal(0, 2e-4, 500))
+        lon = 6 + np.cumsum(rng.normal(0, 2e-4, 500))
+        expected = np.cumsum(
+            [0]
+            + [
+                distance_between_points(*np.radians([lat[i], lon[i], lat[i + 1], lon[i + 1]]))
+                for i in range(len(lat) - 1)
+            ]
+        )
+        for method in DISTANCE_METHODS:
+            np.testing.assert_allclose(
+                calculate_distance(lat, lon, method), expected, rtol=5e-3
+            )
+        np.testing.assert_allclose(
+            calculate_distance(lat, lon, "haversine", np.float32), expected, rtol=1e-4
+        )
+
+    def test_calculate_distance_float32(self):
+        """test calculate_distance in single precision against double precision"""
+        rng = np.random.default_rng(0)
+        lat = 45 + np.cumsum(rng.normal(0, 5e-5, 2000))
+        lon = 6 + np.cumsum(rng.normal(0, 5e-5, 2000))
+        for method in DISTANCE_METHODS:
+            with self.subTest(method=method):
+                distance = calculate_distance(lat, lon, method, np.float32)
+                self.assertEqual(distance.dtype, np.float32)
+                np.testing.assert_allclose(
+                    distance, calculate_distance(lat, lon, method), rtol=1e-3, atol=1e-3
+                )
+
+    def test_calculate_distance_vincenty(self):
+        """test calculate_distance on the WGS84 ellipsoid"""
+        np.testing.assert_almost_equal(
+            calculate_distance(np.array([0, 0]), np.array([0, 1]), "vincenty"),
+            [0, 111.319],
+            3,
+        )
+
+    def test_calculate_distance_short(self):
+        """test calculate_distance on tracks with less than 2 points"""
+        self.assertEqual(len(calculate_distance(np.array([]), np.array([]))), 0)
+        np.testing.assert_equal(calculate_distance(np.array([1]), np.array([1])), [0])
+
+    def test_calculate_distance_unknown_method(self):
+        """test calculate_distance with an unknown method"""
+        self.assertRaises(ValueError, calculate_distance, self.lat, self.lon, "flat")
+
 
 if __name__ == "__main__":
     unittest.main()
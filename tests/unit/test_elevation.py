@@ -0,0 +1,57 @@
+"""elevation lookup functions test module"""
+
+import unittest
+
+import numpy as np
+
+from gpxprofpy.utils import find_closest_elevation, find_elevations
+
+
+def reference_closest_elevation(distance, elevation, target_distance):
+    """Boolean mask lookup, as implemented before searchsorted"""
+
+    elevation_sup = elevation[distance >= target_distance]
+    if len(elevation_sup) > 0:
+        return elevation_sup[0]
+    return elevation[-1]
+
+
+class TestElevationFunctions(unittest.TestCase):
+    """Elevation lookup functions test class"""
+
+    def setUp(self):
+        self.distance = np.array([0, 1, 2.5, 3, 4, 4, 6.5])
+        self.elevation = np.array([0, 100, 120, 120, 70, 40, 45])
+        self.targets = np.array([-1, 0, 0.2, 0.8, 2.5, 3.9, 4, 5, 6.5, 10])
+
+    def test_find_elevations_next(self):
+        """test next point lookup matches the mask lookup"""
+        np.testing.assert_equal(
+            find_elevations(self.distance, self.elevation, self.targets),
+            [
+                reference_closest_elevation(self.distance, self.elevation, target)
+                for target in self.targets
+            ],
+        )
+        self.assertEqual(find_closest_elevation(self.distance, self.elevation, 2.6), 120)
+
+    def test_find_elevations_nearest(self):
+        """test nearest point lookup"""
+        np.testing.assert_equal(
+            find_elevations(self.distance, self.elevation, self.targets, "nearest"),
+            [0, 0, 0, 100, 120, 70, 70, 40, 45, 45],
+        )
+
+    def test_find_elevations_interp(self):
+        """test interpolated lookup"""
+        np.testing.assert_allclose(
+            find_elevations(self.distance, self.elevation, [-1, 0.5, 2, 7], "interp"),
+            [0, 50, 113.33, 45],
+            atol=0.01,
+        )
+
+    def test_find_elevations_unknown_method(self):
+        """test unknown lookup method"""
+        self.assertRaises(
+            ValueError, find_elevations, self.distance, self.elevation, [1], "previous"
+        )
@@ -0,0 +1,86 @@
+"""package import time test module"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import gpxprofpy
+
+# Modules that must not pay for matplotlib or gpxpy when imported
+ANALYSIS_MODULES = [
+    "gpxprofpy",
+    "gpxprofpy.profile",
+    "gpxprofpy.segments",
+    "gpxprofpy.points",
+    "gpxprofpy.builder",
+    "gpxprofpy.stream",
+    "gpxprofpy.columnar",
+]
+
+
+def run_python(
+    *args: str, env: dict[str, str] | None = None
+) -> subprocess.CompletedProcess:
+    """Runs a fresh interpreter able to import this gpxprofpy, with extra
+    environment variables env"""
+
+    src_dir = os.path.dirname(os.path.dirname(gpxprofpy.__file__))
+    env = {**os.environ, **(env or {})}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Returns cumulative import time in microseconds of each module imported
+    by statement in a fresh interpreter, from ``python -X importtime``"""
+
+    result = run_python("-X", "importtime", "-c", statement)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+class TestImports(unittest.TestCase):
+    """Package import time test class"""
+
+    def test_analysis_without_matplotlib(self):
+        """test parsing and analysis modules do not import plotting libraries"""
+
+        for module in ANALYSIS_MODULES:
+            with self.subTest(module=module):
+                times = import_times(f"import {module}")
+                self.assertIn(module, times)
+                heavy = sorted(
+                    name
+                    for name in times
+                    if name.split(".")[0] in ("matplotlib", "gpxpy")
+                    or name in ("gpxprofpy.main", "gpxprofpy.renderer")
+                )
+                self.assertEqual(heavy, [], f"{module} imports {heavy}")
+
+    def test_lazy_plotting(self):
+        """test plotting functions are loaded on first use, without pyplot"""
+
+        # importtime does not report modules loaded by importlib.import_module
+        modules = run_python(
+            "-c", "import sys, gpxprofpy; gpxprofpy.render_profile; print(*sys.modules)"
+        ).stdout.split()
+        self.assertIn("gpxprofpy.main", modules)
+        self.assertIn("matplotlib.figure", modules)
+        self.assertNotIn("matplotlib.pyplot", modules)
+
+        self.assertIs(gpxprofpy.render_profile, gpxprofpy.main.render_profile)
+        self.assertIs(gpxprofpy.plot_gpx_profiles, gpxprofpy.batch.plot_gpx_profiles)
+        self.assertRaises(AttributeError, getattr, gpxprofpy, "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
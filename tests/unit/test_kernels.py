@@ -0,0 +1,160 @@
+"""compute kernel backends test module"""
+
+import importlib.util
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gpxprofpy import kernels, segments, utils
+
+from .test_imports import run_python
+
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+def merge_reference(slope_segments, threshold):
+    """Restart-from-zero merge passes, the original merge algorithm"""
+
+    for find_first in (
+        segments.find_first_negative_mergeable_segment,
+        segments.find_first_positive_mergeable_segment,
+        segments.find_first_negative_mergeable_segment,
+    ):
+        slope_segments = list(slope_segments)
+        index = find_first(slope_segments, threshold)
+        while index is not None:
+            slope_segments = segments.merge_three_segments(slope_segments, index)
+            index = find_first(slope_segments, threshold)
+
+    return slope_segments
+
+
+def bounds(slope_segments):
+    """Returns (start, end, sign) of segments"""
+    return [(seg.start, seg.end, seg.sign) for seg in slope_segments]
+
+
+class TestKernels(unittest.TestCase):
+    """Compute kernel backends test class"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.tracks = []
+        for size in (1, 2, 3, 50, 2000):
+            latitude = 45 + np.cumsum(rng.normal(0, 1e-4, size))
+            longitude = 6 + np.cumsum(rng.normal(0, 1e-4, size))
+            elevation = np.round(1000 + np.cumsum(rng.normal(0, 1, size)), 1)
+            elevation[rng.random(size) < 0.01] = np.nan
+            self.tracks.append((latitude, longitude, elevation))
+
+    def test_backends_equivalence(self):
+        """test every available backend against the numpy reference"""
+
+        for backend in kernels.available_backends():
+            for latitude, longitude, elevation in self.tracks:
+                with kernels.use_backend("numpy"):
+                    expected = self.run_kernels(latitude, longitude, elevation)
+                with self.subTest(backend=backend, points=len(latitude)):
+                    with kernels.use_backend(backend):
+                        results = self.run_kernels(latitude, longitude, elevation)
+                    for name, result in results.items():
+                        if name.startswith("distance"):
+                            np.testing.assert_allclose(
+                                result,
+                                expected[name],
+                                rtol=1e-5,
+                                atol=1e-9,
+                                err_msg=name,
+                            )
+                        else:
+                            np.testing.assert_equal(result, expected[name], err_msg=name)
+
+    def run_kernels(self, latitude, longitude, elevation) -> dict:
+        """Returns results of the public functions built on kernels"""
+
+        results = {}
+        for method in utils.DISTANCE_METHODS:
+            for dtype in (np.float64, np.float32):
+                name = f"distance {method} {dtype.__name__}"
+                results[name] = utils.calculate_distance(
+                    latitude, longitude, method, dtype
+                )
+        distance = utils.calculate_distance(latitude, longitude)
+        slope = utils.calculate_slope(distance, elevation)
+        results["slope"] = slope
+        results["ends"] = segments.find_segments_end_indexes(utils.get_slope_sign(slope))
+        all_segments = segments.get_all_slope_segments(distance, elevation)
+        for threshold in (0.01, 0.05, 0.5):
+            results[f"merge {threshold}"] = bounds(
+                segments.merge_segments(all_segments, threshold)
+            )
+        return results
+
+    def test_merge_reference(self):
+        """test the merge sweep kernel gives the original merge passes results"""
+
+        latitude, longitude, elevation = self.tracks[-1]
+        distance = utils.calculate_distance(latitude, longitude)
+        all_segments = segments.get_all_slope_segments(distance, elevation)
+        for threshold in (0.01, 0.05, 0.5):
+            self.assertEqual(
+                bounds(segments.merge_segments(all_segments, threshold)),
+                bounds(merge_reference(all_segments, threshold)),
+            )
+
+    def test_registry(self):
+        """test backends fall back to reference kernels and are restored"""
+
+        def steps_slope(distance, elevation):
+            return np.full(len(distance), 7.0)
+
+        kernels_patch = mock.patch.dict(
+            kernels._kernels, {"test": {"steps_slope": steps_slope}}
+        )
+        with kernels_patch, mock.patch.dict(os.environ), mock.patch.object(
+            kernels, "_backend", None
+        ):
+            os.environ.pop("GPXPROFPY_BACKEND", None)
+            self.assertIn("test", kernels.available_backends())
+            with kernels.use_backend("test"):
+                self.assertEqual(kernels.get_backend(), "test")
+                self.assertIs(kernels.get("steps_slope"), steps_slope)
+                np.testing.assert_array_equal(utils.calculate_slope([0, 1], [0, 1]), [7, 7])
+                self.assertIs(kernels.get("segments_ends"), segments._segments_ends)
+            self.assertEqual(kernels.get_backend(), "numpy")
+        self.assertRaises(ValueError, kernels.set_backend, "fortran")
+
+    def test_environment_backend(self):
+        """test the environment backend is applied once the package is imported"""
+
+        for backend in ("numba", "auto", "numpy"):
+            with self.subTest(backend=backend):
+                result = run_python(
+                    "-W",
+                    "ignore::RuntimeWarning",
+                    "-c",
+                    "import gpxprofpy.profile\n"
+                    "from gpxprofpy import kernels, utils\n"
+                    "utils.calculate_distance([45, 45.1], [6, 6.1])\n"
+                    "print(kernels.get_backend())",
+                    env={"GPXPROFPY_BACKEND": backend},
+                )
+                expected = "numpy" if backend == "numpy" or not HAS_NUMBA else "numba"
+                self.assertEqual(result.stdout.strip(), expected)
+
+    @unittest.skipIf(HAS_NUMBA, "numba is installed")
+    def test_fallback_without_numba(self):
+        """test selecting numba without numba warns and keeps numpy"""
+
+        self.assertEqual(kernels.available_backends(), ["numpy"])
+        with self.assertWarns(RuntimeWarning):
+            with kernels.use_backend("numba") as backend:
+                self.assertEqual(backend, "numpy")
+        with kernels.use_backend("auto") as backend:
+            self.assertEqual(backend, "numpy")
+
+
+if __name__ == "__main__":
+    unittest.main()
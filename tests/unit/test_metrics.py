@@ -0,0 +1,119 @@
+"""pipeline stage metrics test module"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gpxprofpy import metrics
+from gpxprofpy.profile import GPXProfile, read_gpx_file
+
+GPX = """<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>
+{}
+</trkseg></trk></gpx>"""
+
+
+class TestMetrics(unittest.TestCase):
+    """Pipeline stage metrics test class"""
+
+    def test_disabled(self):
+        """test stages are a shared no-op without subscriber"""
+
+        self.assertIs(metrics.stage("a"), metrics.stage("b"))
+        with metrics.stage("a") as stage:
+            stage.count(points=1)
+            metrics.count(points=1)
+
+    def test_record(self):
+        """test nested stages report times, parents and summed counts"""
+
+        with metrics.record() as records:
+            with metrics.stage("outer") as outer:
+                outer.count(points=10)
+                with metrics.stage("inner"):
+                    metrics.count(merge_iterations=2)
+                    metrics.count(merge_iterations=3, segments=1)
+        metrics.stage("after")
+
+        self.assertEqual([record.stage for record in records], ["inner", "outer"])
+        inner, outer = records
+        self.assertEqual((inner.parent, outer.parent), ("outer", None))
+        self.assertEqual((inner.merge_iterations, inner.segments), (5, 1))
+        self.assertEqual((outer.points, outer.merge_iterations), (10, None))
+        self.assertGreaterEqual(outer.wall_time, inner.wall_time)
+        self.assertIsNone(outer.peak_bytes)
+        self.assertIs(metrics.stage("a"), metrics.stage("b"))
+
+    def test_trace_memory(self):
+        """test peak memory of a stage includes its inner stages"""
+
+        with metrics.record(trace_memory=True) as records:
+            with metrics.stage("outer"):
+                with metrics.stage("inner"):
+                    array = np.ones(1_000_000)
+                del array
+                array = np.ones(10_000)
+
+        inner, outer = records
+        self.assertGreaterEqual(inner.peak_bytes, 8_000_000)
+        self.assertGreaterEqual(outer.peak_bytes, inner.peak_bytes)
+
+    def test_subscribe(self):
+        """test callbacks receive stages until unsubscribed, even failed ones"""
+
+        output = io.StringIO()
+        writer = metrics.subscribe(metrics.JsonLinesWriter(output))
+        try:
+            with self.assertRaises(KeyError):
+                with metrics.stage("failed"):
+                    raise KeyError
+        finally:
+            metrics.unsubscribe(writer)
+        self.assertRaises(ValueError, metrics.unsubscribe, writer)
+
+        self.assertEqual(json.loads(output.getvalue())["stage"], "failed")
+
+    def test_pipeline(self):
+        """test reading and segmenting a file reports each stage as JSON lines"""
+
+        points = "\n".join(
+            f'<trkpt lat="45.{i:04d}" lon="6.0"><ele>{1000 + 10 * (i % 7)}</ele></trkpt>'
+            for i in range(100)
+        )
+        file_descriptor, filename = tempfile.mkstemp(suffix=".gpx")
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as gpx_file:
+            gpx_file.write(GPX.format(points))
+        try:
+            with metrics.record() as records:
+                profile = read_gpx_file(filename)
+                segments = profile.slope_segments(0.5)
+            metrics.write_json_lines(records, filename)
+            with open(filename, encoding="utf-8") as lines:
+                exported = [json.loads(line) for line in lines]
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(
+            [(line["stage"], line["parent"], line["points"]) for line in exported],
+            [
+                ("extract.stream", "read_gpx_file", 100),
+                ("distance", "read_gpx_file", 100),
+                ("read_gpx_file", None, 100),
+                ("slope", None, 100),
+                ("segments", None, 100),
+            ],
+        )
+        self.assertEqual(exported[-1]["segments"], len(segments))
+        self.assertGreater(exported[-1]["merge_iterations"], 0)
+
+        with metrics.record() as records:
+            GPXProfile("", profile.distance, profile.elevation).slope_segments(0.5)
+            profile.slope_segments(0.5)
+        self.assertEqual([record.stage for record in records], ["slope", "segments"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""parser functions test module"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gpxprofpy.profile import extract_data, extract_parts, read_gpx_file
+
+GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <metadata><time>2024-06-01T05:00:00Z</time></metadata>
+  <trk>
+    <trkseg>
+      <trkpt lat="45.0" lon="6.0"><ele>1000</ele><time>2024-06-01T06:00:00Z</time></trkpt>
+      <trkpt lat="45.001" lon="6.001"><ele>1010.5</ele><time>2024-06-01T06:00:10Z</time></trkpt>
+      <trkpt lat="45.002" lon="6.002"><time>2024-06-01T06:00:20Z</time></trkpt>
+    </trkseg>
+  </trk>
+</gpx>
+"""
+
+MULTI_PART_GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <rte>
+    <rtept lat="0" lon="0"><ele>0</ele></rtept>
+    <rtept lat="0" lon="0.01"><ele>10</ele></rtept>
+  </rte>
+  <trk>
+    <trkseg>
+      <trkpt lat="0" lon="0.02"><ele>20</ele></trkpt>
+    </trkseg>
+    <trkseg></trkseg>
+  </trk>
+  <trk>
+    <trkseg>
+      <trkpt lat="0" lon="0.03"><ele>30</ele></trkpt>
+      <trkpt lat="0" lon="0.04"><ele>40</ele></trkpt>
+    </trkseg>
+  </trk>
+</gpx>
+"""
+
+EXTENSIONS_GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1"
+     xmlns:x="http://example.com/ext">
+  <trk>
+    <trkseg>
+      <trkpt lat="45.0" lon="6.0">
+        <ele>120</ele>
+        <extensions><x:ele>999</x:ele><x:data><ele>998</ele></x:data></extensions>
+      </trkpt>
+      <trkpt lat="45.001" lon="6.001">
+        <extensions><x:ele>999</x:ele></extensions>
+      </trkpt>
+    </trkseg>
+  </trk>
+</gpx>
+"""
+
+
+def write_temp_gpx(content: str) -> str:
+    """Writes content to a temporary GPX file and returns its name"""
+
+    file_descriptor, filename = tempfile.mkstemp(suffix=".gpx")
+    with os.fdopen(file_descriptor, "w", encoding="utf-8") as gpx_file:
+        gpx_file.write(content)
+
+    return filename
+
+
+class TestParserFunctions(unittest.TestCase):
+    """Parser functions test class"""
+
+    def setUp(self):
+        self.filename = write_temp_gpx(GPX)
+        self.multi_part_filename = write_temp_gpx(MULTI_PART_GPX)
+
+    def tearDown(self):
+        os.remove(self.filename)
+        os.remove(self.multi_part_filename)
+
+    def test_extract_data_stream(self):
+        """test extract_data with the streaming backend"""
+        latitude, longitude, elevation = extract_data(self.filename)
+        np.testing.assert_equal(latitude, [45, 45.001, 45.002])
+        np.testing.assert_equal(longitude, [6, 6.001, 6.002])
+        np.testing.assert_equal(elevation, [1000, 1010.5, np.nan])
+
+    def test_extract_data_backends(self):
+        """test extract_data gives the same data with both backends"""
+        stream = extract_data(self.filename, backend="stream", with_time=True)
+        gpxpy = extract_data(self.filename, backend="gpxpy", with_time=True)
+        for stream_column, gpxpy_column in zip(stream, gpxpy):
+            np.testing.assert_equal(stream_column, gpxpy_column)
+        self.assertEqual(stream[3][1], np.datetime64("2024-06-01T06:00:10"))
+
+    def test_extract_data_extensions(self):
+        """test elements of point extensions are ignored by both backends"""
+        filename = write_temp_gpx(EXTENSIONS_GPX)
+        try:
+            for backend in ("stream", "gpxpy"):
+                _, _, elevation = extract_data(filename, backend)
+                np.testing.assert_equal(elevation, [120, np.nan], err_msg=backend)
+        finally:
+            os.remove(filename)
+
+    def test_extract_data_unknown_backend(self):
+        """test extract_data with an unknown backend"""
+        self.assertRaises(ValueError, extract_data, self.filename, "lxml")
+
+    def test_extract_parts(self):
+        """test extract_parts assembles routes, tracks and segments"""
+        for backend in ("stream", "gpxpy"):
+            (_, longitude, elevation), starts = extract_parts(
+                self.multi_part_filename, backend
+            )
+            np.testing.assert_equal(longitude, [0, 0.01, 0.02, 0.03, 0.04])
+            np.testing.assert_equal(elevation, [0, 10, 20, 30, 40])
+            np.testing.assert_equal(starts, [0, 2, 3])
+
+    def test_read_gpx_file_gaps(self):
+        """test read_gpx_file bridging or breaking gaps between parts"""
+        bridged = read_gpx_file(self.multi_part_filename)
+        broken = read_gpx_file(self.multi_part_filename, gaps="break")
+        np.testing.assert_almost_equal(bridged.distance, np.arange(5) * 1.112, 3)
+        np.testing.assert_almost_equal(broken.distance, [0, 1.112, 1.112, 1.112, 2.224], 3)
+        np.testing.assert_equal(broken.breaks, [2, 3])
+        self.assertEqual(len(bridged.breaks), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""remarquable points functions test module"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gpxprofpy import points as pts
+from gpxprofpy.points import (
+    RemarquablePoint,
+    load_remarquable_points,
+    read_remarquable_points_file,
+)
+
+POINTS = """0 Start 1
+12.5 |Col de la Croix| 0
+
+42 Finish 1
+"""
+
+
+class TestPointsFunctions(unittest.TestCase):
+    """Remarquable points functions test class"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, "points.csv")
+        self.write(POINTS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, content, mtime=None):
+        """Writes points file, with a given modification time"""
+        with open(self.filename, "w", encoding="utf-8") as csvfile:
+            csvfile.write(content)
+        if mtime is not None:
+            os.utime(self.filename, (mtime, mtime))
+
+    def test_load_remarquable_points(self):
+        """test points file is loaded as a structured array"""
+        points = load_remarquable_points(self.filename)
+        np.testing.assert_equal(points["distance"], [0, 12.5, 42])
+        self.assertEqual(points["label"][1], "Col de la Croix")
+        np.testing.assert_equal(points["has_water"], [True, False, True])
+        self.assertFalse(points.flags.writeable)
+
+    def test_read_remarquable_points_file(self):
+        """test points file is read as remarquable points"""
+        points = read_remarquable_points_file(self.filename)
+        self.assertEqual(points[1], RemarquablePoint(12.5, "Col de la Croix", False))
+        self.assertFalse(hasattr(points[0], "__dict__"))
+
+    def test_load_remarquable_points_malformed(self):
+        """test malformed lines are reported by line number"""
+        self.write("0 Start 1\n12 Col\nfar Finish 1\n3 Lake yes\n")
+        with self.assertRaises(ValueError) as context:
+            load_remarquable_points(self.filename)
+        message = str(context.exception)
+        for line in ("line 2", "line 3", "line 4"):
+            self.assertIn(line, message)
+        self.assertNotIn("line 1:", message)
+
+    def test_load_remarquable_points_cache(self):
+        """test points file is parsed again only when it changes"""
+        self.write(POINTS, 1_000_000)
+        points = load_remarquable_points(self.filename)
+        self.assertIs(load_remarquable_points(self.filename), points)
+        self.write(POINTS + "50 Hut 1\n", 2_000_000)
+        self.assertEqual(len(load_remarquable_points(self.filename)), 4)
+
+    def test_load_remarquable_points_cache_size(self):
+        """test only the last loaded points files are cached"""
+        filenames = [os.path.join(self.tmp_dir.name, f"{i}.csv") for i in range(3)]
+        for filename in filenames:
+            with open(filename, "w", encoding="utf-8") as csvfile:
+                csvfile.write(POINTS)
+        cache = mock.patch.object(pts, "_POINTS_CACHE", pts.OrderedDict())
+        with cache, mock.patch.object(pts, "_POINTS_CACHE_SIZE", 2):
+            for filename in filenames[:2] + filenames[:1] + filenames[2:]:
+                load_remarquable_points(filename)
+            self.assertEqual(list(pts._POINTS_CACHE), [filenames[0], filenames[2]])
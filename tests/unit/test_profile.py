@@ -0,0 +1,122 @@
+"""profile functions test module"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gpxprofpy import main, utils
+from gpxprofpy.profile import GPXProfile
+from gpxprofpy.segments import get_all_slope_segments, get_real_slope_segments
+from gpxprofpy.utils import calculate_slope
+
+
+class TestProfileStats(unittest.TestCase):
+    """Profile statistics test class"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.distance = np.cumsum(np.append(0, rng.uniform(0, 0.1, 999)))
+        self.elevation = 1000 + np.cumsum(rng.normal(0, 5, 1000))
+        self.slope = calculate_slope(self.distance, self.elevation)
+        self.profile = GPXProfile("test", self.distance, self.elevation, self.slope)
+
+    def test_stats(self):
+        """test O(1) statistics against direct computation"""
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            start, end = sorted(rng.choice(1000, 2, replace=False))
+            deltas = np.diff(self.elevation[start : end + 1])
+            stats = self.profile.stats(start, end)
+            self.assertAlmostEqual(
+                stats.distance, self.distance[end] - self.distance[start]
+            )
+            self.assertAlmostEqual(
+                stats.mean_slope,
+                np.average(
+                    self.slope[start + 1 : end + 1],
+                    weights=np.diff(self.distance[start : end + 1]),
+                ),
+            )
+            self.assertAlmostEqual(stats.elevation_gain, deltas[deltas > 0].sum())
+            self.assertAlmostEqual(stats.elevation_loss, -deltas[deltas < 0].sum())
+            self.assertEqual(stats.max_slope, self.slope[start + 1 : end + 1].max())
+
+    def test_stats_between(self):
+        """test statistics between two distances"""
+        stats = self.profile.stats_between(10, 20)
+        inside = np.flatnonzero((self.distance >= 10) & (self.distance <= 20))
+        self.assertEqual(stats, self.profile.stats(inside[0], inside[-1]))
+        self.assertEqual(self.profile.stats_between(20, 10).distance, 0)
+
+    def test_stats_missing_elevation(self):
+        """test statistics ignore missing elevations"""
+        profile = GPXProfile(
+            "test",
+            np.array([0, 1, 2, 3.0]),
+            np.array([0, 100, np.nan, 50]),
+            np.array([0, 10, np.nan, np.nan]),
+        )
+        self.assertEqual(profile.elevation_gain(0, 3), 100)
+        self.assertEqual(profile.max_slope(0, 3), 10)
+        self.assertEqual(profile.mean_slope(0, 3), 10 / 3)
+
+
+class TestProfileDerived(unittest.TestCase):
+    """Profile derived columns test class"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.distance = np.cumsum(np.append(0, rng.uniform(0, 0.1, 999)))
+        self.elevation = 1000 + np.cumsum(rng.normal(0, 5, 1000))
+
+    def test_lazy_slope(self):
+        """test slope is computed on first access only, unless given"""
+        profile = GPXProfile("test", self.distance, self.elevation, slope_window=0.5)
+        self.assertNotIn("derived_slope", vars(profile))
+        np.testing.assert_array_equal(
+            profile.slope, calculate_slope(self.distance, self.elevation, 0.5)
+        )
+        self.assertIs(profile.slope, profile.slope)
+
+        slope = np.ones(1000)
+        self.assertIs(GPXProfile("test", self.distance, self.elevation, slope).slope, slope)
+
+    def test_memoized_segments(self):
+        """test slope is computed once for segments and render"""
+        expected = [
+            (seg.start, seg.end, seg.sign)
+            for seg in get_real_slope_segments(self.distance, self.elevation, 0.5)
+        ]
+        profile = GPXProfile("test", self.distance, self.elevation)
+        with mock.patch.object(
+            utils, "calculate_slope", wraps=utils.calculate_slope
+        ) as calculate:
+            segments = profile.slope_segments(0.5)
+            self.assertEqual([(seg.start, seg.end, seg.sign) for seg in segments], expected)
+            self.assertEqual(profile.slope_segments(0.5), segments)
+            main.render_profile(profile, dpi=20, plot_slope=True)
+        self.assertEqual(calculate.call_count, 1)
+
+    def test_invalidate(self):
+        """test assigning data or invalidating forgets derived columns"""
+        profile = GPXProfile("test", self.distance, self.elevation)
+        segments = profile.slope_segments(0.5)
+        loss = profile.elevation_loss(0, 999)
+
+        profile.elevation = self.elevation[::-1].copy()
+        self.assertNotEqual(profile.slope_segments(0.5), segments)
+        self.assertAlmostEqual(profile.elevation_gain(0, 999), loss)
+
+        profile.elevation[:] = self.elevation
+        profile.invalidate()
+        self.assertAlmostEqual(profile.elevation_loss(0, 999), loss)
+
+    def test_get_all_slope_segments_given_slope(self):
+        """test segments follow the given slope"""
+        segments = get_all_slope_segments(self.distance, self.elevation, np.ones(1000))
+        self.assertEqual([(seg.start, seg.end, seg.sign) for seg in segments], [(0, 999, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
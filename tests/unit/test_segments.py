@@ -7,16 +7,40 @@ import numpy as np
 from gpxprofpy.segments import (
     SlopeSegment,
     get_segments_end_indexes,
+    find_segments_end_indexes,
     extract_segments,
     get_all_slope_segments,
+    get_segments_polygons,
 )
 
+from gpxprofpy.profile import GPXProfile
 from gpxprofpy.utils import (
     calculate_slope,
     get_slope_sign,
 )
 
 
+def reference_segments_end_indexes(slope_sign):
+    """Per-point loop segmentation, as implemented before vectorization"""
+
+    segments_ends, segments_sign = [], []
+    for i, sg in enumerate(slope_sign[1:]):
+        try:
+            if (sg * slope_sign[i + 2]) <= 0 and sg != slope_sign[i + 2]:
+                segments_ends.append(i + 1)
+                segments_sign.append(sg)
+        except IndexError:
+            if sg != slope_sign[i]:
+                segments_ends.append(i + 1)
+                segments_sign.append(sg)
+
+    if segments_ends[-1] != len(slope_sign) - 1:
+        segments_ends.append(len(slope_sign) - 1)
+        segments_sign.append(slope_sign[-1])
+
+    return segments_ends, segments_sign
+
+
 class TestSegmentsFunctions(unittest.TestCase):
     """Segments functions test class"""
 
@@ -29,7 +53,7 @@ class TestSegmentsFunctions(unittest.TestCase):
         distance = np.array([0, 1, 2.5])
         elevation = np.array([0, 50, 100])
         slope = calculate_slope(distance, elevation)
-        segment = SlopeSegment(distance, elevation, slope, 1)
+        segment = SlopeSegment(GPXProfile("test", distance, elevation, slope), 0, 2, 1)
         self.assertEqual(segment.get_size(), 2.5)
         np.testing.assert_equal(
             segment.get_distance_deltas(),
@@ -57,6 +81,26 @@ class TestSegmentsFunctions(unittest.TestCase):
         self.assertEqual(segment_end_indexes, [1, 3, 4])
         self.assertEqual(segment_signs, [1, 0, -1])
 
+    def test_segment_end_indexes_reference(self):
+        """test get_segments_end_indexes against the per-point loop"""
+        rng = np.random.default_rng(0)
+        for size in (2, 3, 10, 1000):
+            for _ in range(20):
+                slope_sign = [0] + rng.integers(-1, 2, size - 1).tolist()
+                try:
+                    expected = reference_segments_end_indexes(slope_sign)
+                except IndexError:  # Loop fails on tracks without sign change
+                    continue
+                self.assertEqual(get_segments_end_indexes(slope_sign), expected)
+
+    def test_find_segments_end_indexes_single_sign(self):
+        """test find_segments_end_indexes on a track without sign change"""
+        segment_end_indexes, segment_signs = find_segments_end_indexes(
+            np.array([0, 1, 1, 1])
+        )
+        np.testing.assert_equal(segment_end_indexes, [3])
+        np.testing.assert_equal(segment_signs, [1])
+
     def test_extract_segments(self):
         """test extract_segments"""
         slope = calculate_slope(self.distance, self.elevation)
@@ -80,3 +124,16 @@ class TestSegmentsFunctions(unittest.TestCase):
         self.assertEqual(segments[-1].get_size(), 2)
         np.testing.assert_almost_equal(segments[0].mean_slope(), 4.8, 2)
         np.testing.assert_almost_equal(segments[-1].mean_slope(), 0.8, 2)
+
+    def test_get_segments_polygons(self):
+        """test get_segments_polygons"""
+        profile = GPXProfile("", np.arange(10.0), np.arange(10.0) + 100, np.zeros(10))
+        segments = [SlopeSegment(profile, 1, 3, 1), SlopeSegment(profile, 5, 8, 1)]
+        polygons = get_segments_polygons(segments)
+        np.testing.assert_equal(
+            polygons[0], [[1, 101], [2, 102], [3, 103], [3, 0], [1, 0]]
+        )
+        self.assertEqual(len(polygons[1]), 6)
+        polygons = get_segments_polygons(segments, np.array([0, 1, 3, 5, 7, 8, 9]))
+        np.testing.assert_equal(polygons[0], [[1, 101], [3, 103], [3, 0], [1, 0]])
+        np.testing.assert_equal(polygons[1][:, 0], [5, 7, 8, 8, 5])
@@ -51,6 +51,32 @@ class TestSlopeFunctions(unittest.TestCase):
             calculate_slope(self.distance_2, self.elevation_2), self.slope_2, 2
         )
 
+    def test_calculate_slope_matches_loop(self):
+        """test calculate_slope against slope_between_points"""
+        rng = np.random.default_rng(0)
+        distance = np.cumsum(rng.choice([0, 0.01, 0.02], 500))
+        elevation = np.cumsum(rng.normal(0, 2, 500))
+        expected = [0] + [
+            slope_between_points(distance[i], elevation[i], distance[i + 1], elevation[i + 1])
+            for i in range(499)
+        ]
+        np.testing.assert_almost_equal(calculate_slope(distance, elevation), expected)
+
+    def test_calculate_slope_missing_elevation(self):
+        """test calculate_slope with missing elevations"""
+        elevation = np.array([0, 100, None, 300], dtype=float)
+        np.testing.assert_equal(
+            calculate_slope(np.array([0, 1, 2, 3]), elevation), [0, 10, np.nan, np.nan]
+        )
+
+    def test_calculate_slope_window(self):
+        """test calculate_slope over a distance window"""
+        distance = np.arange(0, 1.01, 0.01)
+        elevation = 1000 + 50 * distance + np.where(np.arange(101) % 2, 1, -1)
+        slope = calculate_slope(distance, elevation, window=0.2)
+        np.testing.assert_almost_equal(slope[10:-10], 5, 0)
+        self.assertGreater(np.abs(calculate_slope(distance, elevation)).max(), 15)
+
     def test_slope_sign_1(self):
         """test get_slope_sign 1"""
         np.testing.assert_equal(
@@ -0,0 +1,167 @@
+"""chunked streaming pipeline test module"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gpxprofpy.incremental import SegmentTracker
+from gpxprofpy.profile import GPXProfile, read_gpx_file
+from gpxprofpy.segments import get_real_slope_segments
+from gpxprofpy.stream import (
+    ProfileChunk,
+    ProfileSummary,
+    StreamedSegment,
+    iter_chunks,
+    stream_profile,
+)
+from gpxprofpy.utils import calculate_slope
+
+
+def write_random_gpx(sizes, seed):
+    """Writes a GPX file of random walk track segments of sizes points, some
+    without elevation, and returns its name"""
+
+    rng = np.random.default_rng(seed)
+    lines = ['<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1"><trk>']
+    for size in sizes:
+        latitude = 45 + np.cumsum(rng.normal(0, 1e-4, size))
+        longitude = 6 + np.cumsum(rng.normal(0, 1e-4, size))
+        elevation = 1000 + 300 * np.sin(np.arange(size) / 50) + rng.normal(0, 2, size)
+        lines.append("<trkseg>")
+        for lat, lon, ele, missing in zip(
+            latitude, longitude, elevation, rng.random(size) < 0.01
+        ):
+            ele = "" if missing else f"<ele>{ele:.1f}</ele>"
+            lines.append(f'<trkpt lat="{lat:.6f}" lon="{lon:.6f}">{ele}</trkpt>')
+        lines.append("</trkseg>")
+    lines.append("</trk></gpx>")
+
+    file_descriptor, filename = tempfile.mkstemp(suffix=".gpx")
+    with os.fdopen(file_descriptor, "w", encoding="utf-8") as gpx_file:
+        gpx_file.write("\n".join(lines))
+
+    return filename
+
+
+class TestSegmentTracker(unittest.TestCase):
+    """Incremental segmentation test class"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.distance = np.cumsum(rng.uniform(0, 0.02, 5000))
+        self.elevation = np.round(
+            1000 + 300 * np.sin(self.distance / 2) + rng.normal(0, 0.5, 5000), 1
+        )
+        self.profile = GPXProfile(
+            "", self.distance, self.elevation, calculate_slope(self.distance, self.elevation)
+        )
+
+    def test_pop_final(self):
+        """test popped and remaining segments equal a segmentation of the whole
+        profile, with the same statistics"""
+
+        for seed, threshold in ((0, 1), (1, 0.3), (2, 0.1)):
+            rng = np.random.default_rng(seed)
+            tracker, popped, i = SegmentTracker(threshold), [], 0
+            while i < len(self.distance):
+                k = int(rng.integers(1, 200))
+                tracker.add(self.distance[i : i + k], self.elevation[i : i + k])
+                popped.extend(tracker.pop_final())
+                i += k
+            self.assertGreater(len(popped), 0)
+            tracker.finish()
+            popped.extend(tracker.pop_final())
+            self.assertEqual(tracker.segments, [])
+
+            expected = get_real_slope_segments(self.distance, self.elevation, threshold)
+            self.assertEqual(
+                [node[:3] for node in popped],
+                [(seg.start, seg.end, seg.sign) for seg in expected],
+            )
+            self.assertEqual(
+                tracker.stats(), self.profile.stats(0, len(self.distance) - 1)
+            )
+
+    def test_bounded_state(self):
+        """test settled segments are forgotten by merge passes"""
+
+        tracker = SegmentTracker()
+        for i in range(0, len(self.distance), 100):
+            tracker.add(self.distance[i : i + 100], self.elevation[i : i + 100])
+            tracker.pop_final()
+            self.assertLess(max(len(merge_pass.nodes) for merge_pass in tracker.passes), 200)
+
+
+class TestStream(unittest.TestCase):
+    """Chunked streaming pipeline test class"""
+
+    def setUp(self):
+        self.filename = write_random_gpx([700, 1, 1200], 0)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_iter_chunks(self):
+        """test chunks cover all points with parts first points"""
+
+        chunks = list(iter_chunks(self.filename, 500, block_size=1000))
+        self.assertEqual([len(columns[0]) for columns, _ in chunks], [500, 500, 500, 401])
+        np.testing.assert_equal(
+            [starts for _, starts in chunks], [[0], [200, 201], [], []]
+        )
+        self.assertRaises(ValueError, list, iter_chunks(self.filename, 0))
+
+    def test_stream_profile(self):
+        """test streamed chunks, segments and summary equal the whole file ones"""
+
+        for gaps in ("bridge", "break"):
+            profile = read_gpx_file(self.filename, gaps)
+            expected = get_real_slope_segments(profile.distance, profile.elevation, 0.5)
+            for chunk_size in (1, 37, 1000, 5000):
+                events = list(
+                    stream_profile(self.filename, chunk_size, gaps, 0.5, block_size=4096)
+                )
+                chunks = [event for event in events if isinstance(event, ProfileChunk)]
+                segments = [event for event in events if isinstance(event, StreamedSegment)]
+                summary = events[-1]
+
+                self.assertEqual(chunks[-1].offset + len(chunks[-1].distance), 1901)
+                np.testing.assert_array_equal(
+                    np.concatenate([chunk.distance for chunk in chunks]), profile.distance
+                )
+                np.testing.assert_array_equal(
+                    np.concatenate([chunk.slope for chunk in chunks]), profile.slope
+                )
+                self.assertEqual(
+                    [(seg.start, seg.end, seg.sign) for seg in segments],
+                    [(seg.start, seg.end, seg.sign) for seg in expected],
+                )
+                for seg in segments:
+                    self.assertEqual(seg.stats, profile.stats(seg.start, seg.end))
+                    self.assertEqual(seg.start_distance, profile.distance[seg.start])
+                self.assertIsInstance(summary, ProfileSummary)
+                self.assertEqual(
+                    summary,
+                    ProfileSummary(
+                        1901,
+                        profile.max_elevation(),
+                        profile.stats(0, 1900),
+                        len(expected),
+                    ),
+                )
+
+    def test_stream_profile_errors(self):
+        """test streaming an unknown gaps mode or a file without points"""
+
+        self.assertRaises(ValueError, list, stream_profile(self.filename, gaps="skip"))
+        empty = write_random_gpx([], 0)
+        try:
+            self.assertRaises(ValueError, list, stream_profile(empty))
+        finally:
+            os.remove(empty)
+
+
+if __name__ == "__main__":
+    unittest.main()